@@ -1,19 +1,44 @@
+from __future__ import annotations
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from string import Template
+import atexit
+import heapq
 import json
+import math
 import os
 import csv
-from typing import Dict, List
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ids import IdAllocator
+from lazy import LazyModule
+from persistence import PersistenceWorker
+from profiling import profiler
+from scheduling import parse_dependencies
+from task_log import TaskLog
+
+# pandas, plotly and the modules built on them (storage, task store, imports,
+# backups) load on first use, so a cold process renders the login page without them
+pd = LazyModule('pandas')
+px = LazyModule('plotly.express')
+go = LazyModule('plotly.graph_objects')
+
+if TYPE_CHECKING:
+    from backups import BackupManager
+    from events import EventBus
+    from storage import TaskStorage
+    from task_store import TaskStore
 
 # Configuration
 COLORS = {
     'primary': '#002a5c',
     'secondary': '#004b8e', 
     'accent': '#005dab',
-    'highlight': '#017dc3'
+    'highlight': '#017dc3',
+    'critical': '#d62728'
 }
 
 USERS = {
@@ -24,67 +49,245 @@ USERS = {
 
 # CSV file path
 TASKS_CSV_FILE = 'team_tasks.csv'
+# Parquet file path, used when TASKS_STORAGE_BACKEND is 'parquet'
+TASKS_PARQUET_FILE = 'team_tasks.parquet'
+# SQLite database path, used when TASKS_STORAGE_BACKEND is 'sqlite'
+TASKS_SQLITE_FILE = 'team_tasks.db'
+TASKS_STORAGE_BACKEND = os.environ.get('TASKS_STORAGE_BACKEND', 'csv')
+# Append-only change log replayed on top of the snapshot
+TASKS_LOG_FILE = 'team_tasks.log'
+# Set when several Streamlit processes share the task files or database
+TASKS_MULTI_PROCESS = os.environ.get('TASKS_MULTI_PROCESS', '') not in ('', '0')
+# How often an open dashboard checks for changes made by other sessions or processes
+CHANGE_POLL_SECONDS = 5
+# Incremental backups (full snapshots plus deltas) with hourly/daily retention
+TASKS_BACKUP_DIR = 'backups'
+# Load the task store and build the dashboard charts in the background while the login page shows
+TASKS_WARM_UP = os.environ.get('TASKS_WARM_UP', '1') not in ('', '0')
+# Stylesheet next to this file, compiled once per process
+STYLESHEET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'style.css')
+# High-water mark of the task ids handed out, so ids of deleted tasks are never reused.
+# Ids stay consecutive across restarts: a single process hands them out from memory and
+# its persistence worker saves the mark; several processes reserve them one at a time
+TASKS_ID_FILE = 'team_tasks.ids'
+# Status transitions of every task, rolled up into the dashboard's trend charts
+TASKS_HISTORY_FILE = 'team_tasks.history'
+# How long a submit waits for its change to reach disk while background saves are failing
+SAVE_TIMEOUT = 5.0
+# Task change events: JSON lines for the reporting warehouse and/or a notification webhook (off when unset)
+TASKS_EVENTS_FILE = os.environ.get('TASKS_EVENTS_FILE', '')
+TASKS_EVENTS_WEBHOOK = os.environ.get('TASKS_EVENTS_WEBHOOK', '')
+# Event batches no sink accepted after retrying, kept for replay
+TASKS_EVENTS_DEAD_LETTER_FILE = 'team_tasks.events.failed'
+
+# Storage Functions
+@st.cache_resource
+def get_storage() -> TaskStorage:
+    """Storage backend selected by TASKS_STORAGE_BACKEND"""
+    from storage import CsvStorage, ParquetStorage, SqliteStorage
+    if TASKS_STORAGE_BACKEND == 'sqlite':
+        return SqliteStorage(TASKS_SQLITE_FILE)
+    if TASKS_STORAGE_BACKEND == 'parquet':
+        return ParquetStorage(TASKS_PARQUET_FILE)
+    return CsvStorage(TASKS_CSV_FILE)
+
+@st.cache_resource
+def get_task_log():
+    """Process-wide change log shared by all sessions"""
+    from storage import SqliteStorage
+    storage = get_storage()
+    if isinstance(storage, SqliteStorage):
+        # SQLite applies every change to its row, so it is its own log
+        return storage
+    return TaskLog(TASKS_LOG_FILE, storage.load, storage.save)
 
-# CSV Functions
+@profiler.profile()
 def load_tasks_from_csv():
-    """Load tasks from CSV file"""
+    """Load tasks from the snapshot plus the change log tail"""
     try:
-        if os.path.exists(TASKS_CSV_FILE):
-            df = pd.read_csv(TASKS_CSV_FILE)
-            if not df.empty:
-                # Convert DataFrame back to list of dictionaries
-                tasks = df.to_dict('records')
-                # Convert string tags back to list
-                for task in tasks:
-                    if 'tags' in task and pd.notna(task['tags']):
-                        task['tags'] = eval(task['tags']) if task['tags'].startswith('[') else [task['tags']]
-                    else:
-                        task['tags'] = []
-                return tasks
+        return get_task_log().load()
     except Exception as e:
         st.error(f"Error loading tasks from CSV: {str(e)}")
     return []
 
+@st.cache_resource
+def get_persistence_worker() -> PersistenceWorker:
+    """Background thread that writes changes, snapshots and backups to disk"""
+    worker = PersistenceWorker(get_task_log())
+    # Write out whatever is still queued when the server shuts down
+    atexit.register(worker.close)
+    return worker
+
+@st.cache_resource
+def get_event_bus() -> Optional[EventBus]:
+    """Background delivery of task change events to the configured sinks; None when there are none"""
+    from events import EventBus, FileSink, WebhookSink
+    sinks = []
+    if TASKS_EVENTS_FILE:
+        sinks.append(FileSink(TASKS_EVENTS_FILE))
+    if TASKS_EVENTS_WEBHOOK:
+        sinks.append(WebhookSink(TASKS_EVENTS_WEBHOOK))
+    if not sinks:
+        return None
+    bus = EventBus(sinks, dead_letter=TASKS_EVENTS_DEAD_LETTER_FILE)
+    # Deliver whatever is still queued when the server shuts down
+    atexit.register(bus.close)
+    return bus
+
+@st.cache_resource
+def get_task_store() -> TaskStore:
+    """Process-wide task store loaded once and shared by all sessions"""
+    from history import StatusHistory
+    from task_store import TaskStore
+    if TASKS_MULTI_PROCESS:
+        # The log (or database) is also the change feed between processes; writes are
+        # synchronous so they can be checked against every other process's writes
+        return TaskStore.from_feed(get_task_log(), ids=IdAllocator(TASKS_ID_FILE, block=1),
+                                   history=StatusHistory(TASKS_HISTORY_FILE), events=get_event_bus())
+    # Writes only enqueue; the persistence worker does the disk I/O, the id counter included
+    worker = get_persistence_worker()
+    return TaskStore(load_tasks_from_csv(), worker, ids=IdAllocator(TASKS_ID_FILE, writer=worker),
+                     history=StatusHistory(TASKS_HISTORY_FILE), events=get_event_bus())
+
+def save_failure() -> Optional[BaseException]:
+    """Error of the background write being retried, if saving is failing"""
+    return None if TASKS_MULTI_PROCESS else get_persistence_worker().failing
+
+def confirm_saved() -> bool:
+    """Whether this session's last change is on disk or on its way; False (with the error shown) if it is stuck
+
+    While saves succeed this returns at once. While they fail, the change is
+    kept and retried in the background, and this waits up to SAVE_TIMEOUT for it.
+    """
+    if save_failure() is None:
+        return True
+    try:
+        if get_task_store().saved(SAVE_TIMEOUT):
+            return True
+    except Exception as e:
+        st.error(f"Error saving task: {str(e)}")
+        return False
+    st.error(f"Your change is not saved to disk yet: {str(save_failure())}. It is kept and "
+             "retried automatically, so there is no need to submit it again.")
+    return False
+
+def wait_for_pending_writes():
+    """Let this process's queued task writes reach storage before reading it back"""
+    if not TASKS_MULTI_PROCESS:
+        get_persistence_worker().flush()
+
+@profiler.profile()
+def get_dashboard_metrics() -> Dict[str, int]:
+    """Dashboard counts for today, from SQL when the database is shared by several processes"""
+    from storage import SqliteStorage
+    today = datetime.now().date()
+    storage = get_storage()
+    if isinstance(storage, SqliteStorage):
+        # Let this process's queued writes land so the counts include them
+        wait_for_pending_writes()
+        return storage.dashboard_metrics(today)
+    return get_task_store().dashboard_metrics(today)
+
+def get_data_version():
+    """Cache key that changes whenever the tasks change, including writes by other processes"""
+    from storage import SqliteStorage
+    storage = get_storage()
+    if isinstance(storage, SqliteStorage):
+        wait_for_pending_writes()
+        return ('sqlite', storage.data_version())
+    store = get_task_store()
+    return (id(store), store.version)
+
+@profiler.profile()
 def save_tasks_to_csv():
-    """Save tasks to CSV file"""
+    """Queue a full snapshot of tasks to be saved to CSV file"""
     try:
-        if st.session_state.tasks:
-            # Convert tasks to DataFrame
-            df_tasks = pd.DataFrame(st.session_state.tasks)
-            # Convert tags list to string for CSV storage
-            df_tasks['tags'] = df_tasks['tags'].apply(lambda x: str(x) if x else '[]')
-            # Save to CSV
-            df_tasks.to_csv(TASKS_CSV_FILE, index=False)
+        if len(get_task_store()):
+            get_task_store().checkpoint()
             return True
     except Exception as e:
         st.error(f"Error saving tasks to CSV: {str(e)}")
     return False
 
-def backup_csv():
-    """Create a backup of the CSV file with timestamp"""
+@st.cache_data(max_entries=2, show_spinner=False)
+def _csv_download_bytes(path: str, version) -> bytes:
+    """CSV export of the snapshot, cached until the stored tasks change"""
+    return get_storage().export_csv()
+
+@profiler.profile()
+def read_csv_for_download() -> bytes:
+    """Fold pending log records into the snapshot and return it as CSV"""
+    wait_for_pending_writes()
+    get_task_log().compact()
+    storage = get_storage()
+    return _csv_download_bytes(storage.path, storage.version())
+
+@st.cache_resource
+def get_backup_manager() -> BackupManager:
+    """Incremental backups of the tasks, shared by all sessions"""
+    from backups import BackupManager
+    return BackupManager(TASKS_BACKUP_DIR)
+
+@profiler.profile()
+def backup_csv(scheduled: bool = False) -> bool:
+    """Queue a backup of the current tasks: a delta against the last full snapshot, or a new full one"""
     try:
-        if os.path.exists(TASKS_CSV_FILE):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"team_tasks_backup_{timestamp}.csv"
-            df = pd.read_csv(TASKS_CSV_FILE)
-            df.to_csv(backup_name, index=False)
-            return backup_name
+        manager = get_backup_manager()
+        tasks = get_task_store().all()
+        
+        def write_backup():
+            try:
+                # Another process may have taken the scheduled backup since due() was checked
+                manager.backup(tasks, if_due=scheduled)
+            finally:
+                manager.scheduled.clear()
+        
+        if scheduled:
+            manager.scheduled.set()
+        # Runs on the persistence worker after the writes queued before it
+        get_persistence_worker().submit(write_backup)
+        return True
     except Exception as e:
         st.error(f"Error creating backup: {str(e)}")
-    return None
+    return False
+
+def schedule_backup():
+    """Queue an automatic backup when the last one is older than the backup interval"""
+    manager = get_backup_manager()
+    if not manager.scheduled.is_set() and len(get_task_store()) and manager.due(datetime.now()):
+        backup_csv(scheduled=True)
 
 # Initialize session state
+@profiler.profile()
 def init_session_state():
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
     if 'username' not in st.session_state:
         st.session_state.username = None
-    if 'tasks' not in st.session_state:
-        # Load tasks from CSV on initialization
-        st.session_state.tasks = load_tasks_from_csv()
+    # Point the session at the shared task list instead of loading its own copy;
+    # the login page needs no tasks, so it does not wait for the store to load
+    if st.session_state.authenticated:
+        sync_session_tasks()
     if 'projects' not in st.session_state:
         st.session_state.projects = []
 
+def sync_session_tasks():
+    """Refresh the session's task list if another session has written since the last rerun
+
+    Returns the (op, task_id) changes pulled, or None when the session had to
+    take a full snapshot.
+    """
+    store = get_task_store()
+    # Pick up what other processes wrote since this process last looked
+    store.sync()
+    session_version = st.session_state.get('tasks_version')
+    if session_version == store.version and 'tasks' in st.session_state:
+        return []
+    changes = store.changes_since(session_version) if session_version is not None else None
+    st.session_state.tasks = store.all()
+    st.session_state.tasks_version = store.version
+    return changes
+
 # Authentication
 def authenticate_user(username: str, password: str) -> bool:
     if username in USERS and USERS[username]['password'] == password:
@@ -102,55 +305,210 @@ def logout():
     st.session_state.permissions = None
 
 # Task Management Functions
-def add_task(task_data: Dict):
-    task_data['id'] = len(st.session_state.tasks) + 1
+PRIORITY_ORDER = {'Low': 0, 'Medium': 1, 'High': 2, 'Critical': 3}
+STATUS_ORDER = {'Not Started': 0, 'In Progress': 1, 'On Hold': 2, 'Completed': 3}
+TASK_SORT_KEYS = {
+    'Last updated': lambda task: str(task.get('updated_date') or ''),
+    'End date': lambda task: str(task.get('end_date') or ''),
+    'Priority': lambda task: PRIORITY_ORDER.get(task.get('priority'), -1),
+    'Status': lambda task: STATUS_ORDER.get(task.get('status'), -1),
+    'Title': lambda task: str(task.get('title') or '').lower(),
+}
+MY_TASKS_PAGE_SIZES = [10, 25, 50, 100]
+# Number of matches offered by the Edit tab task picker
+TASK_PICKER_LIMIT = 20
+# Rows shown in the dashboard's Recent Tasks table
+RECENT_TASKS_LIMIT = 100
+# Periods shown by the trend charts
+TREND_DAYS = 90
+TREND_WEEKS = 12
+# Filter widgets: facet field -> label
+TASK_FILTERS = {
+    'status': "Status",
+    'priority': "Priority",
+    'assigned_to': "Assigned to",
+    'project': "Project",
+    'tags': "Tags",
+}
+
+@profiler.profile()
+def add_task(task_data: Dict) -> bool:
+    """Create a task; False (with the error shown) if it could not be saved"""
     task_data['created_by'] = st.session_state.username
     task_data['created_date'] = datetime.now().strftime('%Y-%m-%d %H:%M')
     task_data['updated_date'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-    st.session_state.tasks.append(task_data)
-    # Save to CSV after adding
-    save_tasks_to_csv()
-
-def update_task(task_id: int, updated_data: Dict):
-    for i, task in enumerate(st.session_state.tasks):
-        if task['id'] == task_id:
-            updated_data['updated_date'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-            st.session_state.tasks[i].update(updated_data)
-            # Save to CSV after updating
-            save_tasks_to_csv()
-            break
-
-def delete_task(task_id: int):
-    st.session_state.tasks = [task for task in st.session_state.tasks if task['id'] != task_id]
-    # Save to CSV after deleting
-    save_tasks_to_csv()
+    try:
+        # The shared store assigns the id and records the change in the log
+        task_data['id'] = get_task_store().add(task_data)['id']
+        return confirm_saved()
+    except Exception as e:
+        st.error(f"Error saving task: {str(e)}")
+    finally:
+        sync_session_tasks()
+    return False
+
+@profiler.profile()
+def update_task(task_id: int, updated_data: Dict, expected_version: int = None) -> bool:
+    """Update a task; with expected_version, refuse if someone else changed it first
+
+    Returns False, with the reason shown, if nothing was saved.
+    """
+    from task_store import StaleTaskError
+    updated_data['updated_date'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+    try:
+        if get_task_store().update(task_id, updated_data, expected_version) is not None:
+            return confirm_saved()
+        st.error("This task was deleted by someone else while you were editing it.")
+    except StaleTaskError:
+        st.error("This task was changed by someone else while you were editing it. "
+                 "Review the latest values and try again.")
+    except Exception as e:
+        st.error(f"Error saving task: {str(e)}")
+    finally:
+        sync_session_tasks()
+    return False
+
+def format_dependencies(depends_on) -> str:
+    return ", ".join(f"#{task_id}" for task_id in depends_on or ())
+
+def read_dependencies(task_id, text: str):
+    """Parse and check the dependency ids typed into a task form; None (with an error shown) if invalid"""
+    try:
+        dependencies = parse_dependencies(text)
+    except ValueError as e:
+        st.error(f"Invalid dependencies: {str(e)}")
+        return None
+    error = get_task_store().dependency_error(task_id, dependencies)
+    if error:
+        st.error(error)
+        return None
+    return dependencies
+
+@profiler.profile()
+def delete_task(task_id: int) -> bool:
+    try:
+        get_task_store().delete(task_id)
+        return confirm_saved()
+    except Exception as e:
+        st.error(f"Error saving task: {str(e)}")
+    finally:
+        sync_session_tasks()
+    return False
+
+# Batch operations: one id allocation and one log write (or transaction) per batch
+@profiler.profile()
+def bulk_add_tasks(tasks_data: List[Dict]) -> int:
+    """Create the tasks of an import; returns how many were saved"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M')
+    for task_data in tasks_data:
+        task_data['created_by'] = st.session_state.username
+        task_data['created_date'] = now
+        task_data['updated_date'] = now
+    try:
+        return len(get_task_store().bulk_add(tasks_data))
+    except Exception as e:
+        st.error(f"Error importing tasks: {str(e)}")
+        return 0
+    finally:
+        sync_session_tasks()
+
+@profiler.profile()
+def bulk_update_tasks(task_ids: List[int], updated_data: Dict) -> int:
+    """Apply the same changes to every task in task_ids; returns how many were updated"""
+    updated_data = {**updated_data, 'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M')}
+    try:
+        return len(get_task_store().bulk_update({task_id: updated_data for task_id in task_ids}))
+    except Exception as e:
+        st.error(f"Error saving tasks: {str(e)}")
+        return 0
+    finally:
+        sync_session_tasks()
+
+@profiler.profile()
+def bulk_reassign_tasks(task_ids: List[int], assignee: str) -> int:
+    updated_data = {'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M')}
+    try:
+        return len(get_task_store().bulk_reassign(task_ids, assignee, updated_data))
+    except Exception as e:
+        st.error(f"Error saving tasks: {str(e)}")
+        return 0
+    finally:
+        sync_session_tasks()
+
+@profiler.profile()
+def bulk_delete_tasks(task_ids: List[int]) -> int:
+    try:
+        return get_task_store().bulk_delete(task_ids)
+    except Exception as e:
+        st.error(f"Error saving tasks: {str(e)}")
+        return 0
+    finally:
+        sync_session_tasks()
 
 def get_user_tasks(username: str) -> List[Dict]:
-    return [task for task in st.session_state.tasks if task['assigned_to'] == username or task['created_by'] == username]
+    return get_task_store().user_tasks(username)
+
+@profiler.profile()
+def search_tasks(query: str) -> List[Dict]:
+    """Top matches for the Edit tab picker; the most recent tasks when query is empty
+
+    Streamlit only submits a text input on Enter or blur, which debounces the
+    query; results are also remembered per store version so unrelated reruns
+    don't search again.
+    """
+    store = get_task_store()
+    cache_key = (store.version, query)
+    cached = st.session_state.get('task_search_cache')
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    matches = store.search(query, TASK_PICKER_LIMIT) if query.strip() else store.recent(TASK_PICKER_LIMIT)
+    st.session_state.task_search_cache = (cache_key, matches)
+    return matches
+
+def paginate_tasks(tasks: List[Dict], sort_by: str, descending: bool, page: int, page_size: int) -> List[Dict]:
+    """One page of tasks in sort order, selected with a bounded heap instead of a full sort"""
+    end = page * page_size
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return pick(end, tasks, key=TASK_SORT_KEYS[sort_by])[end - page_size:]
 
 # Dashboard Functions
-def create_gantt_chart():
-    if not st.session_state.tasks:
-        return None
+# Gantt rows are sized per task and capped so large backlogs stay readable
+GANTT_ROW_HEIGHT = 24
+GANTT_MAX_ROWS = 300
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _build_gantt_chart(_frame: pd.DataFrame, version: int, window_start, window_end, projects: tuple):
+    """Build the Gantt figure for one task-store version and filter combination"""
+    # The store's task frame already has the dates parsed
+    df_tasks = _frame
     
-    df_tasks = pd.DataFrame(st.session_state.tasks)
+    # Keep only the rows that are visible with the current filters
+    mask = df_tasks['start'].notna() & df_tasks['finish'].notna()
+    if projects:
+        mask &= df_tasks['project'].isin(projects)
+    if window_start is not None and window_end is not None:
+        mask &= (df_tasks['finish'] >= pd.Timestamp(window_start)) & (df_tasks['start'] <= pd.Timestamp(window_end))
+    df_gantt = df_tasks.loc[mask, ['title', 'start', 'finish', 'assigned_to', 'status', 'priority']].rename(columns={
+        'title': 'Task',
+        'start': 'Start',
+        'finish': 'Finish',
+        'assigned_to': 'Resource',
+        'status': 'Status',
+        'priority': 'Priority'
+    })
+    if df_gantt.empty:
+        return None
     
-    # Prepare data for Gantt chart
-    gantt_data = []
-    for _, task in df_tasks.iterrows():
-        start_date = datetime.strptime(task['start_date'], '%Y-%m-%d')
-        end_date = datetime.strptime(task['end_date'], '%Y-%m-%d')
-        
-        gantt_data.append({
-            'Task': task['title'],
-            'Start': start_date,
-            'Finish': end_date,
-            'Resource': task['assigned_to'],
-            'Status': task['status'],
-            'Priority': task['priority']
-        })
+    visible_tasks = len(df_gantt)
+    df_gantt = df_gantt.nsmallest(GANTT_MAX_ROWS, 'Start')
+    title = "Project Timeline - Gantt Chart"
+    if visible_tasks > len(df_gantt):
+        title += f" (first {len(df_gantt)} of {visible_tasks} tasks)"
     
-    df_gantt = pd.DataFrame(gantt_data)
+    # Slack from the dependency schedule; tasks without slack are on the critical path
+    slacks = get_task_store().slacks()
+    df_gantt['Slack (days)'] = df_gantt.index.map(slacks)
+    df_gantt['Critical'] = df_gantt['Slack (days)'] <= 0
     
     # Create Gantt chart
     fig = px.timeline(
@@ -159,32 +517,63 @@ def create_gantt_chart():
         x_end="Finish", 
         y="Task",
         color="Status",
+        hover_data=['Slack (days)', 'Critical'],
         color_discrete_map={
             'Not Started': COLORS['primary'],
             'In Progress': COLORS['highlight'], 
             'Completed': COLORS['accent'],
             'On Hold': COLORS['secondary']
         },
-        title="Project Timeline - Gantt Chart"
+        title=title
     )
     
     fig.update_layout(
-        height=400,
+        height=max(400, 150 + df_gantt['Task'].nunique() * GANTT_ROW_HEIGHT),
         showlegend=True,
         plot_bgcolor='white',
         paper_bgcolor='white'
     )
+    # Outline the critical tasks
+    for trace in fig.data:
+        trace.marker.line.width = [3 if row[1] else 0 for row in trace.customdata]
+        trace.marker.line.color = COLORS['critical']
+    if window_start is not None and window_end is not None:
+        fig.update_xaxes(range=[pd.Timestamp(window_start), pd.Timestamp(window_end)])
     
     return fig
 
-def create_progress_summary():
+@profiler.profile()
+def create_gantt_chart(window=None, projects=None):
+    """Gantt chart of the tasks overlapping window (a start/end date pair) in the given projects"""
     if not st.session_state.tasks:
-        return None, None, None
+        return None
     
-    df = pd.DataFrame(st.session_state.tasks)
+    window_start, window_end = window if window and len(window) == 2 else (None, None)
+    # The figure is cached per store version, so unchanged data never rebuilds it
+    return _build_gantt_chart(get_task_store().frame(), st.session_state.tasks_version,
+                              window_start, window_end, tuple(sorted(projects or ())))
+
+# Progress charts are the same for every role, so one entry serves all sessions
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _build_progress_summary(data_version):
+    """Build the progress figures for one data version"""
+    from storage import SqliteStorage
+    storage = get_storage()
+    if isinstance(storage, SqliteStorage):
+        # Let the database do the GROUP BY instead of building a DataFrame
+        status_counts, priority_counts, workload = (
+            pd.Series(dict(storage.count_by(column)), dtype='int64')
+            for column in ('status', 'priority', 'assigned_to')
+        )
+    else:
+        # Count on the shared categorical task frame, leaving out unused categories
+        df = get_task_store().frame()
+        status_counts, priority_counts, workload = (
+            counts[counts > 0]
+            for counts in (df[column].value_counts() for column in ('status', 'priority', 'assigned_to'))
+        )
     
     # Status distribution
-    status_counts = df['status'].value_counts()
     fig_status = px.pie(
         values=status_counts.values,
         names=status_counts.index,
@@ -193,7 +582,6 @@ def create_progress_summary():
     )
     
     # Priority distribution
-    priority_counts = df['priority'].value_counts()
     fig_priority = px.bar(
         x=priority_counts.index,
         y=priority_counts.values,
@@ -203,7 +591,6 @@ def create_progress_summary():
     )
     
     # Team workload
-    workload = df['assigned_to'].value_counts()
     fig_workload = px.bar(
         x=workload.index,
         y=workload.values,
@@ -214,7 +601,162 @@ def create_progress_summary():
     
     return fig_status, fig_priority, fig_workload
 
+@profiler.profile()
+def create_progress_summary():
+    if not st.session_state.tasks:
+        return None, None, None
+    
+    # Reruns without data changes reuse the figures instead of recounting and rebuilding them
+    return _build_progress_summary(get_data_version())
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _build_trend_charts(data_version, today):
+    """Build the trend figures for one data version from the daily and weekly rollups"""
+    store = get_task_store()
+    daily = store.daily_trends()
+    weekly = store.weekly_trends()
+    if daily.empty:
+        return None, None, None
+    
+    # Burndown: open tasks at the end of each day, with the day's completions
+    daily = daily.loc[pd.Timestamp(today - timedelta(days=TREND_DAYS)):]
+    fig_burndown = go.Figure()
+    fig_burndown.add_trace(go.Bar(x=daily.index, y=daily['completed'], name="Completed",
+                                  marker_color=COLORS['highlight']))
+    fig_burndown.add_trace(go.Scatter(x=daily.index, y=daily['open'], name="Open tasks",
+                                      mode='lines', line=dict(color=COLORS['primary'], width=3)))
+    fig_burndown.update_layout(title=f"Burndown (last {TREND_DAYS} days)", plot_bgcolor='white',
+                               paper_bgcolor='white', hovermode='x unified')
+    
+    weekly = weekly[weekly['week'] >= pd.Timestamp(today - timedelta(weeks=TREND_WEEKS))]
+    colors = [COLORS['primary'], COLORS['highlight'], COLORS['accent'], COLORS['secondary']]
+    
+    # Throughput: tasks completed per week by assignee
+    fig_throughput = px.bar(
+        weekly, x='week', y='completed', color='assigned_to',
+        title="Weekly Throughput",
+        labels={'week': "Week", 'completed': "Tasks completed", 'assigned_to': "Assignee"},
+        color_discrete_sequence=colors
+    )
+    
+    # Cycle time: mean days from start to completion per week and assignee
+    fig_cycle = px.line(
+        weekly, x='week', y='cycle_days', color='assigned_to', markers=True,
+        title="Cycle Time by Assignee",
+        labels={'week': "Week", 'cycle_days': "Mean cycle time (days)", 'assigned_to': "Assignee"},
+        color_discrete_sequence=colors
+    )
+    for fig in (fig_throughput, fig_cycle):
+        fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+    
+    return fig_burndown, fig_throughput, fig_cycle
+
+@profiler.profile()
+def create_trend_charts():
+    """Burndown, weekly throughput and cycle time figures, read from the status-transition rollups"""
+    if not st.session_state.tasks:
+        return None, None, None
+    return _build_trend_charts(get_data_version(), datetime.now().date())
+
+# Startup
+@st.cache_resource(show_spinner=False)
+def get_stylesheet() -> str:
+    """style.css with the theme colors filled in and comments and whitespace stripped"""
+    with open(STYLESHEET_FILE, 'r', encoding='utf-8') as f:
+        css = re.sub(r'/\*.*?\*/', '', f.read(), flags=re.S)
+    css = Template(css).substitute(COLORS)
+    css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+    return f"<style>{css.strip()}</style>"
+
+def default_gantt_window(today) -> tuple:
+    return today - timedelta(days=30), today + timedelta(days=90)
+
+@st.cache_resource(show_spinner=False)
+def warm_up() -> threading.Thread:
+    """Once per process, load the shared task store and build the default dashboard charts in the background
+
+    Runs while the first visitor is still on the login page, so the dashboard
+    they land on reads everything from warm caches.
+    """
+    def run():
+        with profiler.rerun('warm-up'):
+            try:
+                store = get_task_store()
+                if not len(store):
+                    return
+                today = datetime.now().date()
+                version = get_data_version()
+                _build_progress_summary(version)
+                _build_trend_charts(version, today)
+                _build_gantt_chart(store.frame(), store.version, *default_gantt_window(today), ())
+            except Exception:
+                # Nothing is cached then; the first dashboard builds (and reports) it instead
+                pass
+    
+    thread = threading.Thread(target=run, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
 # UI Components
+@st.fragment(run_every=CHANGE_POLL_SECONDS)
+def watch_for_changes():
+    """Rerun the page once tasks were changed by another session or process"""
+    store = get_task_store()
+    store.sync()
+    if store.version != st.session_state.get('tasks_version'):
+        st.rerun()
+
+def render_task_filters(key: str, username: str = None) -> Dict:
+    """Filter widgets whose options show how many tasks each value would match"""
+    from facets import DUE
+    # Count against the selections from the last rerun; each widget shows the
+    # counts under the other filters, so picking a value never zeroes its own field
+    filters = {field: st.session_state.get(f"{key}_{field}", []) for field in TASK_FILTERS}
+    filters[DUE] = st.session_state.get(f"{key}_{DUE}", ())
+    counts = get_task_store().facet_counts(filters, username)
+    order = {'status': list(STATUS_ORDER), 'priority': list(PRIORITY_ORDER)}
+    
+    with st.expander("Filters", expanded=any(filters.values())):
+        columns = st.columns(len(TASK_FILTERS) + 1)
+        for column, (field, label) in zip(columns, TASK_FILTERS.items()):
+            field_counts = counts[field]
+            # Keep selected values listed even when nothing matches them any more
+            values = set(field_counts) | set(filters[field])
+            options = [value for value in order[field] if value in values] if field in order else sorted(values)
+            with column:
+                filters[field] = st.multiselect(
+                    label, options, key=f"{key}_{field}",
+                    format_func=lambda value, field_counts=field_counts: f"{value} ({field_counts.get(value, 0)})"
+                )
+        with columns[-1]:
+            filters[DUE] = st.date_input("Due between", (), key=f"{key}_{DUE}")
+    return filters
+
+def render_profiler_panel():
+    """Hidden admin panel with the timings of recent reruns (TASKS_PROFILE=1)"""
+    runs = profiler.runs()
+    with st.expander("Profiler", expanded=False):
+        if not runs:
+            st.caption("No reruns recorded yet")
+            return
+        last = runs[-1]
+        st.caption(f"Last rerun: {last['duration_ms']:.1f} ms, {len(runs)} reruns kept")
+        st.dataframe(pd.DataFrame([
+            {'span': '  ' * span['depth'] + span['name'],
+             'ms': round(span['duration_ms'], 1),
+             'memory_kb': round(span['memory_delta_kb'], 1)}
+            for span in last['spans']
+        ]), hide_index=True, use_container_width=True)
+        st.dataframe(pd.DataFrame(profiler.summary()).round(1), hide_index=True, use_container_width=True)
+        st.download_button(
+            label="Download Trace (JSON)",
+            data=profiler.export_json,
+            file_name=f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            use_container_width=True
+        )
+
+@profiler.profile()
 def login_page():
     st.markdown(f"""
     <div style="text-align: center; padding: 50px;">
@@ -238,6 +780,7 @@ def login_page():
                 else:
                     st.error("Invalid username or password")
 
+@profiler.profile()
 def dashboard_page():
     st.markdown(f"""
     <div style="background: linear-gradient(90deg, {COLORS['primary']}, {COLORS['secondary']}); 
@@ -246,14 +789,15 @@ def dashboard_page():
         <p style="color: white; margin: 5px 0;">Welcome back, {st.session_state.user_role}: {st.session_state.username}</p>
     </div>
     """, unsafe_allow_html=True)
+    watch_for_changes()
     
     # Key Metrics
-    total_tasks = len(st.session_state.tasks)
-    completed_tasks = len([t for t in st.session_state.tasks if t['status'] == 'Completed'])
-    in_progress = len([t for t in st.session_state.tasks if t['status'] == 'In Progress'])
-    overdue_tasks = len([t for t in st.session_state.tasks 
-                        if datetime.strptime(t['end_date'], '%Y-%m-%d') < datetime.now() 
-                        and t['status'] != 'Completed'])
+    # Counts are maintained incrementally by the task store (or aggregated in SQLite)
+    metrics = get_dashboard_metrics()
+    total_tasks = metrics['total']
+    completed_tasks = metrics['completed']
+    in_progress = metrics['in_progress']
+    overdue_tasks = metrics['overdue']
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -261,7 +805,7 @@ def dashboard_page():
         st.metric(
             label="Total Tasks",
             value=total_tasks,
-            delta=f"+{len([t for t in st.session_state.tasks if t['created_date'].startswith(datetime.now().strftime('%Y-%m-%d'))])}"
+            delta=f"+{metrics['created_today']}"
         )
     
     with col2:
@@ -281,7 +825,8 @@ def dashboard_page():
         st.metric(
             label="Overdue",
             value=overdue_tasks,
-            delta="Critical" if overdue_tasks > 0 else "None"
+            delta="Critical" if overdue_tasks > 0 else "None",
+            help=f"{metrics['due_today']} more open task(s) due today"
         )
     
     # Charts
@@ -298,28 +843,149 @@ def dashboard_page():
         
         st.plotly_chart(fig_workload, use_container_width=True)
         
+        # Trends
+        st.subheader("Trends")
+        fig_burndown, fig_throughput, fig_cycle = create_trend_charts()
+        if fig_burndown:
+            st.plotly_chart(fig_burndown, use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(fig_throughput, use_container_width=True)
+            with col2:
+                st.plotly_chart(fig_cycle, use_container_width=True)
+        else:
+            st.info("No task history recorded yet.")
+        
         # Gantt Chart
         st.subheader("Project Timeline")
-        gantt_fig = create_gantt_chart()
+        today = datetime.now().date()
+        col_window, col_projects = st.columns([1, 2])
+        with col_window:
+            gantt_window = st.date_input("Timeline window", default_gantt_window(today), key="gantt_window")
+        with col_projects:
+            gantt_projects = st.multiselect("Projects", get_task_store().projects(), key="gantt_projects")
+        gantt_fig = create_gantt_chart(gantt_window, gantt_projects)
         if gantt_fig:
             st.plotly_chart(gantt_fig, use_container_width=True)
+            st.caption("Tasks outlined in red are on the critical path: any delay to them delays their project.")
+            if len(gantt_projects) == 1:
+                critical_path = get_task_store().critical_path(gantt_projects[0])
+                if critical_path:
+                    st.caption("Critical path: " + " → ".join(f"#{task['id']} {task['title']}" for task in critical_path))
+        else:
+            st.info("No tasks in the selected timeline window.")
         
         # Recent Tasks Table
         st.subheader("Recent Tasks")
-        df_display = pd.DataFrame(st.session_state.tasks)
-        if not df_display.empty:
-            df_display = df_display[['title', 'assigned_to', 'status', 'priority', 'end_date', 'progress', 'created_date', 'updated_date']]
-            # Sort by most recently updated
-            df_display = df_display.sort_values('updated_date', ascending=False) if 'updated_date' in df_display.columns else df_display
+        filters = render_task_filters("recent_tasks")
+        # The index keeps tasks ordered by update time, so only the shown rows are picked out
+        matching, recent_tasks = get_task_store().query_recent(filters, RECENT_TASKS_LIMIT)
+        if recent_tasks:
+            df_display = pd.DataFrame(recent_tasks, columns=['id', 'title', 'assigned_to', 'status', 'priority', 'end_date',
+                                                             'progress', 'created_date', 'updated_date']).set_index('id')
+            st.caption(f"{matching} matching tasks" + (f", showing the {len(recent_tasks)} most recently updated"
+                                                       if matching > len(recent_tasks) else ""))
             st.dataframe(df_display, use_container_width=True)
-            
-            # CSV export info
-            st.info(f"All tasks are automatically saved to '{TASKS_CSV_FILE}' - Total tasks: {len(st.session_state.tasks)}")
+        else:
+            st.info("No tasks match the selected filters.")
+        
+        # CSV export info
+        st.info(f"All tasks are automatically saved to '{get_storage().path}' - Total tasks: {len(st.session_state.tasks)}")
     else:
         st.info("No tasks available. Create your first task in the Task Management section!")
         st.info("Tasks will be automatically saved to CSV file for persistence.")
 
+def render_task_details(task: Dict, is_leader: bool):
+    if is_leader:
+        # Enhanced card display for team leader
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.write(f"**Priority:** {task['priority']}")
+            st.write(f"**Assigned to:** {task['assigned_to']}")
+            st.write(f"**Project:** {task.get('project', 'N/A')}")
+        
+        with col2:
+            st.write(f"**Status:** {task['status']}")
+            st.write(f"**Start Date:** {task['start_date']}")
+            st.write(f"**End Date:** {task['end_date']}")
+        
+        with col3:
+            st.write(f"**Progress:** {task['progress']}%")
+            st.write(f"**Created by:** {task['created_by']}")
+            st.write(f"**Created on:** {task['created_date']}")
+    else:
+        # Standard display for team members
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write(f"**Priority:** {task['priority']}")
+            st.write(f"**Assigned to:** {task['assigned_to']}")
+            st.write(f"**Project:** {task.get('project', 'N/A')}")
+        
+        with col2:
+            st.write(f"**Start Date:** {task['start_date']}")
+            st.write(f"**End Date:** {task['end_date']}")
+            st.write(f"**Progress:** {task['progress']}%")
+    
+    if task.get('description'):
+        st.write(f"**Description:** {task['description']}")
+    
+    if task.get('depends_on'):
+        slack = get_task_store().slack(task['id'])
+        st.write(f"**Depends on:** {format_dependencies(task['depends_on'])}"
+                 + (f" · **Slack:** {slack} days" if slack is not None else ""))
+    
+    # Progress bar
+    st.progress(task['progress'] / 100)
+
+def render_task_card(task: Dict, is_leader: bool):
+    """Expander for one task whose details are only built while it is open"""
+    if is_leader:
+        label = f"#{task['id']} - {task['title']} | Status: {task['status']} | Responsible: {task['assigned_to']}"
+    else:
+        label = f"#{task['id']} - {task['title']} ({task['status']})"
+    expander = st.expander(label, key=f"task_card_{task['id']}", on_change="rerun")
+    if expander.open:
+        with expander:
+            render_task_details(task, is_leader)
+
+def render_task_table(tasks: List[Dict], is_leader: bool, key: str):
+    """Compact single-table view of a page of tasks; details are shown for the selected row
+
+    The selection is a row position, so key must change whenever the rows
+    shown do (page, sort, filters) to start the new rows unselected.
+    """
+    df_page = pd.DataFrame(tasks, columns=['id', 'title', 'status', 'priority', 'assigned_to',
+                                           'project', 'start_date', 'end_date', 'progress'])
+    selection = st.dataframe(
+        df_page,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'id': st.column_config.NumberColumn("#", format="%d"),
+            'title': "Title",
+            'status': "Status",
+            'priority': "Priority",
+            'assigned_to': "Assigned to",
+            'project': "Project",
+            'start_date': "Start Date",
+            'end_date': "End Date",
+            'progress': st.column_config.ProgressColumn("Progress", min_value=0, max_value=100, format="%d%%")
+        },
+        on_select="rerun",
+        selection_mode="single-row",
+        key=key
+    )
+    rows = [row for row in selection.selection.rows if row < len(tasks)]
+    if rows:
+        task = tasks[rows[0]]
+        st.markdown(f"#### #{task['id']} - {task['title']}")
+        render_task_details(task, is_leader)
+
+@profiler.profile()
 def task_management_page():
+    from task_store import task_version
     st.markdown(f"""
     <div style="background: linear-gradient(90deg, {COLORS['accent']}, {COLORS['highlight']}); 
                 padding: 20px; border-radius: 10px; margin-bottom: 20px;">
@@ -350,26 +1016,30 @@ def task_management_page():
             
             description = st.text_area("Description")
             tags = st.text_input("Tags (comma-separated)")
+            depends_on = st.text_input("Depends on (task ids, comma-separated)", placeholder="#12, #15")
             
             submit = st.form_submit_button("Create Task", use_container_width=True)
             
             if submit:
                 if title and assigned_to and priority and status:
-                    task_data = {
-                        'title': title,
-                        'description': description,
-                        'assigned_to': assigned_to,
-                        'priority': priority,
-                        'status': status,
-                        'start_date': start_date.strftime('%Y-%m-%d'),
-                        'end_date': end_date.strftime('%Y-%m-%d'),
-                        'progress': progress,
-                        'project': project,
-                        'tags': [tag.strip() for tag in tags.split(',') if tag.strip()]
-                    }
-                    add_task(task_data)
-                    st.success("Task created successfully!")
-                    st.rerun()
+                    dependencies = read_dependencies(None, depends_on)
+                    if dependencies is not None:
+                        task_data = {
+                            'title': title,
+                            'description': description,
+                            'assigned_to': assigned_to,
+                            'priority': priority,
+                            'status': status,
+                            'start_date': start_date.strftime('%Y-%m-%d'),
+                            'end_date': end_date.strftime('%Y-%m-%d'),
+                            'progress': progress,
+                            'project': project,
+                            'tags': [tag.strip() for tag in tags.split(',') if tag.strip()],
+                            'depends_on': dependencies
+                        }
+                        if add_task(task_data):
+                            st.success("Task created successfully!")
+                            st.rerun()
                 else:
                     st.error("Please fill in all required fields marked with *")
     
@@ -378,14 +1048,28 @@ def task_management_page():
             st.subheader("Edit Existing Tasks")
             
             if st.session_state.tasks:
-                task_options = {f"#{task['id']} - {task['title']}": task['id'] 
-                              for task in st.session_state.tasks}
+                # Only the top matches for the query are sent to the browser
+                query = st.text_input("Search tasks", key="edit_task_search",
+                                      placeholder="Title, project, tag or #id")
+                matches = search_tasks(query)
+                if query.strip() and not matches:
+                    st.info("No tasks match your search.")
+                task_options = {f"#{task['id']} - {task['title']}": task 
+                              for task in matches}
                 
-                selected_task_key = st.selectbox("Select Task to Edit", list(task_options.keys()))
+                selected_task_key = st.selectbox("Select Task to Edit", list(task_options.keys()),
+                                                 help=f"Showing up to {TASK_PICKER_LIMIT} matches")
                 
                 if selected_task_key:
-                    task_id = task_options[selected_task_key]
-                    task = next(task for task in st.session_state.tasks if task['id'] == task_id)
+                    task_id = task_options[selected_task_key]['id']
+                    # Prefer the latest stored version in case another session just changed it
+                    task = get_task_store().get(task_id) or task_options[selected_task_key]
+                    
+                    # Remember which version the form was rendered from, so an update
+                    # submitted against an older version is rejected
+                    version_key = f"edit_task_version_{task_id}"
+                    seen_version = st.session_state.get(version_key, task_version(task))
+                    st.session_state[version_key] = task_version(task)
                     
                     # Check permissions
                     can_edit = ('edit' in st.session_state.permissions or 
@@ -414,6 +1098,8 @@ def task_management_page():
                                 new_progress = st.slider("Progress (%)", 0, 100, task['progress'])
                             
                             new_description = st.text_area("Description", task.get('description', ''))
+                            new_depends_on = st.text_input("Depends on (task ids, comma-separated)",
+                                                           format_dependencies(task.get('depends_on')))
                             
                             col_update, col_delete = st.columns(2)
                             
@@ -424,7 +1110,8 @@ def task_management_page():
                                 delete = st.form_submit_button("Delete Task", use_container_width=True, 
                                                              type="secondary") if 'delete' in st.session_state.permissions else None
                             
-                            if update:
+                            dependencies = read_dependencies(task_id, new_depends_on) if update else None
+                            if update and dependencies is not None:
                                 updated_data = {
                                     'title': new_title,
                                     'description': new_description,
@@ -434,16 +1121,17 @@ def task_management_page():
                                     'start_date': new_start.strftime('%Y-%m-%d'),
                                     'end_date': new_end.strftime('%Y-%m-%d'),
                                     'progress': new_progress,
-                                    'project': new_project
+                                    'project': new_project,
+                                    'depends_on': dependencies
                                 }
-                                update_task(task_id, updated_data)
-                                st.success("Task updated successfully!")
-                                st.rerun()
+                                if update_task(task_id, updated_data, expected_version=seen_version):
+                                    st.success("Task updated successfully!")
+                                    st.rerun()
                             
                             if delete and 'delete' in st.session_state.permissions:
-                                delete_task(task_id)
-                                st.success("Task deleted successfully!")
-                                st.rerun()
+                                if delete_task(task_id):
+                                    st.success("Task deleted successfully!")
+                                    st.rerun()
                     else:
                         st.warning("You don't have permission to edit this task.")
             else:
@@ -456,65 +1144,154 @@ def task_management_page():
         
         # For team leader, show all tasks; for members, show only their tasks
         if st.session_state.user_role == "Team Leader":
-            display_tasks = st.session_state.tasks
             st.info("As Team Leader, you can see all team tasks here.")
+            username = None
+        else:
+            username = st.session_state.username
+        filters = render_task_filters("my_tasks", username)
+        if any(filters.values()):
+            display_tasks = get_task_store().query(filters, username)
+        elif username is None:
+            display_tasks = st.session_state.tasks
         else:
-            display_tasks = get_user_tasks(st.session_state.username)
+            display_tasks = get_user_tasks(username)
         
         if display_tasks:
-            for task in display_tasks:
-                # Enhanced card display for team leader
-                if st.session_state.user_role == "Team Leader":
-                    with st.expander(f"#{task['id']} - {task['title']} | Status: {task['status']} | Responsible: {task['assigned_to']}"):
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            st.write(f"**Priority:** {task['priority']}")
-                            st.write(f"**Assigned to:** {task['assigned_to']}")
-                            st.write(f"**Project:** {task.get('project', 'N/A')}")
-                        
-                        with col2:
-                            st.write(f"**Status:** {task['status']}")
-                            st.write(f"**Start Date:** {task['start_date']}")
-                            st.write(f"**End Date:** {task['end_date']}")
-                        
-                        with col3:
-                            st.write(f"**Progress:** {task['progress']}%")
-                            st.write(f"**Created by:** {task['created_by']}")
-                            st.write(f"**Created on:** {task['created_date']}")
-                        
-                        if task.get('description'):
-                            st.write(f"**Description:** {task['description']}")
-                        
-                        # Progress bar
-                        st.progress(task['progress'] / 100)
-                else:
-                    # Standard display for team members
-                    with st.expander(f"#{task['id']} - {task['title']} ({task['status']})"):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.write(f"**Priority:** {task['priority']}")
-                            st.write(f"**Assigned to:** {task['assigned_to']}")
-                            st.write(f"**Project:** {task.get('project', 'N/A')}")
-                        
-                        with col2:
-                            st.write(f"**Start Date:** {task['start_date']}")
-                            st.write(f"**End Date:** {task['end_date']}")
-                            st.write(f"**Progress:** {task['progress']}%")
-                        
-                        if task.get('description'):
-                            st.write(f"**Description:** {task['description']}")
-                        
-                        # Progress bar
-                        st.progress(task['progress'] / 100)
+            is_leader = st.session_state.user_role == "Team Leader"
+            
+            col_view, col_sort, col_order, col_size = st.columns(4)
+            with col_view:
+                view_mode = st.radio("View", ["Table", "Cards"], horizontal=True, key="my_tasks_view")
+            with col_sort:
+                sort_by = st.selectbox("Sort by", list(TASK_SORT_KEYS), key="my_tasks_sort")
+            with col_order:
+                descending = st.toggle("Descending", True, key="my_tasks_descending")
+            with col_size:
+                page_size = st.selectbox("Tasks per page", MY_TASKS_PAGE_SIZES, index=1, key="my_tasks_page_size")
+            
+            # Only the current page is sorted out of the full list and sent to the browser
+            total_pages = max(1, math.ceil(len(display_tasks) / page_size))
+            if st.session_state.get("my_tasks_page", 1) > total_pages:
+                st.session_state.my_tasks_page = total_pages
+            page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, key="my_tasks_page")
+            page_tasks = paginate_tasks(display_tasks, sort_by, descending, page, page_size)
+            first = (page - 1) * page_size + 1
+            st.caption(f"Showing {first}-{first + len(page_tasks) - 1} of {len(display_tasks)} tasks")
+            
+            if view_mode == "Table":
+                # A new selection for every page, ordering and filter combination
+                table_key = json.dumps([page, page_size, sort_by, descending, filters], sort_keys=True, default=str)
+                render_task_table(page_tasks, is_leader, key=f"my_tasks_table_{table_key}")
+            else:
+                for task in page_tasks:
+                    render_task_card(task, is_leader)
         else:
-            if st.session_state.user_role == "Team Leader":
+            if any(filters.values()):
+                st.info("No tasks match the selected filters.")
+            elif st.session_state.user_role == "Team Leader":
                 st.info("No tasks available in the system yet.")
             else:
                 st.info("No tasks assigned to you yet.")
 
+def bulk_upload_page():
+    from task_import import IMPORT_COLUMNS, prepare_import
+    st.markdown(f"""
+    <div style="background: linear-gradient(90deg, {COLORS['secondary']}, {COLORS['accent']}); 
+                padding: 20px; border-radius: 10px; margin-bottom: 20px;">
+        <h1 style="color: white; margin: 0;">Bulk Upload</h1>
+        <p style="color: white; margin: 5px 0;">Import tasks from a file and change many tasks at once</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if st.session_state.user_role != "Team Leader":
+        st.warning("Only the Team Leader can import or change tasks in bulk.")
+        return
+    
+    tab1, tab2 = st.tabs(["Import Tasks", "Batch Edit"])
+    
+    with tab1:
+        st.subheader("Import Tasks from CSV")
+        st.caption("Only the title column is required. Missing values default to Medium priority, "
+                   "Not Started, today's start date and a one-week duration; rows without an assignee "
+                   "are assigned to you. Dependencies must refer to tasks that already exist.")
+        st.download_button(
+            label="Download Template",
+            data=",".join(IMPORT_COLUMNS) + "\n",
+            file_name="task_import_template.csv",
+            mime="text/csv"
+        )
+        if 'bulk_upload_imported' in st.session_state:
+            st.success(f"Imported {st.session_state.pop('bulk_upload_imported')} tasks.")
+        # A new key after each import clears the uploader, so the same file can't be imported twice
+        upload_round = st.session_state.get('bulk_upload_round', 0)
+        uploaded = st.file_uploader("Tasks file", type=["csv"], key=f"bulk_upload_file_{upload_round}")
+        
+        tasks = None
+        if uploaded is not None:
+            try:
+                # Read everything as text; prepare_import parses and checks each column
+                frame = pd.read_csv(uploaded, dtype=str, keep_default_na=False)
+                # Dependencies are checked against the tasks as they are now, so one bad
+                # reference rejects its row instead of failing the whole import
+                tasks, rejected = prepare_import(frame, USERS, st.session_state.username,
+                                                 datetime.now().date(), known_ids=get_task_store())
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        
+        if tasks is not None:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Valid Rows", len(tasks))
+            with col2:
+                st.metric("Rejected Rows", len(rejected))
+            
+            if len(rejected):
+                st.markdown("#### Rejected Rows")
+                st.dataframe(rejected, use_container_width=True, hide_index=True)
+            
+            if tasks:
+                st.markdown("#### Preview")
+                st.dataframe(pd.DataFrame(tasks[:RECENT_TASKS_LIMIT]), use_container_width=True, hide_index=True)
+                if st.button(f"Import {len(tasks)} Tasks", use_container_width=True):
+                    imported = bulk_add_tasks(tasks)
+                    if imported:
+                        st.session_state.bulk_upload_imported = imported
+                        st.session_state.bulk_upload_round = upload_round + 1
+                        st.rerun()
+    
+    with tab2:
+        st.subheader("Change Tasks in Bulk")
+        filters = render_task_filters("bulk_edit")
+        if not any(filters.values()):
+            st.info("Select filters to choose the tasks to change.")
+            return
+        task_ids = [task['id'] for task in get_task_store().query(filters)]
+        st.caption(f"{len(task_ids)} tasks match the selected filters")
+        if not task_ids:
+            return
+        
+        action = st.radio("Action", ["Reassign", "Change status", "Delete"], horizontal=True, key="bulk_edit_action")
+        if action == "Reassign":
+            assignee = st.selectbox("Assign To", list(USERS.keys()), key="bulk_edit_assignee")
+            if st.button(f"Reassign {len(task_ids)} Tasks", use_container_width=True):
+                st.success(f"Reassigned {bulk_reassign_tasks(task_ids, assignee)} tasks to {assignee}.")
+                st.rerun()
+        elif action == "Change status":
+            status = st.selectbox("Status", list(STATUS_ORDER), key="bulk_edit_status")
+            if st.button(f"Update {len(task_ids)} Tasks", use_container_width=True):
+                st.success(f"Updated {bulk_update_tasks(task_ids, {'status': status})} tasks.")
+                st.rerun()
+        else:
+            confirm = st.checkbox(f"Yes, delete {len(task_ids)} tasks", key="bulk_edit_confirm")
+            if st.button(f"Delete {len(task_ids)} Tasks", use_container_width=True, disabled=not confirm):
+                st.success(f"Deleted {bulk_delete_tasks(task_ids)} tasks.")
+                st.rerun()
+
 def main():
+    with profiler.rerun():
+        run_app()
+
+def run_app():
     # Page config
     st.set_page_config(
         page_title="Team Task Manager",
@@ -523,66 +1300,22 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Custom CSS
-    st.markdown(f"""
-    <style>
-        * {{
-            font-family: Arial, sans-serif !important;
-        }}
-        .stApp {{
-            background-color: #f8f9fa;
-            font-family: Arial, sans-serif !important;
-        }}
-        .metric-card {{
-            background: white;
-            padding: 1rem;
-            border-radius: 10px;
-            border-left: 4px solid {COLORS['primary']};
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            font-family: Arial, sans-serif !important;
-        }}
-        .stButton > button {{
-            background-color: {COLORS['primary']};
-            color: white;
-            border: none;
-            border-radius: 5px;
-            padding: 0.5rem 1rem;
-            font-family: Arial, sans-serif !important;
-        }}
-        .stButton > button:hover {{
-            background-color: {COLORS['secondary']};
-        }}
-        .stSelectbox > div > div > div {{
-            font-family: Arial, sans-serif !important;
-        }}
-        .stTextInput > div > div > input {{
-            font-family: Arial, sans-serif !important;
-        }}
-        .stTextArea > div > div > textarea {{
-            font-family: Arial, sans-serif !important;
-        }}
-        .stMarkdown, .stMarkdown * {{
-            font-family: Arial, sans-serif !important;
-        }}
-        .stDataFrame {{
-            font-family: Arial, sans-serif !important;
-        }}
-        h1, h2, h3, h4, h5, h6 {{
-            font-family: Arial, sans-serif !important;
-        }}
-        p, span, div {{
-            font-family: Arial, sans-serif !important;
-        }}
-    </style>
-    """, unsafe_allow_html=True)
+    # Custom CSS, compiled once per process
+    st.markdown(get_stylesheet(), unsafe_allow_html=True)
+    
+    if TASKS_WARM_UP:
+        warm_up()
     
     init_session_state()
     
     if not st.session_state.authenticated:
         login_page()
     else:
+        # Hourly incremental backups, written by the persistence worker
+        schedule_backup()
+        
         # Sidebar
-        with st.sidebar:
+        with st.sidebar, profiler.span('sidebar'):
             st.markdown(f"""
             <div style="text-align: center; padding: 20px; background: {COLORS['primary']}; 
                         border-radius: 10px; margin-bottom: 20px;">
@@ -591,9 +1324,12 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
+            pages = ["Dashboard", "Task Management"]
+            if st.session_state.user_role == "Team Leader":
+                pages.append("Bulk Upload")
             page = st.radio(
                 "Navigation",
-                ["Dashboard", "Task Management"],
+                pages,
                 key="navigation"
             )
             
@@ -609,24 +1345,20 @@ def main():
                 my_tasks = len(get_user_tasks(st.session_state.username))
                 st.metric("My Tasks", my_tasks)
                 
-                completed_today = len([t for t in st.session_state.tasks 
-                                     if t['status'] == 'Completed' and 
-                                     t.get('updated_date', '').startswith(datetime.now().strftime('%Y-%m-%d'))])
+                completed_today = get_dashboard_metrics()['completed_today']
                 st.metric("Completed Today", completed_today)
                 
                 # CSV info
                 st.markdown("---")
                 st.markdown("### Data Storage")
-                if os.path.exists(TASKS_CSV_FILE):
-                    file_size = os.path.getsize(TASKS_CSV_FILE)
-                    st.write(f"CSV File: {file_size} bytes")
+                storage = get_storage()
+                if storage.exists() or os.path.exists(TASKS_LOG_FILE):
+                    st.write(f"{TASKS_STORAGE_BACKEND.upper()} File: {storage.size()} bytes")
                     
-                    # Download CSV button
-                    with open(TASKS_CSV_FILE, 'r') as f:
-                        csv_data = f.read()
+                    # Download CSV button (contents are generated on click)
                     st.download_button(
                         label="Download CSV",
-                        data=csv_data,
+                        data=read_csv_for_download,
                         file_name=f"team_tasks_{datetime.now().strftime('%Y%m%d')}.csv",
                         mime="text/csv",
                         use_container_width=True
@@ -635,17 +1367,35 @@ def main():
                     # Backup button (only for team leader)
                     if st.session_state.user_role == "Team Leader":
                         if st.button("Create Backup", use_container_width=True):
-                            backup_file = backup_csv()
-                            if backup_file:
-                                st.success(f"Backup created: {backup_file}")
+                            if backup_csv():
+                                st.success("Backup started")
+                        backups = get_backup_manager().entries()
+                        if backups:
+                            st.caption(f"Last backup: {backups[-1]['created'][:16].replace('T', ' ')} "
+                                       f"({backups[-1]['kind']}), {len(backups)} restore points kept")
+                    
+                    worker_error = get_persistence_worker().last_error
+                    if worker_error is not None:
+                        st.warning(f"Last background save failed: {str(worker_error)}")
                 else:
                     st.write("No CSV file yet")
+            
+            # Profiler panel (only when profiling is enabled, for the team leader)
+            if profiler.enabled and st.session_state.user_role == "Team Leader":
+                st.markdown("---")
+                render_profiler_panel()
         
         # Main content
+        failure = save_failure()
+        if failure is not None:
+            st.warning(f"Changes are not being saved to disk: {str(failure)}. They are kept in memory "
+                       "and retried until storage recovers; keep the app running until this message goes away.")
         if page == "Dashboard":
             dashboard_page()
         elif page == "Task Management":
             task_management_page()
+        elif page == "Bulk Upload":
+            bulk_upload_page()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,224 @@
+"""Incremental backups with retention and point-in-time restore.
+
+A backup is either a full snapshot of every task or a delta holding the rows
+changed since the last full snapshot, both as gzip-compressed JSON lines.
+Deltas are differential (always against the last full), so restoring any
+point reads at most two files and any delta can be pruned on its own.
+
+Restore the tasks as they were at a point in time into a snapshot file with:
+
+    python backups.py restore backups/ team_tasks.csv --at "2024-05-01 12:00"
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from locking import FileLock, atomic_write
+from storage import storage_for_path
+
+# A new full snapshot is taken when the last one is older than this...
+FULL_EVERY = timedelta(days=1)
+# ...or when more than this share of the rows changed since it
+FULL_CHANGE_FRACTION = 0.5
+# Automatic backups are taken at most this often
+BACKUP_INTERVAL = timedelta(hours=1)
+KEEP_HOURLY = 24
+KEEP_DAILY = 7
+MANIFEST = 'manifest.json'
+TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S_%f'
+
+
+def _fingerprint(task: Dict) -> str:
+    return json.dumps(task, sort_keys=True, default=str)
+
+
+class BackupManager:
+    """Takes full and delta backups into a directory and restores them.
+
+    The manifest lists every backup with its kind, time and base snapshot.
+    The rows of the last full snapshot are kept in memory to find the
+    changed rows; after a restart they are reloaded from it. The store
+    replaces a task dict on every change instead of mutating it, so a row
+    that is still the very same object is unchanged and is not serialized.
+
+    The manifest, under its file lock, is the only record of when the last
+    backup was taken, so several app processes sharing the directory take
+    one automatic backup per interval between them.
+    """
+
+    def __init__(self, directory: str, keep_hourly: int = KEEP_HOURLY, keep_daily: int = KEEP_DAILY,
+                 full_every: timedelta = FULL_EVERY, interval: timedelta = BACKUP_INTERVAL):
+        self.directory = directory
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+        self.full_every = full_every
+        self.interval = interval
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self._lock = FileLock(self.manifest_path)
+        self._base_name: Optional[str] = None
+        self._base_rows: Dict[int, Dict] = {}
+        # Set while an automatic backup is queued, so reruns do not queue another
+        self.scheduled = threading.Event()
+
+    # Manifest
+    def entries(self) -> List[Dict]:
+        """Backups, oldest first"""
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_entries(self, entries: List[Dict]):
+        with atomic_write(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=1)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write_lines(self, name: str, records: List[Dict]):
+        with atomic_write(self._path(name), 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for record in records:
+                f.write((json.dumps(record, default=str) + '\n').encode('utf-8'))
+
+    def _read_lines(self, name: str) -> List[Dict]:
+        with gzip.open(self._path(name), 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # Backup
+    def _due(self, entries: List[Dict], now: datetime) -> bool:
+        return not entries or now - datetime.fromisoformat(entries[-1]['created']) >= self.interval
+
+    def due(self, now: datetime) -> bool:
+        """Whether an automatic backup should be taken, by any process sharing the directory"""
+        if not os.path.exists(self.manifest_path):
+            return True
+        with self._lock:
+            return self._due(self.entries(), now)
+
+    def backup(self, tasks: List[Dict], now: Optional[datetime] = None, if_due: bool = False) -> Optional[Dict]:
+        """Back up tasks as a delta against the last full snapshot, or as a new full one
+
+        With if_due, nothing is written (and None returned) unless a backup
+        is due, since another process may have taken one after the caller
+        checked ``due``.
+        """
+        now = now or datetime.now()
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            entries = self.entries()
+            if if_due and not self._due(entries, now):
+                return None
+            base = next((entry for entry in reversed(entries) if entry['kind'] == 'full'), None)
+            if base is not None and self._base_name != base['name']:
+                self._load_base(base['name'])
+            full = base is None or now - datetime.fromisoformat(base['created']) >= self.full_every
+            if not full:
+                changed, deleted = self._diff(tasks)
+                full = len(changed) + len(deleted) > max(1, len(tasks)) * FULL_CHANGE_FRACTION
+            if full:
+                entry = {'name': f"full_{now.strftime(TIMESTAMP_FORMAT)}.jsonl.gz", 'kind': 'full',
+                         'created': now.isoformat(), 'base': None, 'tasks': len(tasks)}
+                self._write_lines(entry['name'], tasks)
+                self._base_name = entry['name']
+                self._base_rows = {task['id']: task for task in tasks}
+            else:
+                entry = {'name': f"delta_{now.strftime(TIMESTAMP_FORMAT)}.jsonl.gz", 'kind': 'delta',
+                         'created': now.isoformat(), 'base': base['name'], 'tasks': len(tasks),
+                         'changed': len(changed), 'deleted': len(deleted)}
+                self._write_lines(entry['name'], [{'op': 'upsert', 'task': task} for task in changed]
+                                  + [{'op': 'delete', 'id': task_id} for task_id in deleted])
+            entries.append(entry)
+            kept, dropped = self._prune(entries)
+            # Files go only once the manifest no longer lists them; a crash in between leaves strays, not gaps
+            self._write_entries(kept)
+            for entry_name in dropped:
+                if os.path.exists(self._path(entry_name)):
+                    os.remove(self._path(entry_name))
+            return entry
+
+    def _load_base(self, name: str):
+        self._base_name = name
+        self._base_rows = {task['id']: task for task in self._read_lines(name)}
+
+    def _diff(self, tasks: List[Dict]):
+        """Tasks changed since the base snapshot, and ids deleted since it"""
+        base_rows = self._base_rows
+        changed = []
+        for task in tasks:
+            old = base_rows.get(task['id'])
+            if old is task:
+                continue
+            if old is not None and _fingerprint(old) == _fingerprint(task):
+                # Same content in a new object; compare by identity next time
+                base_rows[task['id']] = task
+                continue
+            changed.append(task)
+        ids = {task['id'] for task in tasks}
+        deleted = [task_id for task_id in base_rows if task_id not in ids]
+        return changed, deleted
+
+    # Retention
+    def _prune(self, entries: List[Dict]):
+        """Entries to keep and names of the files to remove
+
+        The newest backup per hour is kept for keep_hourly hours and per day for keep_daily days.
+        """
+        keep = {entries[-1]['name']}
+        for bucket_format, count in (('%Y%m%d%H', self.keep_hourly), ('%Y%m%d', self.keep_daily)):
+            buckets = set()
+            for entry in reversed(entries):
+                bucket = datetime.fromisoformat(entry['created']).strftime(bucket_format)
+                if bucket not in buckets and len(buckets) < count:
+                    buckets.add(bucket)
+                    keep.add(entry['name'])
+        # A kept delta needs its full snapshot
+        keep |= {entry['base'] for entry in entries if entry['name'] in keep and entry['base']}
+        kept = [entry for entry in entries if entry['name'] in keep]
+        dropped = [entry['name'] for entry in entries if entry['name'] not in keep]
+        return kept, dropped
+
+    # Restore
+    def restore(self, at: Optional[datetime] = None) -> List[Dict]:
+        """The tasks as of the newest backup taken at or before at (default: the newest backup)"""
+        entries = [entry for entry in self.entries()
+                   if at is None or datetime.fromisoformat(entry['created']) <= at]
+        if not entries:
+            raise ValueError(f"No backup at or before {at}")
+        entry = entries[-1]
+        if entry['kind'] == 'full':
+            return self._read_lines(entry['name'])
+        tasks_by_id = {task['id']: task for task in self._read_lines(entry['base'])}
+        for record in self._read_lines(entry['name']):
+            if record['op'] == 'upsert':
+                tasks_by_id[record['task']['id']] = record['task']
+            else:
+                tasks_by_id.pop(record['id'], None)
+        return sorted(tasks_by_id.values(), key=lambda task: task['id'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Restore tasks from incremental backups')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='list the backups').add_argument('directory')
+    restore_parser = commands.add_parser('restore', help='write the tasks as of a point in time to a snapshot file')
+    restore_parser.add_argument('directory')
+    restore_parser.add_argument('dest', help='snapshot file to write (.csv, .parquet or .db)')
+    restore_parser.add_argument('--at', type=datetime.fromisoformat, help='point in time (default: latest)')
+    args = parser.parse_args()
+
+    manager = BackupManager(args.directory)
+    if args.command == 'list':
+        for entry in manager.entries():
+            print(f"{entry['created']}  {entry['kind']:<5}  {entry['tasks']:>8} tasks  {entry['name']}")
+        return
+    tasks = manager.restore(args.at)
+    storage_for_path(args.dest).save(tasks)
+    print(f"Restored {len(tasks)} tasks to {args.dest}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Bulk import vs. one task at a time, and id allocation under concurrent writers.
+
+Validates an import of 5,000 rows with prepare_import, then times adding
+them one by one against a single bulk_add on the change log and on SQLite.
+Then several processes allocate ids from one IdAllocator file, and must get
+disjoint ids, and a deleted task's id must not be handed out again after a
+restart, whether the allocator reserves ids from its file or hands them out
+from memory and saves the mark through a persistence worker.
+
+Run from the repository root:
+
+    python benchmarks/bench_bulk.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from ids import IdAllocator  # noqa: E402
+from persistence import PersistenceWorker  # noqa: E402
+from storage import CsvStorage, SqliteStorage  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+from task_import import IMPORT_COLUMNS, prepare_import  # noqa: E402
+from task_log import TaskLog  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+ROWS = 5_000
+PROCESSES = 4
+ALLOCATIONS_PER_PROCESS = 500
+USERS = ['jproano', 'vpacheco', 'dguerra']
+
+
+def open_log(backend, tmp):
+    if backend == 'sqlite':
+        return SqliteStorage(os.path.join(tmp, 'tasks.db'))
+    storage = CsvStorage(os.path.join(tmp, 'tasks.csv'))
+    return TaskLog(os.path.join(tmp, 'tasks.log'), storage.load, storage.save)
+
+
+def import_rows():
+    frame = pd.DataFrame(generate_tasks(ROWS))
+    frame['assigned_to'] = [USERS[i % len(USERS)] for i in range(ROWS)]
+    frame['tags'] = frame['tags'].map(', '.join)
+    # Files arrive as text
+    return frame[[column for column in IMPORT_COLUMNS if column != 'depends_on']].astype(str)
+
+
+def time_adds(backend, tasks, bulk):
+    with tempfile.TemporaryDirectory() as tmp:
+        log = open_log(backend, tmp)
+        store = TaskStore([], log=log, ids=IdAllocator(os.path.join(tmp, 'tasks.ids')))
+        start = time.perf_counter()
+        if bulk:
+            store.bulk_add(tasks)
+        else:
+            for task in tasks:
+                store.add(task)
+        elapsed = time.perf_counter() - start
+        # Let a compaction started by the appends finish before reading everything back
+        log.compact()
+        reloaded = TaskStore.from_feed(open_log(backend, tmp))
+        assert len(reloaded) == len(tasks)
+        return elapsed
+
+
+def allocate(path, block, results):
+    allocator = IdAllocator(path, block=block)
+    results.put([allocator.allocate() for _ in range(ALLOCATIONS_PER_PROCESS)])
+
+
+def check_allocator(block):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tasks.ids')
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=allocate, args=(path, block, results)) for _ in range(PROCESSES)]
+        for process in processes:
+            process.start()
+        ids = [task_id for _ in processes for task_id in results.get()]
+        for process in processes:
+            process.join()
+        return len(ids) == len(set(ids)) == PROCESSES * ALLOCATIONS_PER_PROCESS
+
+
+def check_no_reuse(worker):
+    """Whether a restart skips a deleted task's id, and the id after it follows on without a gap"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tasks.ids')
+        if worker:
+            log = PersistenceWorker(open_log('csv', tmp))
+            store = TaskStore([], log, ids=IdAllocator(path, writer=log))
+        else:
+            store = TaskStore([], ids=IdAllocator(path, block=1))
+        last = store.bulk_add(generate_tasks(10))[-1]['id']
+        store.delete(last)
+        if worker:
+            log.close()
+        # A restart loads the tasks left, whose highest id is now last - 1
+        restarted = TaskStore(store.all(), ids=IdAllocator(path))
+        return restarted.add(generate_tasks(1)[0])['id'] == last + 1
+
+
+def main():
+    frame = import_rows()
+    start = time.perf_counter()
+    tasks, rejected = prepare_import(frame, USERS, 'jproano', date.today())
+    validate_ms = (time.perf_counter() - start) * 1000
+    assert len(tasks) == ROWS and rejected.empty
+    print(f"prepare_import: {ROWS} rows validated in {validate_ms:.0f} ms")
+
+    print(f"{'backend':>8} {'one by one s':>13} {'bulk_add s':>11} {'speedup':>8}")
+    for backend in ('csv', 'sqlite'):
+        single = time_adds(backend, tasks, bulk=False)
+        bulk = time_adds(backend, tasks, bulk=True)
+        print(f"{backend:>8} {single:>13.2f} {bulk:>11.3f} {single / bulk:>7.0f}x")
+
+    for block in (1, 100):
+        print(f"{PROCESSES} processes, block={block}: ids unique {check_allocator(block)}")
+    for worker in (False, True):
+        print(f"deleted id skipped after restart{' (mark saved by the worker)' if worker else ''}: "
+              f"{check_no_reuse(worker)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Stress test of the persistence layer under concurrent writers.
+
+Spawns writer threads against one TaskStore (change log + CSV snapshot with
+frequent background compaction), then writer processes against one shared
+log, and checks that nothing was lost or torn. Also races optimistic updates
+on a single task.
+
+Run from the repository root:
+
+    python benchmarks/bench_concurrency.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CsvStorage  # noqa: E402
+from task_log import TaskLog  # noqa: E402
+from task_store import StaleTaskError, TaskStore, task_version  # noqa: E402
+
+THREADS = [1, 4, 16, 64]
+WRITES_PER_THREAD = 200
+PROCESSES = 8
+WRITES_PER_PROCESS = 500
+
+
+def new_task(i):
+    return {'title': f'Task {i}', 'assigned_to': 'vpacheco', 'created_by': 'jproano',
+            'status': 'Not Started', 'priority': 'Low', 'project': 'Stress', 'tags': ['stress'],
+            'start_date': '2024-01-01', 'end_date': '2024-01-31', 'progress': 0}
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def thread_writers(tmp):
+    print(f"{'threads':>8} {'writes':>8} {'writes/s':>10} {'consistent':>11}")
+    for count in THREADS:
+        storage = CsvStorage(os.path.join(tmp, f'threads_{count}.csv'))
+        log = TaskLog(os.path.join(tmp, f'threads_{count}.log'), storage.load, storage.save, compact_every=100)
+        store = TaskStore([], log)
+
+        def writer(n):
+            for i in range(WRITES_PER_THREAD):
+                task = store.add(new_task(i))
+                store.update(task['id'], {'progress': 50})
+
+        elapsed = run_threads(writer, count)
+        writes = count * WRITES_PER_THREAD * 2
+        log.compact()
+        reloaded = {task['id']: task for task in log.replay(storage.load())}
+        consistent = (len(reloaded) == len(store)
+                      and all(reloaded[task['id']]['progress'] == 50 for task in store.all()))
+        print(f"{count:>8} {writes:>8} {writes / elapsed:>10.0f} {str(consistent):>11}")
+
+
+def process_writer(log_path, csv_path, n):
+    storage = CsvStorage(csv_path)
+    log = TaskLog(log_path, storage.load, storage.save, compact_every=WRITES_PER_PROCESS * PROCESSES + 1)
+    for i in range(WRITES_PER_PROCESS):
+        task_id = n * WRITES_PER_PROCESS + i + 1
+        log.append('create', task_id, {**new_task(i), 'id': task_id})
+
+
+def process_writers(tmp):
+    log_path, csv_path = os.path.join(tmp, 'processes.log'), os.path.join(tmp, 'processes.csv')
+    processes = [multiprocessing.Process(target=process_writer, args=(log_path, csv_path, n))
+                 for n in range(PROCESSES)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    storage = CsvStorage(csv_path)
+    log = TaskLog(log_path, storage.load, storage.save)
+    expected = PROCESSES * WRITES_PER_PROCESS
+    found = len(log.replay([]))
+    print(f"{PROCESSES} processes: {expected} appends in {elapsed:.2f}s, {found} records replayed "
+          f"({'ok' if found == expected else 'LOST WRITES'})")
+
+
+def optimistic_updates():
+    store = TaskStore([])
+    task_id = store.add(new_task(0))['id']
+    applied = []
+    conflicts = []
+
+    def editor(n):
+        for _ in range(100):
+            seen = task_version(store.get(task_id))
+            # Let other editors run between reading and writing, like a user filling in a form
+            time.sleep(0.0001)
+            try:
+                store.update(task_id, {'progress': n}, expected_version=seen)
+                applied.append(n)
+            except StaleTaskError:
+                conflicts.append(n)
+
+    run_threads(editor, 16)
+    final_version = task_version(store.get(task_id))
+    print(f"optimistic updates: {len(applied)} applied, {len(conflicts)} rejected, final version "
+          f"{final_version} ({'ok' if final_version == len(applied) + 1 else 'LOST UPDATES'})")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        thread_writers(tmp)
+        process_writers(tmp)
+    optimistic_updates()
+
+
+if __name__ == '__main__':
+    main()
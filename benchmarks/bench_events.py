@@ -0,0 +1,121 @@
+"""Enqueue latency and delivery throughput of task change events under burst load.
+
+A burst of updates goes through a TaskStore, as a flood of form submits or
+a bulk edit would. This is timed three ways:
+
+- without events;
+- with events delivered synchronously on the submit path, one send per change;
+- with the event bus.
+
+The sink is a StubSink that takes 5 ms per send, like a nearby webhook. For
+the bus, the script reports per-submit latency, how long the bus takes to
+deliver the burst, and how many events it dropped. It then repeats the
+burst against a sink whose sends fail 30% of the time, to show what the
+retries cost. Finally it publishes more events than the queue and a stalled
+sink's backlog hold, to show that publishing does not block when they are
+full.
+
+Updates that leave a task unchanged publish no event, so a burst publishes
+slightly fewer events than it has submits.
+
+Run from the repository root:
+
+    python benchmarks/bench_events.py
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import EventBus, StubSink, task_event  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+TASKS = 10_000
+BURSTS = [1_000, 10_000]
+SEND_LATENCY = 0.005
+# Synchronous delivery takes SEND_LATENCY per submit, so only this many are timed
+SYNC_SUBMITS = 200
+STATUSES = ['Not Started', 'In Progress', 'On Hold', 'Completed']
+
+
+class SyncEvents:
+    """Sends each change's event as soon as it is published, on the calling thread"""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def publish_many(self, events):
+        for event in events:
+            self.sink.send([event])
+
+
+def burst(store, n):
+    """Per-submit latencies in microseconds of n status changes"""
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        store.update(1 + i % TASKS, {'status': STATUSES[i % len(STATUSES)], 'progress': i % 100})
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def percentile(samples, q):
+    return statistics.quantiles(samples, n=100)[q - 1]
+
+
+def report(label, samples, extra=''):
+    print(f"{label:<34} {statistics.median(samples):>8.1f} {percentile(samples, 99):>8.1f} "
+          f"{max(samples):>9.1f}  {extra}")
+
+
+def run_bus(tasks, n, sink, **kwargs):
+    bus = EventBus([sink], **kwargs)
+    store = TaskStore(tasks, events=bus)
+    start = time.perf_counter()
+    samples = burst(store, n)
+    bus.flush()
+    elapsed = time.perf_counter() - start
+    stats = bus.stats()
+    bus.close()
+    return samples, elapsed, stats
+
+
+def main():
+    tasks = generate_tasks(TASKS)
+    print(f"{'submit latency (us)':<34} {'p50':>8} {'p99':>8} {'max':>9}")
+    report("no events", burst(TaskStore(tasks), BURSTS[-1]))
+    sync_store = TaskStore(tasks, events=SyncEvents(StubSink(latency=SEND_LATENCY)))
+    report("synchronous send", burst(sync_store, SYNC_SUBMITS), f"({SYNC_SUBMITS} submits)")
+
+    for n in BURSTS:
+        sink = StubSink(latency=SEND_LATENCY)
+        samples, elapsed, stats = run_bus(tasks, n, sink)
+        report(f"event bus, burst of {n}", samples,
+               f"published {stats['published']}, delivered {stats['delivered']} in {len(sink.batches)} batches, "
+               f"{elapsed:.2f} s ({stats['delivered'] / elapsed:,.0f} events/s), dropped {stats['dropped']}")
+
+    sink = StubSink(latency=SEND_LATENCY, failure_rate=0.3, seed=7)
+    samples, elapsed, stats = run_bus(tasks, BURSTS[-1], sink, backoff=0.05)
+    report("event bus, 30% failing sends", samples,
+           f"published {stats['published']}, delivered {stats['delivered']}, {stats['retried']} retries, "
+           f"failed {stats['failed']}, {elapsed:.2f} s")
+
+    # Overload: a sink far too slow for the burst. The queue fills up once the sink's
+    # backlog (SINK_BACKLOG batches) is full, and later events are dropped
+    event = task_event(tasks[0], {**tasks[0], 'status': 'Completed'})
+    bus = EventBus([StubSink(latency=0.5)], max_queue=1_000)
+    samples = []
+    for _ in range(BURSTS[-1]):
+        start = time.perf_counter()
+        bus.publish(event)
+        samples.append((time.perf_counter() - start) * 1e6)
+    stats = bus.stats()
+    bus.close(timeout=0)
+    report("publish into a full queue", samples, f"accepted {stats['published']}, dropped {stats['dropped']}")
+
+
+if __name__ == '__main__':
+    main()
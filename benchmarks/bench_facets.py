@@ -0,0 +1,86 @@
+"""Faceted filtering with bitmap indexes vs. pandas boolean masks.
+
+For a filter on status, project and a due-date range, times the matching
+count, the facet counts of every filter field and the 100 most recently
+updated matches, against the same work done on a task DataFrame (the
+dashboard sorted the whole frame by updated_date on every rerun).
+
+Run from the repository root:
+
+    python benchmarks/bench_facets.py
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from facets import DUE, FACET_FIELDS, FacetIndex  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+
+SIZES = [10_000, 100_000, 500_000]
+REPEAT = 5
+LIMIT = 100
+FILTERS = {'status': ['Not Started', 'In Progress'], 'project': ['Project 3', 'Project 7'],
+           DUE: (date(2024, 3, 1), date(2024, 8, 31))}
+
+
+def median_ms(fn):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def pandas_query(df):
+    due = pd.to_datetime(df['end_date'])
+    masks = {
+        'status': df['status'].isin(FILTERS['status']),
+        'project': df['project'].isin(FILTERS['project']),
+        DUE: due.between(pd.Timestamp(FILTERS[DUE][0]), pd.Timestamp(FILTERS[DUE][1])),
+    }
+    mask = masks['status'] & masks['project'] & masks[DUE]
+    for field in FACET_FIELDS:
+        # Facet counts apply every filter except the field's own
+        others = [m for name, m in masks.items() if name != field]
+        base = others[0]
+        for m in others[1:]:
+            base = base & m
+        column = df.loc[base, field]
+        if field == 'tags':
+            column = column.explode()
+        column.value_counts()
+    return int(mask.sum()), df[mask].sort_values('updated_date', ascending=False).head(LIMIT)
+
+
+def main():
+    print(f"{'tasks':>8} {'build ms':>9} {'matches':>8} {'filter+facets+top ms':>21} {'pandas ms':>10}")
+    for n in SIZES:
+        tasks = generate_tasks(n)
+        start = time.perf_counter()
+        index = FacetIndex(tasks)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def bitmap_query():
+            mask = index.mask(FILTERS)
+            index.facet_counts(FILTERS)
+            return mask.bit_count(), index.recent(mask, LIMIT)
+
+        matches, recent = bitmap_query()
+        df = pd.DataFrame(tasks)
+        expected_matches, expected = pandas_query(df)
+        assert matches == expected_matches
+        # Ties on updated_date may be ordered differently, so compare the dates
+        assert [tasks[task_id - 1]['updated_date'] for task_id in recent] == expected['updated_date'].tolist()
+        print(f"{n:>8} {build_ms:>9.0f} {matches:>8} {median_ms(bitmap_query):>21.2f} "
+              f"{median_ms(lambda: pandas_query(df)):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
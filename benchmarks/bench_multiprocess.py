@@ -0,0 +1,139 @@
+"""Several processes sharing one task store through the change feed.
+
+Each writer process keeps its own TaskStore replica on the shared log (or
+SQLite database), adds tasks and increments a shared counter task with
+optimistic retries. Afterwards a fresh replica must hold every task exactly
+once with the counter equal to the number of applied increments, and every
+replica must agree after a sync. Also times how long a sync takes to pick up
+a burst of changes written by another process, and checks that a process
+loading the log while another compacts it never misses a task.
+
+Run from the repository root:
+
+    python benchmarks/bench_multiprocess.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CsvStorage, SqliteStorage  # noqa: E402
+from task_log import TaskLog  # noqa: E402
+from task_store import StaleTaskError, TaskStore, task_version  # noqa: E402
+
+PROCESSES = 4
+WRITES_PER_PROCESS = 200
+SYNC_BURST = 1_000
+# Tasks added, compacting every few records, while another process keeps loading
+COMPACTION_RACE_TASKS = 2_000
+COMPACTION_RACE_EVERY = 20
+
+
+def new_task(i):
+    return {'title': f'Task {i}', 'assigned_to': 'vpacheco', 'created_by': 'jproano',
+            'status': 'Not Started', 'priority': 'Low', 'project': 'Shared', 'tags': ['shared'],
+            'start_date': '2024-01-01', 'end_date': '2024-01-31', 'progress': 0}
+
+
+def open_feed(backend, tmp):
+    if backend == 'sqlite':
+        return SqliteStorage(os.path.join(tmp, 'tasks.db'))
+    storage = CsvStorage(os.path.join(tmp, 'tasks.csv'))
+    return TaskLog(os.path.join(tmp, 'tasks.log'), storage.load, storage.save, compact_every=250)
+
+
+def writer(backend, tmp, results):
+    store = TaskStore.from_feed(open_feed(backend, tmp))
+    applied = 0
+    for i in range(WRITES_PER_PROCESS):
+        store.add(new_task(i))
+        while True:
+            store.sync()
+            counter = store.get(1)
+            try:
+                store.update(1, {'progress': counter['progress'] + 1}, expected_version=task_version(counter))
+                applied += 1
+                break
+            except StaleTaskError:
+                continue
+    store.sync()
+    results.put((applied, len(store), store.get(1)['progress']))
+
+
+def run(backend, tmp):
+    seed = TaskStore.from_feed(open_feed(backend, tmp))
+    seed.add(new_task(0))
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=writer, args=(backend, tmp, results)) for _ in range(PROCESSES)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    fresh = TaskStore.from_feed(open_feed(backend, tmp))
+    seed.sync()
+    applied = sum(outcome[0] for outcome in outcomes)
+    ids = [task['id'] for task in fresh.all()]
+    ok = (len(ids) == len(set(ids)) == 1 + PROCESSES * WRITES_PER_PROCESS
+          and fresh.get(1)['progress'] == applied
+          and seed.get(1)['progress'] == applied and len(seed) == len(fresh))
+    writes = PROCESSES * WRITES_PER_PROCESS * 2
+    print(f"{backend:>7}: {PROCESSES} processes, {writes} writes in {elapsed:.2f}s "
+          f"({writes / elapsed:.0f}/s), {len(ids)} tasks, counter {fresh.get(1)['progress']}/{applied} "
+          f"({'ok' if ok else 'INCONSISTENT'})")
+
+    # One process writes a burst; the other picks it up with a single sync
+    for i in range(SYNC_BURST):
+        fresh.update(2 + i % 100, {'progress': i % 100})
+    start = time.perf_counter()
+    seed.sync()
+    sync_ms = (time.perf_counter() - start) * 1000
+    print(f"{backend:>7}: sync after {SYNC_BURST} foreign changes: {sync_ms:.1f} ms")
+
+
+def compacting_writer(tmp, committed):
+    storage = CsvStorage(os.path.join(tmp, 'tasks.csv'))
+    log = TaskLog(os.path.join(tmp, 'tasks.log'), storage.load, storage.save, compact_every=10 ** 9)
+    for i in range(1, COMPACTION_RACE_TASKS + 1):
+        log.append('create', i, {**new_task(i), 'id': i})
+        committed.value = i
+        if i % COMPACTION_RACE_EVERY == 0:
+            log.compact()
+
+
+def compaction_race(tmp):
+    """Loads that overlap another process's compactions; returns (loads, loads missing tasks)"""
+    storage = CsvStorage(os.path.join(tmp, 'tasks.csv'))
+    log = TaskLog(os.path.join(tmp, 'tasks.log'), storage.load, storage.save)
+    committed = multiprocessing.Value('i', 0)
+    process = multiprocessing.Process(target=compacting_writer, args=(tmp, committed))
+    process.start()
+    loads = incomplete = 0
+    while process.is_alive():
+        # Every task appended before the load starts must be in it
+        expected = committed.value
+        ids = {task['id'] for task in log.load()}
+        loads += 1
+        incomplete += not ids.issuperset(range(1, expected + 1))
+    process.join()
+    return loads, incomplete
+
+
+def main():
+    for backend in ('csv', 'sqlite'):
+        with tempfile.TemporaryDirectory() as tmp:
+            run(backend, tmp)
+    with tempfile.TemporaryDirectory() as tmp:
+        loads, incomplete = compaction_race(tmp)
+    print(f"    csv: {loads} loads during compactions, {incomplete} missing tasks "
+          f"({'ok' if not incomplete else 'INCONSISTENT'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Form submit latency with synchronous saves vs. the background persistence worker.
+
+A submit is one TaskStore.update. It is timed with three ways of persisting:
+- rewriting the whole CSV snapshot (how the app saved originally)
+- appending and fsyncing the change log on the UI thread
+- enqueueing to the persistence worker
+
+The script also reports how long the worker takes to acknowledge a write as
+durable, and how a burst of edits gets coalesced into batches.
+
+Run from the repository root:
+
+    python benchmarks/bench_persistence.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persistence import PersistenceWorker  # noqa: E402
+from storage import CsvStorage  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+from task_log import TaskLog  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+SUBMITS = 50
+BURST = 1_000
+
+
+class SnapshotLog:
+    """Rewrites the whole snapshot on every change, like the original save_tasks_to_csv"""
+
+    def __init__(self, storage, store_ref):
+        self.storage = storage
+        self.store_ref = store_ref
+
+    def append(self, op, task_id, data=None):
+        store = self.store_ref[0]
+        self.storage.save([{**task, **data} if task['id'] == task_id else task for task in store.all()])
+
+
+class SyncLog:
+    """Appends and fsyncs each change on the calling thread"""
+
+    def __init__(self, log):
+        self.log = log
+
+    def append(self, op, task_id, data=None):
+        self.log.append_many([(op, task_id, data)])
+
+
+def submit_latency(store, n):
+    samples = []
+    for i in range(SUBMITS):
+        start = time.perf_counter()
+        store.update(1 + i % n, {'progress': i % 100})
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    print(f"{'tasks':>8} {'full snapshot':>14} {'sync log':>10} {'worker':>10} {'durable ack':>12}  (median ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            tasks = generate_tasks(n)
+            storage = CsvStorage(os.path.join(tmp, f'tasks_{n}.csv'))
+            storage.save(tasks)
+            log = TaskLog(os.path.join(tmp, f'tasks_{n}.log'), storage.load, storage.save, compact_every=10 ** 9)
+
+            store_ref = []
+            store = TaskStore(tasks, SnapshotLog(storage, store_ref))
+            store_ref.append(store)
+            snapshot_ms = submit_latency(store, n) if n <= 10_000 else float('nan')
+
+            sync_ms = submit_latency(TaskStore(tasks, SyncLog(log)), n)
+
+            worker = PersistenceWorker(log)
+            worker_ms = submit_latency(TaskStore(tasks, worker), n)
+            acks = []
+            for i in range(SUBMITS):
+                start = time.perf_counter()
+                worker.append('update', 1, {'progress': i}).wait()
+                acks.append((time.perf_counter() - start) * 1000)
+            worker.close()
+            print(f"{n:>8} {snapshot_ms:>14.2f} {sync_ms:>10.2f} {worker_ms:>10.3f} {statistics.median(acks):>12.2f}")
+
+        log = TaskLog(os.path.join(tmp, 'burst.log'), list, lambda tasks: None, compact_every=10 ** 9)
+        worker = PersistenceWorker(log)
+        start = time.perf_counter()
+        for i in range(BURST):
+            worker.append('update', 1, {'progress': i % 100})
+        enqueue_ms = (time.perf_counter() - start) * 1000
+        worker.close()
+        print(f"burst of {BURST} edits: enqueued in {enqueue_ms:.1f} ms, written in "
+              f"{worker.batches_written} batches ({worker.records_written} records)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Critical path scheduling on large synthetic dependency graphs.
+
+Times a full schedule (topological sort, forward and backward pass) and the
+incremental recomputation after moving one task's end date, and checks the
+incremental results against a schedule computed from scratch.
+
+Run from the repository root:
+
+    python benchmarks/bench_scheduling.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduling import Schedule  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+MAX_DEPENDENCIES = 3
+MOVES = 200
+
+
+def full_schedule(tasks):
+    schedule = Schedule(tasks)
+    schedule.refresh()
+    return schedule
+
+
+def main():
+    rng = random.Random(7)
+    print(f"{'tasks':>8} {'edges':>8} {'full ms':>9} {'move ms (median/max)':>22} {'critical':>9} {'matches':>8}")
+    for n in SIZES:
+        tasks = generate_tasks(n, projects=max(1, n // 500), max_dependencies=MAX_DEPENDENCIES)
+        edges = sum(len(task['depends_on']) for task in tasks)
+        start = time.perf_counter()
+        schedule = full_schedule(tasks)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        by_id = {task['id']: task for task in tasks}
+        samples = []
+        for _ in range(MOVES):
+            old = by_id[rng.randint(1, n)]
+            end = date.fromisoformat(old['end_date']) + timedelta(days=rng.randint(-5, 10))
+            new = {**old, 'end_date': max(end, date.fromisoformat(old['start_date'])).isoformat()}
+            by_id[new['id']] = new
+            start = time.perf_counter()
+            schedule.replace(old, new)
+            schedule.refresh()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        matches = schedule.slacks() == full_schedule(by_id.values()).slacks()
+        print(f"{n:>8} {edges:>8} {full_ms:>9.1f} {statistics.median(samples):>11.3f} / {max(samples):>8.3f} "
+              f"{len(schedule.critical_tasks()):>9} {str(matches):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Edit tab picker: building every "#id - title" label vs. a top-k search.
+
+Run from the repository root:
+
+    python benchmarks/bench_search.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_tasks  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+N_TASKS = 100_000
+LIMIT = 20
+QUERIES = ['task 4242', 'project 7', 'backend ops', '#99999', 'ta']
+
+
+def main():
+    tasks = make_tasks(N_TASKS)
+    store = TaskStore(tasks)
+    number = 10
+    all_labels_ms = timeit.timeit(
+        lambda: {f"#{task['id']} - {task['title']}": task for task in tasks}, number=number) / number * 1000
+    print(f"{N_TASKS} tasks")
+    print(f"{'all labels (old picker)':<28} {all_labels_ms:>8.2f} ms, {N_TASKS} options")
+    for query in QUERIES:
+        ms = timeit.timeit(lambda: store.search(query, LIMIT), number=number) / number * 1000
+        print(f"{'search ' + repr(query):<28} {ms:>8.2f} ms, {len(store.search(query, LIMIT))} options")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""SQLite backend: single-row write cost and SQL vs. pandas aggregation.
+
+Run from the repository root:
+
+    python benchmarks/bench_sqlite.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_tasks  # noqa: E402
+from storage import SqliteStorage  # noqa: E402
+
+SIZES = [10_000, 100_000]
+EDITS = 200
+
+
+def per_call_ms(fn, number):
+    start = time.perf_counter()
+    for i in range(number):
+        fn(i)
+    return (time.perf_counter() - start) / number * 1000
+
+
+def main():
+    print(f"{'tasks':>8} {'row update (ms)':>16} {'GROUP BY (ms)':>14} {'value_counts (ms)':>18} "
+          f"{'metrics SQL (ms)':>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            tasks = make_tasks(n)
+            storage = SqliteStorage(os.path.join(tmp, f'tasks_{n}.db'))
+            storage.save(tasks)
+
+            update_ms = per_call_ms(
+                lambda i: storage.append('update', i % n + 1, {'progress': 50, 'updated_date': '2024-06-01 10:00'}),
+                EDITS)
+            group_ms = per_call_ms(
+                lambda i: [storage.count_by(c) for c in ('status', 'priority', 'assigned_to')], 10)
+            pandas_ms = per_call_ms(
+                lambda i: [pd.DataFrame(tasks)[c].value_counts() for c in ('status', 'priority', 'assigned_to')], 10)
+            metrics_ms = per_call_ms(lambda i: storage.dashboard_metrics(date(2024, 6, 1)), 10)
+            print(f"{n:>8} {update_ms:>16.3f} {group_ms:>14.2f} {pandas_ms:>18.2f} {metrics_ms:>17.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Cold start, login page and first dashboard render times.
+
+Each measurement runs in a fresh Python process against a synthetic task
+file, as a newly started server would:
+
+- importing app.py, against importing the modules it used to load eagerly
+  (pandas, plotly, storage, the task store);
+- rendering the login page for the first visitor;
+- the first dashboard render after logging in, with the warm-up hook
+  (``TASKS_WARM_UP``) on and off. With warm-up on, the visitor is assumed
+  to take as long to type their password as the warm-up takes.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from storage import CsvStorage  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+
+SIZES = [10_000, 100_000]
+REPEAT = 3
+
+IMPORT_APP = """
+import time
+start = time.perf_counter()
+import app
+result = {'ms': (time.perf_counter() - start) * 1000}
+"""
+
+IMPORT_EAGER = """
+import time
+start = time.perf_counter()
+import streamlit, pandas, plotly.express, plotly.graph_objects, storage, task_store, backups, task_import
+result = {'ms': (time.perf_counter() - start) * 1000}
+"""
+
+RENDER = """
+import threading, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(APP, default_timeout=600)
+start = time.perf_counter()
+at.run()
+login_ms = (time.perf_counter() - start) * 1000
+assert not at.exception
+# The visitor types their password while the warm-up runs
+start = time.perf_counter()
+for thread in threading.enumerate():
+    if thread.name == 'warm-up':
+        thread.join()
+warm_up_ms = (time.perf_counter() - start) * 1000
+at.text_input[0].input('jproano')
+at.text_input[1].input('leader123')
+at.button[0].click()
+start = time.perf_counter()
+at.run()
+dashboard_ms = (time.perf_counter() - start) * 1000
+assert not at.exception
+result = {'login_ms': login_ms, 'warm_up_wait_ms': warm_up_ms, 'dashboard_ms': dashboard_ms}
+"""
+
+
+def in_fresh_process(code, cwd, **env):
+    """Run code in a new interpreter with the repository importable; returns its result dict"""
+    script = f"APP = {os.path.join(ROOT, 'app.py')!r}\n{code}\nimport json\nprint('RESULT', json.dumps(result))\n"
+    environment = {**os.environ, 'PYTHONPATH': ROOT, **env}
+    output = subprocess.run([sys.executable, '-c', script], cwd=cwd, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    line = next(line for line in output.splitlines() if line.startswith('RESULT '))
+    return json.loads(line[len('RESULT '):])
+
+
+def median(results, key):
+    return statistics.median(result[key] for result in results)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        app_ms = median([in_fresh_process(IMPORT_APP, tmp) for _ in range(REPEAT)], 'ms')
+        eager_ms = median([in_fresh_process(IMPORT_EAGER, tmp) for _ in range(REPEAT)], 'ms')
+    print(f"import app.py: {app_ms:.0f} ms (eagerly importing its heavy modules: {eager_ms:.0f} ms)")
+
+    print(f"{'tasks':>8} {'warm-up':>8} {'login ms':>9} {'warm-up wait ms':>16} {'dashboard ms':>13}")
+    for n in SIZES:
+        tasks = generate_tasks(n)
+        for warm_up in ('0', '1'):
+            results = []
+            for _ in range(REPEAT):
+                with tempfile.TemporaryDirectory() as tmp:
+                    CsvStorage(os.path.join(tmp, 'team_tasks.csv')).save(tasks)
+                    results.append(in_fresh_process(RENDER, tmp, TASKS_WARM_UP=warm_up))
+            print(f"{n:>8} {'on' if warm_up == '1' else 'off':>8} {median(results, 'login_ms'):>9.0f} "
+                  f"{median(results, 'warm_up_wait_ms'):>16.0f} {median(results, 'dashboard_ms'):>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
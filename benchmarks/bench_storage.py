@@ -0,0 +1,72 @@
+"""Load/save time and file size of the CSV and Parquet snapshot backends.
+
+Run from the repository root:
+
+    python benchmarks/bench_storage.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CsvStorage, ParquetStorage  # noqa: E402
+
+SIZES = [10_000, 100_000]
+USERS = ['jproano', 'vpacheco', 'dguerra']
+STATUSES = ['Not Started', 'In Progress', 'On Hold', 'Completed']
+PRIORITIES = ['Low', 'Medium', 'High', 'Critical']
+
+
+def make_tasks(n):
+    rng = random.Random(42)
+    base = date(2024, 1, 1)
+    tasks = []
+    for i in range(1, n + 1):
+        start = base + timedelta(days=rng.randint(0, 365))
+        tasks.append({
+            'id': i,
+            'title': f'Task {i}',
+            'description': 'Synthetic task used for storage benchmarks',
+            'assigned_to': rng.choice(USERS),
+            'priority': rng.choice(PRIORITIES),
+            'status': rng.choice(STATUSES),
+            'start_date': start.isoformat(),
+            'end_date': (start + timedelta(days=rng.randint(1, 60))).isoformat(),
+            'progress': rng.randint(0, 100),
+            'project': f'Project {rng.randint(1, 20)}',
+            'tags': rng.sample(['backend', 'frontend', 'ops', 'docs', 'bug'], rng.randint(0, 3)),
+            'created_by': rng.choice(USERS),
+            'created_date': f'{start.isoformat()} 09:00',
+            'updated_date': f'{start.isoformat()} 17:30',
+        })
+    return tasks
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'tasks':>8} {'backend':>8} {'save (ms)':>10} {'load (ms)':>10} "
+          f"{'load 3 cols (ms)':>17} {'size (KB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            tasks = make_tasks(n)
+            for storage in (CsvStorage(os.path.join(tmp, f'tasks_{n}.csv')),
+                            ParquetStorage(os.path.join(tmp, f'tasks_{n}.parquet'))):
+                save_ms = timed(lambda: storage.save(tasks))
+                load_ms = timed(storage.load)
+                projected_ms = timed(lambda: storage.load(columns=['id', 'status', 'end_date']))
+                name = type(storage).__name__.replace('Storage', '').lower()
+                print(f"{n:>8} {name:>8} {save_ms:>10.1f} {load_ms:>10.1f} "
+                      f"{projected_ms:>17.1f} {storage.size() / 1024:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
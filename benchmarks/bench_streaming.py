@@ -0,0 +1,57 @@
+"""Peak memory of backups and CSV exports, streamed vs. whole-file.
+
+Run from the repository root:
+
+    python benchmarks/bench_streaming.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_tasks  # noqa: E402
+from storage import CsvStorage, ParquetStorage  # noqa: E402
+
+SIZES = [10_000, 100_000]
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    print(f"{'tasks':>8} {'operation':<28} {'time (ms)':>10} {'peak (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            tasks = make_tasks(n)
+            csv_storage = CsvStorage(os.path.join(tmp, f'tasks_{n}.csv'))
+            csv_storage.save(tasks)
+            parquet_storage = ParquetStorage(os.path.join(tmp, f'tasks_{n}.parquet'))
+            parquet_storage.save(tasks)
+            del tasks
+            backup = os.path.join(tmp, 'backup.csv')
+
+            operations = [
+                ('backup via DataFrame', lambda: pd.read_csv(csv_storage.path).to_csv(backup, index=False)),
+                ('backup via file copy', lambda: csv_storage.backup(backup)),
+                ('CSV export, csv backend', lambda: sum(len(b) for b in csv_storage.iter_csv())),
+                ('CSV export, parquet backend', lambda: sum(len(b) for b in parquet_storage.iter_csv())),
+            ]
+            for name, fn in operations:
+                elapsed, peak = measure(fn)
+                print(f"{n:>8} {name:<28} {elapsed:>10.1f} {peak:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
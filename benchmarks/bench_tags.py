@@ -0,0 +1,63 @@
+"""CSV load time with per-row eval() of tags vs. the bulk tag codec.
+
+Run from the repository root:
+
+    python benchmarks/bench_tags.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_tasks  # noqa: E402
+from storage import CsvStorage  # noqa: E402
+
+N_TASKS = 100_000
+
+
+def load_with_eval(path):
+    """The loader as it was before the tag codec"""
+    df = pd.read_csv(path)
+    tasks = df.to_dict('records')
+    for task in tasks:
+        if 'tags' in task and pd.notna(task['tags']):
+            task['tags'] = eval(task['tags']) if task['tags'].startswith('[') else [task['tags']]
+        else:
+            task['tags'] = []
+    return tasks
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    tasks = make_tasks(N_TASKS)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.csv')
+        df = pd.DataFrame(tasks)
+        df['tags'] = df['tags'].apply(lambda x: str(x) if x else '[]')
+        df.to_csv(legacy_path, index=False)
+
+        storage = CsvStorage(os.path.join(tmp, 'tasks.csv'))
+        storage.save(tasks)
+
+        eval_ms, before = timed(lambda: load_with_eval(legacy_path))
+        legacy_ms, after = timed(CsvStorage(legacy_path).load)
+        json_ms, _ = timed(storage.load)
+        assert [t['tags'] for t in before] == [t['tags'] for t in after]
+
+    print(f"{N_TASKS} tasks")
+    print(f"eval() per row, legacy file:   {eval_ms:>8.1f} ms")
+    print(f"tag codec, legacy file:        {legacy_ms:>8.1f} ms")
+    print(f"tag codec, JSON-array file:    {json_ms:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
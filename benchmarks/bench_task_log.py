@@ -0,0 +1,70 @@
+"""Per-edit persistence cost: full CSV rewrite vs. append-only change log.
+
+Run from the repository root:
+
+    python benchmarks/bench_task_log.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CsvStorage  # noqa: E402
+from task_log import TaskLog  # noqa: E402
+
+SIZES = [1_000, 10_000, 50_000]
+EDITS = 50
+
+
+def make_tasks(n):
+    return [{
+        'id': i,
+        'title': f'Task {i}',
+        'description': 'Synthetic task',
+        'assigned_to': 'vpacheco',
+        'priority': 'Medium',
+        'status': 'In Progress',
+        'start_date': '2024-01-01',
+        'end_date': '2024-01-15',
+        'progress': 50,
+        'project': 'Benchmark',
+        'tags': ['bench'],
+        'created_by': 'jproano',
+        'created_date': '2024-01-01 09:00',
+        'updated_date': '2024-01-01 09:00',
+    } for i in range(1, n + 1)]
+
+
+def time_edits(edit, tasks):
+    start = time.perf_counter()
+    for i in range(EDITS):
+        edit(tasks, i + 1)
+    return (time.perf_counter() - start) / EDITS * 1000
+
+
+def main():
+    print(f"{'tasks':>8} {'csv rewrite (ms/edit)':>22} {'log append (ms/edit)':>21}")
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = CsvStorage(os.path.join(tmp, 'team_tasks.csv'))
+        for n in SIZES:
+            tasks = make_tasks(n)
+            storage.save(tasks)
+
+            def rewrite(tasks, task_id):
+                tasks[task_id - 1]['progress'] = 60
+                storage.save(tasks)
+
+            log = TaskLog(os.path.join(tmp, f'team_tasks_{n}.log'),
+                          storage.load, storage.save,
+                          compact_every=EDITS + 1)
+
+            def append(tasks, task_id):
+                log.append('update', task_id, {'progress': 60, 'updated_date': '2024-01-02 09:00'})
+
+            print(f"{n:>8} {time_edits(rewrite, tasks):>22.3f} {time_edits(append, tasks):>21.3f}")
+
+
+if __name__ == '__main__':
+    main()
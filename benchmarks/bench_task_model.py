@@ -0,0 +1,70 @@
+"""Memory of 100k loaded tasks before and after interning, and the cost of the task frame.
+
+Run from the repository root:
+
+    python benchmarks/bench_task_model.py
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CsvStorage  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+from task_model import TaskFrame, ValueInterner  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+N_TASKS = 100_000
+
+
+def traced_mb(build):
+    """Python memory held by the result of build(), in MB"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / 1024 / 1024, result
+
+
+def timed_ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = CsvStorage(os.path.join(tmp, 'tasks.csv'))
+        storage.save(generate_tasks(N_TASKS))
+
+        plain_mb, tasks = traced_mb(storage.load)
+        del tasks
+        interner = ValueInterner()
+        interned_mb, tasks = traced_mb(lambda: [interner.intern(task) for task in storage.load()])
+
+    dicts_df_mb = pd.DataFrame(tasks).memory_usage(deep=True).sum() / 1024 / 1024
+    build_ms, frame = timed_ms(lambda: TaskFrame.from_tasks(tasks))
+    frame_mb = frame.df.memory_usage(deep=True).sum() / 1024 / 1024
+
+    store = TaskStore(tasks)
+    store.frame()
+    store.update(N_TASKS // 2, {'status': 'Completed', 'assigned_to': 'newcomer'})
+    patch_ms, _ = timed_ms(store.frame)
+
+    print(f"{N_TASKS} tasks")
+    print(f"task dicts as loaded:            {plain_mb:>8.1f} MB")
+    print(f"task dicts, values interned:     {interned_mb:>8.1f} MB")
+    print(f"pd.DataFrame(tasks) per view:    {dicts_df_mb:>8.1f} MB")
+    print(f"categorical task frame:          {frame_mb:>8.1f} MB, built in {build_ms:.0f} ms once per store")
+    print(f"frame after one update:          {patch_ms:>8.1f} ms (patched, not rebuilt)")
+
+
+if __name__ == '__main__':
+    main()
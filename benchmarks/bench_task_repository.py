@@ -0,0 +1,63 @@
+"""Linear scans over the task list vs. TaskRepository index lookups.
+
+Run from the repository root:
+
+    python benchmarks/bench_task_repository.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_store import TaskStore  # noqa: E402
+
+N_TASKS = 100_000
+USERS = [f'user{i}' for i in range(50)]
+STATUSES = ['Not Started', 'In Progress', 'On Hold', 'Completed']
+PROJECTS = [f'Project {i}' for i in range(200)]
+
+
+def make_tasks(n):
+    rng = random.Random(42)
+    return [{
+        'id': i,
+        'title': f'Task {i}',
+        'assigned_to': rng.choice(USERS),
+        'created_by': rng.choice(USERS),
+        'status': rng.choice(STATUSES),
+        'project': rng.choice(PROJECTS),
+    } for i in range(1, n + 1)]
+
+
+def report(name, scan, indexed, number):
+    scan_ms = timeit.timeit(scan, number=number) / number * 1000
+    index_ms = timeit.timeit(indexed, number=number) / number * 1000
+    print(f"{name:<22} {scan_ms:>12.4f} {index_ms:>12.4f} {scan_ms / index_ms:>9.0f}x")
+
+
+def main():
+    tasks = make_tasks(N_TASKS)
+    store = TaskStore(tasks)
+    task_id = N_TASKS // 2
+    user = USERS[7]
+
+    print(f"{N_TASKS} tasks")
+    print(f"{'operation':<22} {'scan (ms)':>12} {'index (ms)':>12} {'speedup':>10}")
+    report('lookup by id',
+           lambda: next(t for t in tasks if t['id'] == task_id),
+           lambda: store.get(task_id), 20)
+    report('user tasks',
+           lambda: [t for t in tasks if t['assigned_to'] == user or t['created_by'] == user],
+           lambda: store.user_tasks(user), 20)
+    report('count by status',
+           lambda: len([t for t in tasks if t['status'] == 'Completed']),
+           lambda: store.count('status', 'Completed'), 20)
+    report('filter by project',
+           lambda: [t for t in tasks if t['project'] == PROJECTS[3]],
+           lambda: store.find('project', PROJECTS[3]), 20)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Trend rollups vs. recomputing the trends from the raw status history.
+
+Writes a status history for synthetic tasks (several transitions each), then
+times rebuilding the rollups from the file at startup, folding in one more
+transition, and reading the daily and weekly tables the charts use, against
+computing burndown, throughput and cycle time from the raw history with
+pandas as a rerun would without rollups. Also checks that rollups kept up
+one transition at a time match the ones rebuilt from the file.
+
+Run from the repository root:
+
+    python benchmarks/bench_trends.py
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from history import Rollups, StatusHistory, transition  # noqa: E402
+from synthetic import generate_tasks  # noqa: E402
+
+SIZES = [10_000, 100_000]
+REPEAT = 5
+# Status path a synthetic task may go through after being created
+PATH = ['In Progress', 'On Hold', 'In Progress', 'Completed']
+
+
+def make_history(n):
+    """Transitions of n tasks in time order, fed through a Rollups like the store does"""
+    rng = random.Random(11)
+    rollups, records = Rollups(), []
+    events = []
+    for task in generate_tasks(n):
+        created = datetime.fromisoformat(task['created_date'])
+        events.append((created, task, None, 'Not Started'))
+        moment, status = created, 'Not Started'
+        for after in PATH[:rng.randint(0, len(PATH))]:
+            moment += timedelta(hours=rng.randint(1, 24 * 14))
+            events.append((moment, task, status, after))
+            status = after
+    events.sort(key=lambda event: event[0])
+    for moment, task, before, after in events:
+        old = None if before is None else {**task, 'status': before}
+        record = transition(old, {**task, 'status': after}, moment.strftime('%Y-%m-%d %H:%M'))
+        rollups.add(record)
+        records.append(record)
+    return rollups, records
+
+
+def raw_trends(history):
+    """Burndown, throughput and cycle time straight from the history, without rollups"""
+    at = pd.to_datetime(history['at'])
+    day = at.dt.normalize()
+    open_before = history['from'].notna() & (history['from'] != 'Completed')
+    open_after = history['to'].notna() & (history['to'] != 'Completed')
+    burndown = ((open_after & ~open_before).astype(int) - (open_before & ~open_after).astype(int)) \
+        .groupby(day).sum().asfreq('D', fill_value=0).cumsum()
+    completed = (history['to'] == 'Completed') & (history['from'] != 'Completed')
+    started = at[history['to'] == 'In Progress'].groupby(history['id']).min()
+    created = at[history['from'].isna()].groupby(history['id']).min()
+    done = history[completed].assign(at=at[completed])
+    start = done['id'].map(started).fillna(done['id'].map(created))
+    done = done.assign(week=day[completed] - pd.to_timedelta(at[completed].dt.weekday, unit='D'),
+                       cycle_days=(done['at'] - start).dt.total_seconds() / 86400)
+    weekly = done.groupby(['week', 'assigned_to'])['cycle_days'].agg(['size', 'mean'])
+    return burndown, weekly
+
+
+def median_ms(fn):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    print(f"{'tasks':>8} {'transitions':>12} {'rebuild ms':>11} {'add us':>7} {'read ms':>8} "
+          f"{'raw ms':>8} {'matches':>8}")
+    for n in SIZES:
+        incremental, records = make_history(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            history = StatusHistory(os.path.join(tmp, 'tasks.history'))
+            history.append_many(records)
+            start = time.perf_counter()
+            frame = history.load()
+            rebuilt = Rollups.from_history(frame)
+            rebuild_ms = (time.perf_counter() - start) * 1000
+
+        weekly, expected_weekly = incremental.weekly_frame(), rebuilt.weekly_frame()
+        burndown, raw_weekly = raw_trends(frame)
+        matches = (incremental.daily_frame().equals(rebuilt.daily_frame())
+                   and weekly[['week', 'assigned_to', 'completed']].equals(expected_weekly[['week', 'assigned_to', 'completed']])
+                   and np.allclose(weekly['cycle_days'], expected_weekly['cycle_days'])
+                   and np.array_equal(burndown.to_numpy(), rebuilt.daily_frame()['open'].to_numpy())
+                   and np.array_equal(raw_weekly['size'].to_numpy(), expected_weekly['completed'].to_numpy()))
+
+        record = {**records[-1], 'from': 'Not Started', 'to': 'In Progress'}
+        start = time.perf_counter()
+        for _ in range(1000):
+            rebuilt.add(dict(record))
+        add_us = (time.perf_counter() - start) * 1000
+
+        read_ms = median_ms(lambda: (rebuilt.daily_frame(), rebuilt.weekly_frame()))
+        raw_ms = median_ms(lambda: raw_trends(frame))
+        print(f"{n:>8} {len(records):>12} {rebuild_ms:>11.0f} {add_us:>7.1f} {read_ms:>8.2f} "
+              f"{raw_ms:>8.1f} {str(matches):>8}")
+
+
+if __name__ == '__main__':
+    main()
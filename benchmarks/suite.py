@@ -0,0 +1,193 @@
+"""Benchmark suite for the app's data functions on synthetic task sets.
+
+Imports app.py headlessly and times its loading, saving, query and chart
+functions at several data sizes, writing a JSON report that can be compared
+against an earlier one.
+
+Run from the repository root:
+
+    python benchmarks/suite.py run --output before.json
+    python benchmarks/suite.py run --sizes 1000 10000 --output after.json
+    python benchmarks/suite.py compare before.json after.json
+
+compare exits with status 1 when any function got slower than the threshold,
+so it can gate a release.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st  # noqa: E402
+from streamlit import logger as st_logger  # noqa: E402
+
+from synthetic import generate_tasks  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+REPEAT = 3
+# Relative slowdown reported as a regression by compare
+THRESHOLD = 0.10
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _reset(app):
+    """Drop the app's process caches and session state, like a fresh server"""
+    app.get_persistence_worker().close()
+    for cached in (app.get_storage, app.get_task_log, app.get_persistence_worker, app.get_task_store,
+                   app._build_gantt_chart, app._build_progress_summary, app._build_trend_charts):
+        cached.clear()
+    # The next task set starts its own history and ids
+    for path in (app.TASKS_HISTORY_FILE, app.TASKS_ID_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    for key in list(st.session_state):
+        del st.session_state[key]
+
+
+def _time(fn, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': min(samples), 'median_ms': statistics.median(samples), 'samples_ms': samples}
+
+
+def bench_size(app, n, repeat, generator_args):
+    tasks = generate_tasks(n, **generator_args)
+    user = tasks[0]['assigned_to']
+    _reset(app)
+    app.get_storage().save(tasks)
+    del tasks
+
+    results = {}
+    results['load_tasks_from_csv'] = _time(app.load_tasks_from_csv, repeat)
+    # Everything below runs against the loaded shared store, as a logged-in rerun would
+    st.session_state.authenticated = True
+    app.init_session_state()
+    st.session_state.username = user
+    # Saves are queued; time until the snapshot is on disk
+    results['save_tasks_to_csv'] = _time(lambda: app.save_tasks_to_csv() and app.get_persistence_worker().flush(),
+                                         repeat)
+    results['get_user_tasks'] = _time(lambda: app.get_user_tasks(user), repeat)
+    results['get_dashboard_metrics'] = _time(app.get_dashboard_metrics, repeat)
+    results['create_progress_summary'] = _time(app.create_progress_summary, repeat,
+                                               setup=app._build_progress_summary.clear)
+    results['create_progress_summary (cached)'] = _time(app.create_progress_summary, repeat)
+    results['create_gantt_chart'] = _time(app.create_gantt_chart, repeat, setup=app._build_gantt_chart.clear)
+    results['create_gantt_chart (cached)'] = _time(app.create_gantt_chart, repeat)
+    results['create_trend_charts'] = _time(app.create_trend_charts, repeat, setup=app._build_trend_charts.clear)
+    filters = {'status': ['Not Started', 'In Progress'], 'priority': ['High', 'Critical']}
+    results['filtered_recent_tasks'] = _time(
+        lambda: app.get_task_store().query_recent(filters, app.RECENT_TASKS_LIMIT), repeat)
+    results['facet_counts'] = _time(lambda: app.get_task_store().facet_counts(filters), repeat)
+    results['search_tasks'] = _time(lambda: app.search_tasks('fix login'), repeat,
+                                    setup=lambda: st.session_state.pop('task_search_cache', None))
+    return results
+
+
+def run(args):
+    st_logger.set_log_level('error')
+    generator_args = {'users': args.users, 'projects': args.projects, 'tags': args.tags,
+                      'date_spread_days': args.date_spread_days, 'seed': args.seed}
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': os.environ.get('TASKS_STORAGE_BACKEND', 'csv'),
+        'repeat': args.repeat,
+        'generator': generator_args,
+        'results': {},
+    }
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # app.py keeps its files relative to the working directory
+        os.chdir(tmp)
+        try:
+            import app
+            for n in args.sizes:
+                results = bench_size(app, n, args.repeat, generator_args)
+                report['results'][str(n)] = results
+                for name, timing in results.items():
+                    print(f"{n:>9} {name:<30} {timing['median_ms']:>10.2f} ms")
+            _reset(app)
+        finally:
+            os.chdir(cwd)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+def compare(args):
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"base: {base.get('commit') or '?'} ({base['created_at']})")
+    print(f"new:  {new.get('commit') or '?'} ({new['created_at']})")
+    print(f"{'tasks':>9} {'function':<30} {'base ms':>10} {'new ms':>10} {'change':>8}")
+    regressions = 0
+    for size, functions in new['results'].items():
+        for name, timing in functions.items():
+            before = base['results'].get(size, {}).get(name)
+            if before is None:
+                continue
+            # Compare medians; below a millisecond the noise dominates
+            old_ms, new_ms = before['median_ms'], timing['median_ms']
+            change = (new_ms - old_ms) / old_ms if old_ms else 0.0
+            regressed = change > args.threshold and new_ms - old_ms > 1.0
+            regressions += regressed
+            print(f"{size:>9} {name:<30} {old_ms:>10.2f} {new_ms:>10.2f} {change:>+7.0%}"
+                  f"{'  REGRESSION' if regressed else ''}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='time the app functions and write a report')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    run_parser.add_argument('--repeat', type=int, default=REPEAT)
+    run_parser.add_argument('--users', type=int, default=10)
+    run_parser.add_argument('--projects', type=int, default=20)
+    run_parser.add_argument('--tags', type=int, default=10)
+    run_parser.add_argument('--date-spread-days', type=int, default=365)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--output', help='path of the JSON report')
+
+    compare_parser = commands.add_parser('compare', help='compare two reports')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
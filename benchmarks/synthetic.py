@@ -0,0 +1,84 @@
+"""Reproducible synthetic task sets for benchmarks.
+
+    from synthetic import generate_tasks
+    tasks = generate_tasks(100_000, users=10, projects=50, seed=7)
+
+The same arguments always produce the same tasks.
+"""
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+# Share of tasks in each status, roughly what a live team board looks like
+STATUS_MIX = {'Not Started': 0.3, 'In Progress': 0.3, 'On Hold': 0.1, 'Completed': 0.3}
+PRIORITY_MIX = {'Low': 0.3, 'Medium': 0.4, 'High': 0.2, 'Critical': 0.1}
+TAG_WORDS = ['backend', 'frontend', 'ops', 'docs', 'bug', 'feature', 'design', 'qa',
+             'security', 'performance', 'infra', 'research', 'customer', 'release', 'mobile']
+TITLE_VERBS = ['Fix', 'Build', 'Review', 'Update', 'Design', 'Test', 'Migrate', 'Document', 'Refactor', 'Deploy']
+TITLE_NOUNS = ['login flow', 'report export', 'API client', 'dashboard', 'billing page', 'search',
+               'onboarding', 'CI pipeline', 'database schema', 'notifications', 'settings', 'audit log']
+
+
+def _progress(rng: random.Random, status: str) -> int:
+    if status == 'Completed':
+        return 100
+    if status == 'Not Started':
+        return 0
+    return rng.randint(5, 95)
+
+
+def generate_tasks(n: int, users: int = 3, projects: int = 20, tags: int = 10,
+                   max_tags_per_task: int = 3, start: date = date(2024, 1, 1),
+                   date_spread_days: int = 365, max_duration_days: int = 60,
+                   status_mix: Optional[Dict[str, float]] = None,
+                   priority_mix: Optional[Dict[str, float]] = None,
+                   max_dependencies: int = 0, dependency_window: int = 50,
+                   seed: int = 42) -> List[Dict]:
+    """Generate n tasks in the app's task format.
+
+    users, projects and tags set how many distinct values there are; start
+    dates are spread uniformly over date_spread_days from start, and statuses
+    and priorities follow the given weight mixes. With max_dependencies, each
+    task depends on up to that many of the dependency_window tasks created
+    before it in the same project, which always gives an acyclic graph.
+    """
+    rng = random.Random(seed)
+    status_mix = status_mix or STATUS_MIX
+    priority_mix = priority_mix or PRIORITY_MIX
+    user_names = [f'user{i:03d}' for i in range(1, users + 1)]
+    project_names = [f'Project {i}' for i in range(1, projects + 1)]
+    tag_names = (TAG_WORDS + [f'tag{i}' for i in range(len(TAG_WORDS), tags)])[:tags]
+    # Draw the weighted columns in bulk, which is much faster than per task
+    statuses = rng.choices(list(status_mix), weights=list(status_mix.values()), k=n)
+    priorities = rng.choices(list(priority_mix), weights=list(priority_mix.values()), k=n)
+
+    recent_ids: Dict[str, List[int]] = {name: [] for name in project_names}
+    tasks = []
+    for i in range(1, n + 1):
+        status = statuses[i - 1]
+        task_start = start + timedelta(days=rng.randrange(date_spread_days))
+        task_end = task_start + timedelta(days=rng.randint(1, max_duration_days))
+        task = {
+            'id': i,
+            'title': f'{rng.choice(TITLE_VERBS)} {rng.choice(TITLE_NOUNS)} #{i}',
+            'description': 'Synthetic task generated for benchmarks',
+            'assigned_to': rng.choice(user_names),
+            'priority': priorities[i - 1],
+            'status': status,
+            'start_date': task_start.isoformat(),
+            'end_date': task_end.isoformat(),
+            'progress': _progress(rng, status),
+            'project': rng.choice(project_names),
+            'tags': rng.sample(tag_names, rng.randint(0, min(max_tags_per_task, len(tag_names)))),
+            'created_by': rng.choice(user_names),
+            'created_date': f'{task_start.isoformat()} 09:00',
+            'updated_date': f'{task_start.isoformat()} 17:30',
+        }
+        if max_dependencies:
+            earlier = recent_ids[task['project']]
+            task['depends_on'] = rng.sample(earlier, rng.randint(0, min(max_dependencies, len(earlier))))
+            earlier.append(i)
+            if len(earlier) > dependency_window:
+                del earlier[0]
+        tasks.append(task)
+    return tasks
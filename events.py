@@ -0,0 +1,319 @@
+"""Task change events for notifications and exports.
+
+The task store turns every create, update and delete into an event and
+publishes it to an ``EventBus`` once the write is done. Publishing only puts
+the event on a bounded queue, so a form submit never waits on a mail server,
+webhook or warehouse. A dispatcher thread collects events into batches and
+hands each batch to every sink, and each sink delivers on its own thread.
+That way a slow sink falls behind without holding up the others. A failed
+send is retried with exponential backoff before the batch is given up.
+"""
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+# Maximum number of events waiting for the dispatcher; publishing drops events beyond it
+QUEUE_SIZE = 10_000
+# Maximum number of events per batch handed to a sink
+BATCH_SIZE = 200
+# How long the dispatcher waits for a batch to fill up, in seconds
+BATCH_WAIT = 0.2
+# Retries of a failed send, with delays of BACKOFF, 2 * BACKOFF, 4 * BACKOFF, ... seconds
+RETRIES = 4
+BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+# Batches a sink may have waiting before the dispatcher waits for it
+SINK_BACKLOG = 20
+# Fields whose changes people get notified about
+NOTIFY_FIELDS = ('assigned_to', 'status')
+# Fields that change on every update and are left out of an event's changes
+BOOKKEEPING_FIELDS = ('version', 'updated_date')
+
+_FLUSH = object()
+_STOP = object()
+
+
+def task_event(old: Optional[Dict], new: Optional[Dict]) -> Optional[Dict]:
+    """Event for a task going from old to new (None when created or deleted); None if nothing changed.
+
+    ``(task_id, version)`` identifies the event, so a sink that receives a
+    batch twice after a retry can drop the duplicates. The event holds the
+    store's task dict itself, which the store replaces rather than modifies.
+    """
+    if old is None and new is None:
+        return None
+    task = new if new is not None else old
+    if old is None:
+        kind, changes = 'created', {}
+    elif new is None:
+        kind, changes = 'deleted', {}
+    else:
+        kind = 'updated'
+        changes = {field: [old.get(field), value] for field, value in new.items()
+                   if field not in BOOKKEEPING_FIELDS and old.get(field) != value}
+        if not changes:
+            return None
+    at = new.get('updated_date') if new is not None else None
+    if not isinstance(at, str):
+        at = datetime.now().strftime('%Y-%m-%d %H:%M')
+    version = task.get('version') or 0
+    return {'type': f'task.{kind}', 'task_id': task['id'],
+            'version': version + 1 if new is None else version,
+            'at': at, 'changes': changes, 'task': task}
+
+
+def notifiable(event: Dict) -> bool:
+    """Whether people should hear about event: a new or deleted task, or a new assignee or status"""
+    return event['type'] != 'task.updated' or any(field in event['changes'] for field in NOTIFY_FIELDS)
+
+
+def encode(events: List[Dict]) -> str:
+    return ''.join(json.dumps(event, default=str) + '\n' for event in events)
+
+
+# Sinks: anything with a send(batch) method that raises when the batch did not get through
+class StubSink:
+    """Sink that keeps the batches it receives in memory, for tests and benchmarks.
+
+    It can also pretend to be a remote service: ``latency`` seconds pass on
+    each send, and a fraction ``failure_rate`` of sends fail.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.batches: List[List[Dict]] = []
+        self.attempts = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, batch: List[Dict]):
+        with self._lock:
+            self.attempts += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("Stub sink failure")
+        with self._lock:
+            self.batches.append(batch)
+
+    def events(self) -> List[Dict]:
+        with self._lock:
+            return [event for batch in self.batches for event in batch]
+
+
+class FileSink:
+    """Appends events as JSON lines to a file that a warehouse loader picks up"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, batch: List[Dict]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(encode(batch))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class WebhookSink:
+    """POSTs {"events": [...]} as JSON to a URL, such as a mail or chat notification service.
+
+    Only notifiable events are sent; a batch without any sends nothing.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, batch: List[Dict]):
+        events = [event for event in batch if notifiable(event)]
+        if not events:
+            return
+        body = json.dumps({'events': events}, default=str).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class EventBus:
+    """Delivers published events to sinks in batches, on background threads.
+
+    ``publish`` never blocks: when QUEUE_SIZE events are already waiting, the
+    event is dropped and counted in ``dropped``. A batch goes out when
+    ``batch_size`` events have queued or ``batch_wait`` seconds have passed
+    since its first event. Each sink receives the batches in publish order.
+    A batch that still fails after ``retries`` retries is counted in
+    ``failed``. If ``dead_letter`` is a path, the batch is also appended
+    there so it can be replayed. Call ``close`` on shutdown to deliver what
+    is still queued.
+    """
+
+    def __init__(self, sinks: Iterable, max_queue: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE,
+                 batch_wait: float = BATCH_WAIT, retries: int = RETRIES, backoff: float = BACKOFF,
+                 dead_letter: Optional[str] = None):
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retries = retries
+        self.backoff = backoff
+        self.dead_letter = dead_letter
+        self.published = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches_sent = 0
+        self.last_error: Optional[BaseException] = None
+        self._stats_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        # One thread per sink keeps its batches in order; its outbox bounds how far it can fall behind
+        self._outboxes = [queue.Queue(maxsize=SINK_BACKLOG) for _ in self.sinks]
+        self._senders = [threading.Thread(target=self._send_loop, args=(sink, outbox),
+                                          name='task-events-sink', daemon=True)
+                         for sink, outbox in zip(self.sinks, self._outboxes)]
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='task-events', daemon=True)
+        for thread in [self._thread, *self._senders]:
+            thread.start()
+
+    def publish(self, event: Dict) -> bool:
+        """Queue an event for delivery; False if it was dropped because the queue is full"""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        with self._stats_lock:
+            self.published += 1
+        return True
+
+    def publish_many(self, events: Iterable[Dict]) -> int:
+        """Queue several events; returns how many were accepted"""
+        return sum(self.publish(event) for event in events)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every event published so far was delivered or given up; False on timeout"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Deliver what is still queued and stop the threads"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {'published': self.published, 'dropped': self.dropped, 'delivered': self.delivered,
+                    'failed': self.failed, 'retried': self.retried, 'batches': self.batches_sent,
+                    'pending': self._queue.qsize()}
+
+    def _run(self):
+        while True:
+            batch, control = self._collect()
+            if batch:
+                self._dispatch(batch)
+            if control is None:
+                continue
+            marker, done = control
+            if marker is _STOP:
+                for outbox in self._outboxes:
+                    outbox.put(_STOP)
+                for thread in self._senders:
+                    thread.join()
+                return
+            # Wait for every sink to get through what was handed to it so far
+            flushed = [threading.Event() for _ in self._outboxes]
+            for outbox, sink_done in zip(self._outboxes, flushed):
+                outbox.put(sink_done)
+            for sink_done in flushed:
+                sink_done.wait()
+            done.set()
+
+    def _collect(self):
+        """Next batch of events, and the flush or stop marker that ended it early, if any"""
+        item = self._queue.get()
+        if isinstance(item, tuple):
+            return [], item
+        batch = [item]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, tuple):
+                return batch, item
+            batch.append(item)
+        return batch, None
+
+    def _dispatch(self, batch: List[Dict]):
+        for outbox in self._outboxes:
+            # A sink SINK_BACKLOG batches behind holds up the dispatcher, so the queue
+            # fills and publishing starts dropping instead of memory growing
+            outbox.put(batch)
+
+    def _send_loop(self, sink, outbox: queue.Queue):
+        while True:
+            item = outbox.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            self._deliver(sink, item)
+
+    def _deliver(self, sink, batch: List[Dict]):
+        for attempt in range(self.retries + 1):
+            try:
+                sink.send(batch)
+            except Exception as e:
+                self.last_error = e
+                if attempt == self.retries:
+                    break
+                with self._stats_lock:
+                    self.retried += 1
+                # Jittered, so sinks recovering from an outage aren't hit by every retry at once
+                delay = min(MAX_BACKOFF, self.backoff * 2 ** attempt)
+                time.sleep(random.uniform(delay / 2, delay))
+                continue
+            with self._stats_lock:
+                self.delivered += len(batch)
+                self.batches_sent += 1
+            return
+        with self._stats_lock:
+            self.failed += len(batch)
+        self._write_dead_letter(sink, batch)
+
+    def _write_dead_letter(self, sink, batch: List[Dict]):
+        if self.dead_letter is None:
+            return
+        record = {'sink': type(sink).__name__, 'failed_at': datetime.now().strftime('%Y-%m-%d %H:%M')}
+        try:
+            with open(self.dead_letter, 'a', encoding='utf-8') as f:
+                f.write(encode([{**record, **event} for event in batch]))
+        except OSError as e:
+            self.last_error = e
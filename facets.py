@@ -0,0 +1,244 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Task fields that can be filtered on, each with its own facet counts
+FACET_FIELDS = ('status', 'priority', 'assigned_to', 'project', 'tags')
+# Indexed as well, for restricting a query to one user's tasks
+USER_FIELDS = ('assigned_to', 'created_by')
+# Filter key for a (first, last) due-date range
+DUE = 'due'
+# Matches below this share of all tasks are ranked with a heap instead of scanning the sorted order
+HEAP_FRACTION = 1 / 16
+
+
+def _key(value):
+    # Empty CSV cells come back as NaN, which never compares equal to itself
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _keys(field: str, task: Dict) -> Iterable:
+    if field == 'tags':
+        return set(task.get('tags') or ())
+    return (_key(task.get(field)),)
+
+
+def _due(task: Dict) -> Optional[int]:
+    value = task.get('end_date')
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def _recent_key(task: Dict) -> Tuple[str, int]:
+    updated = task.get('updated_date')
+    return (updated if isinstance(updated, str) else '', task['id'])
+
+
+def bitmap(slots: Iterable[int]) -> int:
+    """Bitmap (an int) with the given bits set, built in one pass"""
+    slots = np.fromiter(slots, dtype=np.int64)
+    if not len(slots):
+        return 0
+    bits = np.zeros(int(slots.max()) + 1, dtype=np.uint8)
+    bits[slots] = 1
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def bitmap_slots(mask: int) -> np.ndarray:
+    """Positions of the set bits of mask, ascending"""
+    raw = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+
+
+class FacetIndex:
+    """Bitmap indexes for combining filters and counting facets.
+
+    Each task gets a slot number, and every value of a facet field maps to a
+    bitmap (a Python int) with the slots of the tasks that have it. A query
+    ORs the bitmaps of the values selected within a field and ANDs the
+    fields together, so a filter over 100k tasks costs a handful of big-int
+    operations; a facet count is the popcount of that result ANDed with a
+    value's bitmap. Due dates are bitmaps per day with a sorted list of the
+    days in use, so a date range is a bisection plus an OR per day.
+
+    A list of (updated_date, id) pairs is kept sorted, so the most recently
+    updated matches are read off its end instead of sorting every task.
+    """
+
+    def __init__(self, tasks: Iterable[Dict] = ()):
+        self._slot: Dict[int, int] = {}
+        self._ids: List[Optional[int]] = []
+        self._free: List[int] = []
+        self._bitmaps: Dict[str, Dict] = {field: {} for field in FACET_FIELDS + USER_FIELDS}
+        self._due: Dict[int, int] = {}
+        self._recent: List[Tuple[str, int]] = []
+        self._recent_keys: Dict[int, Tuple[str, int]] = {}
+        # Bulk build: collect the slots per value, then make each bitmap once
+        slots = {field: defaultdict(list) for field in self._bitmaps}
+        due_slots = defaultdict(list)
+        for task in tasks:
+            slot = self._slot[task['id']] = len(self._ids)
+            self._ids.append(task['id'])
+            for field, values in slots.items():
+                for key in _keys(field, task):
+                    values[key].append(slot)
+            due = _due(task)
+            if due is not None:
+                due_slots[due].append(slot)
+            self._recent_keys[task['id']] = _recent_key(task)
+        self._recent = sorted(self._recent_keys.values())
+        for field, values in slots.items():
+            self._bitmaps[field] = {key: bitmap(value) for key, value in values.items()}
+        self._due = {day: bitmap(value) for day, value in due_slots.items()}
+        self._days: List[int] = sorted(self._due)
+        self._all = (1 << len(self._ids)) - 1
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    # Changes
+    def add(self, task: Dict):
+        slot = self._free.pop() if self._free else len(self._ids)
+        if slot == len(self._ids):
+            self._ids.append(None)
+        self._ids[slot] = task['id']
+        self._slot[task['id']] = slot
+        self._set(task, slot, True)
+        self._all |= 1 << slot
+
+    def remove(self, task: Dict):
+        slot = self._slot.pop(task['id'], None)
+        if slot is None:
+            return
+        self._set(task, slot, False)
+        self._all &= ~(1 << slot)
+        self._ids[slot] = None
+        self._free.append(slot)
+        del self._recent_keys[task['id']]
+
+    def replace(self, old: Dict, new: Dict):
+        slot = self._slot[old['id']]
+        self._set(old, slot, False)
+        self._set(new, slot, True)
+
+    def _set(self, task: Dict, slot: int, present: bool):
+        bit = 1 << slot
+        for field, bitmaps in self._bitmaps.items():
+            for key in _keys(field, task):
+                self._flip(bitmaps, key, bit, present)
+        due = _due(task)
+        if due is not None:
+            if present and due not in self._due:
+                insort(self._days, due)
+            self._flip(self._due, due, bit, present)
+            if not present and due not in self._due:
+                del self._days[bisect_left(self._days, due)]
+        key = _recent_key(task)
+        if present:
+            insort(self._recent, key)
+            self._recent_keys[task['id']] = key
+        else:
+            i = bisect_left(self._recent, key)
+            if i < len(self._recent) and self._recent[i] == key:
+                del self._recent[i]
+
+    @staticmethod
+    def _flip(bitmaps: Dict, key, bit: int, present: bool):
+        if present:
+            bitmaps[key] = bitmaps.get(key, 0) | bit
+            return
+        value = bitmaps.get(key, 0) & ~bit
+        if value:
+            bitmaps[key] = value
+        else:
+            bitmaps.pop(key, None)
+
+    # Queries
+    def due_between(self, first: date, last: date) -> int:
+        """Bitmap of the tasks due from first to last inclusive"""
+        days = self._days
+        mask = 0
+        for day in days[bisect_left(days, first.toordinal()):bisect_right(days, last.toordinal())]:
+            mask |= self._due[day]
+        return mask
+
+    def user_mask(self, username: str) -> int:
+        """Bitmap of the tasks assigned to or created by username"""
+        return (self._bitmaps['assigned_to'].get(username, 0)
+                | self._bitmaps['created_by'].get(username, 0))
+
+    def _field_masks(self, filters: Dict) -> Dict[str, int]:
+        """Per filtered field, the bitmap of the tasks matching any of its selected values"""
+        masks = {}
+        for field, selected in filters.items():
+            if not selected:
+                continue
+            if field == DUE:
+                if len(selected) == 2:
+                    masks[field] = self.due_between(*selected)
+                continue
+            bitmaps = self._bitmaps[field]
+            union = 0
+            for value in selected:
+                union |= bitmaps.get(value, 0)
+            masks[field] = union
+        return masks
+
+    def _combine(self, masks: Dict[str, int], within: Optional[int], skip: Optional[str] = None) -> int:
+        mask = self._all if within is None else self._all & within
+        for field, field_mask in masks.items():
+            if field != skip:
+                mask &= field_mask
+        return mask
+
+    def mask(self, filters: Dict, within: Optional[int] = None) -> int:
+        """Bitmap of the tasks matching every filter (any of the values given per field).
+
+        filters maps facet fields to selected values and DUE to a (first, last)
+        date pair; empty selections do not filter. within restricts the result
+        to another bitmap.
+        """
+        return self._combine(self._field_masks(filters), within)
+
+    def facet_counts(self, filters: Dict, within: Optional[int] = None) -> Dict[str, Dict]:
+        """Per facet field, how many tasks each value would match given the other fields' filters"""
+        masks = self._field_masks(filters)
+        counts = {}
+        for field in FACET_FIELDS:
+            base = self._combine(masks, within, skip=field)
+            counts[field] = {value: count for value, bits in self._bitmaps[field].items()
+                             if value is not None and (count := (base & bits).bit_count())}
+        return counts
+
+    def ids(self, mask: int) -> List[int]:
+        """Ids of the tasks in mask, in slot order"""
+        ids = self._ids
+        return [ids[slot] for slot in bitmap_slots(mask).tolist()]
+
+    def recent(self, mask: int, limit: int) -> List[int]:
+        """Ids of the (at most limit) most recently updated tasks in mask, newest first"""
+        if not mask:
+            return []
+        if mask.bit_count() < len(self._recent) * HEAP_FRACTION:
+            # Few matches: rank just those
+            return [key[1] for key in heapq.nlargest(limit, map(self._recent_keys.__getitem__, self.ids(mask)))]
+        # Byte lookups make each membership test O(1), unlike shifting the big int
+        bits = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        size, slots, result = len(bits), self._slot, []
+        for _, task_id in reversed(self._recent):
+            slot = slots[task_id]
+            if slot >> 3 < size and bits[slot >> 3] >> (slot & 7) & 1:
+                result.append(task_id)
+                if len(result) == limit:
+                    break
+        return result
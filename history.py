@@ -0,0 +1,220 @@
+"""Status-transition history of tasks and the trend rollups built from it.
+
+Every status change, including a task being created or deleted, is one JSON
+line in an append-only history file. ``Rollups`` folds the transitions into
+daily team-wide counts and weekly per-assignee counts as they happen, so the
+trend charts (burndown, throughput, cycle time) read a few hundred aggregate
+rows instead of replaying the history on every rerun.
+"""
+import json
+import os
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import json as pa_json
+
+from locking import FileLock
+
+DONE = 'Completed'
+NOT_STARTED = 'Not Started'
+# Counts per day: tasks created and completed, and tasks entering or leaving the open set
+DAILY_COLUMNS = ('created', 'completed', 'opened', 'closed')
+# Counts per (week, assignee): completions and the sum of their cycle times
+WEEKLY_COLUMNS = ('completed', 'cycle_days')
+HISTORY_SCHEMA = pa.schema([('id', pa.int64()), ('from', pa.string()), ('to', pa.string()), ('at', pa.string()),
+                            ('assigned_to', pa.string()), ('cycle_days', pa.float64())])
+HISTORY_COLUMNS = HISTORY_SCHEMA.names
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute(value) -> Optional[int]:
+    """Minutes since the epoch of a 'YYYY-MM-DD[ HH:MM]' string"""
+    if not isinstance(value, str):
+        return None
+    try:
+        moment = datetime.fromisoformat(value.strip()[:16])
+    except ValueError:
+        return None
+    return (moment.toordinal() - EPOCH_ORDINAL) * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def transition(old: Optional[Dict], new: Optional[Dict], at: str) -> Optional[Dict]:
+    """History record of a task going from old to new (None when created or deleted); None if its status stayed"""
+    before = old.get('status') if old is not None else None
+    after = new.get('status') if new is not None else None
+    if old is not None and new is not None and before == after:
+        return None
+    task = new if new is not None else old
+    return {'id': task['id'], 'from': before, 'to': after, 'at': at, 'assigned_to': task.get('assigned_to')}
+
+
+def seed_transitions(tasks: Iterable[Dict]) -> List[Dict]:
+    """Approximate history of tasks that existed before it was recorded.
+
+    Each task is created as Not Started on its created date and, unless it
+    still is, moved to its current status on its last update; completed
+    tasks count as worked on from creation.
+    """
+    records = []
+    for task in tasks:
+        created = task.get('created_date') if isinstance(task.get('created_date'), str) else task.get('start_date')
+        records.append({'id': task['id'], 'from': None, 'to': NOT_STARTED, 'at': created,
+                        'assigned_to': task.get('assigned_to')})
+        if task.get('status') != NOT_STARTED:
+            record = {'id': task['id'], 'from': NOT_STARTED, 'to': task.get('status'),
+                      'at': task.get('updated_date'), 'assigned_to': task.get('assigned_to')}
+            start, end = _minute(created), _minute(task.get('updated_date'))
+            if task.get('status') == DONE and start is not None and end is not None:
+                record['cycle_days'] = round(max(0, end - start) / MINUTES_PER_DAY, 3)
+            records.append(record)
+    return records
+
+
+class Rollups:
+    """Daily and weekly aggregates of the status transitions, updated one transition at a time.
+
+    A task's cycle time runs from when it first went In Progress (or was
+    created, if it never did) to its completion, and is stored on the
+    completion record so a reload does not need to pair transitions up again.
+    """
+
+    def __init__(self):
+        # column -> day ordinal -> count
+        self.daily: Dict[str, Counter] = {column: Counter() for column in DAILY_COLUMNS}
+        # column -> (week's Monday ordinal, assignee) -> value
+        self.weekly: Dict[str, Counter] = {column: Counter() for column in WEEKLY_COLUMNS}
+        # Minute each open task was created and started, for cycle times
+        self._created: Dict[int, int] = {}
+        self._started: Dict[int, int] = {}
+
+    @classmethod
+    def from_history(cls, history: pd.DataFrame) -> 'Rollups':
+        """Rollups of a history frame (HISTORY_COLUMNS, in the order written), built with column operations"""
+        rollups = cls()
+        if history.empty:
+            return rollups
+        at = pd.to_datetime(history['at'], errors='coerce', format='mixed')
+        history = history[at.notna()]
+        at = at[at.notna()]
+        minute = at.to_numpy().astype('datetime64[m]').astype(np.int64)
+        day = minute // MINUTES_PER_DAY + EPOCH_ORDINAL
+        week = day - at.dt.weekday.to_numpy()
+        before, after = history['from'], history['to']
+        created = before.isna().to_numpy()
+        open_before = (before.notna() & (before != DONE)).to_numpy()
+        open_after = (after.notna() & (after != DONE)).to_numpy()
+        completed = ((after == DONE) & (before != DONE)).to_numpy()
+        masks = {'created': created, 'completed': completed,
+                 'opened': open_after & ~open_before, 'closed': open_before & ~open_after}
+        for column, mask in masks.items():
+            values, counts = np.unique(day[mask], return_counts=True)
+            rollups.daily[column] = Counter(dict(zip(values.tolist(), counts.tolist())))
+        done = pd.DataFrame({'week': week[completed], 'assigned_to': history['assigned_to'].to_numpy()[completed],
+                             'cycle_days': pd.to_numeric(history['cycle_days'], errors='coerce').to_numpy()[completed]})
+        weekly = done.fillna({'assigned_to': '', 'cycle_days': 0}).groupby(['week', 'assigned_to'])['cycle_days'].agg(['size', 'sum'])
+        rollups.weekly['completed'] = Counter(weekly['size'].to_dict())
+        rollups.weekly['cycle_days'] = Counter(weekly['sum'].to_dict())
+        # Start times of the tasks still around; transitions are in time order, so the first one wins
+        ids = history['id'].to_numpy()
+        deleted = ids[after.isna().to_numpy() & ~created]
+        for target, mask in ((rollups._created, created), (rollups._started, (after == 'In Progress').to_numpy())):
+            firsts = pd.Series(minute[mask], index=ids[mask])
+            firsts = firsts[~firsts.index.duplicated() & ~firsts.index.isin(deleted)]
+            target.update(zip(firsts.index.tolist(), firsts.tolist()))
+        return rollups
+
+    def add(self, record: Dict):
+        """Count one transition; a completion gets its cycle time stored in record['cycle_days']"""
+        minute = _minute(record['at'])
+        if minute is None:
+            return
+        day = minute // MINUTES_PER_DAY + EPOCH_ORDINAL
+        week = day - date.fromordinal(day).weekday()
+        task_id, before, after = record['id'], record['from'], record['to']
+        open_before = before is not None and before != DONE
+        open_after = after is not None and after != DONE
+        if before is None:
+            self.daily['created'][day] += 1
+            self._created[task_id] = minute
+        if open_after and not open_before:
+            self.daily['opened'][day] += 1
+        if open_before and not open_after:
+            self.daily['closed'][day] += 1
+        if after == 'In Progress':
+            self._started.setdefault(task_id, minute)
+        if after == DONE and before != DONE:
+            start = self._started.get(task_id, self._created.get(task_id, minute))
+            record['cycle_days'] = round(max(0, minute - start) / MINUTES_PER_DAY, 3)
+            self.daily['completed'][day] += 1
+            key = (week, record.get('assigned_to') or '')
+            self.weekly['completed'][key] += 1
+            self.weekly['cycle_days'][key] += record['cycle_days']
+        if after is None:
+            self._created.pop(task_id, None)
+            self._started.pop(task_id, None)
+
+    def daily_frame(self) -> pd.DataFrame:
+        """DAILY_COLUMNS per calendar day, every day from the first to the last one with a transition"""
+        frame = pd.DataFrame({column: pd.Series(counts, dtype='int64') for column, counts in self.daily.items()})
+        if frame.empty:
+            return frame
+        frame = frame.fillna(0).astype('int64').sort_index()
+        frame.index = pd.to_datetime(frame.index.to_numpy() - EPOCH_ORDINAL, unit='D')
+        frame = frame.asfreq('D', fill_value=0)
+        # Open tasks at the end of each day
+        frame['open'] = (frame['opened'] - frame['closed']).cumsum()
+        return frame
+
+    def weekly_frame(self) -> pd.DataFrame:
+        """Completions and mean cycle time in days per week (its Monday) and assignee"""
+        completed = pd.Series(self.weekly['completed'], dtype='int64')
+        if completed.empty:
+            return pd.DataFrame(columns=['week', 'assigned_to', 'completed', 'cycle_days'])
+        cycle_days = pd.Series(self.weekly['cycle_days'], dtype='float64').reindex(completed.index, fill_value=0)
+        frame = pd.DataFrame({'completed': completed, 'cycle_days': cycle_days / completed})
+        frame.index.names = ['week', 'assigned_to']
+        frame = frame.reset_index()
+        frame['week'] = pd.to_datetime(frame['week'].to_numpy() - EPOCH_ORDINAL, unit='D')
+        return frame.sort_values(['week', 'assigned_to'], ignore_index=True)
+
+
+class StatusHistory:
+    """Append-only JSON-lines file of status transitions, shared by every process"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = FileLock(path)
+
+    def _read(self) -> pd.DataFrame:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        # Arrow's multithreaded JSON reader, with a fixed schema since older lines lack cycle_days
+        options = pa_json.ParseOptions(explicit_schema=HISTORY_SCHEMA, unexpected_field_behavior='ignore')
+        return pa_json.read_json(self.path, parse_options=options).to_pandas()
+
+    def _write(self, records: List[Dict]):
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def append_many(self, records: List[Dict]):
+        if not records:
+            return
+        with self._lock:
+            self._write(records)
+
+    def load(self, tasks: Iterable[Dict] = ()) -> pd.DataFrame:
+        """The whole history; an empty file is first seeded from tasks (see seed_transitions)"""
+        with self._lock:
+            history = self._read()
+            if history.empty:
+                seed = seed_transitions(tasks)
+                if seed:
+                    self._write(seed)
+                    history = self._read()
+        return history
@@ -0,0 +1,86 @@
+"""Task id allocation that never hands out an id twice.
+
+The high-water mark of the ids handed out lives in a small counter file. When
+several processes share it, ids are reserved from it under a file lock as
+they are needed. A single process can instead hand ids out from memory and
+let its persistence worker write the new mark, so creating a task never
+waits on the counter file.
+"""
+import os
+import threading
+
+from locking import FileLock, atomic_write
+
+# Ids reserved from the counter file at a time; block=1 keeps ids consecutive
+# across restarts and in creation order across processes, at one locked write per allocation
+ID_BLOCK = 100
+
+
+class IdAllocator:
+    """Hands out increasing task ids backed by a high-water mark on disk.
+
+    The file holds the next id no process has reserved yet. Ids are reserved
+    in blocks under a FileLock, so concurrent writers (threads or processes)
+    get disjoint ranges, and an id stays used after its task is deleted and
+    the app restarts. Ids left in a block at shutdown are skipped, never
+    reused. With ``block=1`` ids are also ordered across processes.
+
+    With a ``writer`` (a PersistenceWorker), the file is read once and ids
+    are handed out from memory with no gaps. The new mark is written as a
+    job on the writer, queued ahead of the records that use the ids. Only
+    one process may allocate from the file this way.
+    """
+
+    def __init__(self, path: str, block: int = ID_BLOCK, writer=None):
+        self.path = path
+        self.block = block
+        self.writer = writer
+        self._lock = threading.Lock()
+        # Reserved ids not handed out yet: [_next, _end)
+        self._next = 0
+        self._end = 0
+        # Whether a write of the mark is queued on the writer and has not started yet
+        self._saving = False
+        if writer is not None:
+            self._next = self._read()
+
+    def allocate(self, count: int = 1, floor: int = 1) -> int:
+        """Reserve count consecutive ids, none below floor, and return the first"""
+        with self._lock:
+            first = max(self._next, floor)
+            if self.writer is not None:
+                self._next = first + count
+                self._save_later()
+                return first
+            if first + count > self._end:
+                first, self._end = self._reserve(max(count, self.block), floor)
+            self._next = first + count
+            return first
+
+    def _read(self) -> int:
+        if not os.path.exists(self.path):
+            return 1
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 1)
+
+    def _reserve(self, count: int, floor: int):
+        with FileLock(self.path):
+            first = max(self._read(), floor)
+            with atomic_write(self.path, 'w', encoding='utf-8') as f:
+                f.write(str(first + count))
+        return first, first + count
+
+    def _save_later(self):
+        # A queued write saves the mark as of when it runs, so one at a time is enough
+        if not self._saving:
+            self._saving = True
+            self.writer.submit(self._save)
+
+    def _save(self):
+        with self._lock:
+            self._saving = False
+            mark = self._next
+        with FileLock(self.path):
+            if self._read() < mark:
+                with atomic_write(self.path, 'w', encoding='utf-8') as f:
+                    f.write(str(mark))
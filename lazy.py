@@ -0,0 +1,26 @@
+"""Deferred imports for modules the first page render does not need."""
+import importlib
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    The stand-in is deliberately kept out of ``sys.modules``: code that walks
+    every loaded module (``inspect.getmodule``, which Streamlit calls on its
+    first element) would otherwise touch it and trigger the import.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
@@ -0,0 +1,86 @@
+"""File locking and atomic file replacement shared by the persistence layer."""
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path: str) -> threading.Lock:
+    # One lock per lock file, so every FileLock on the same path shares it
+    key = os.path.abspath(path)
+    with _thread_locks_guard:
+        if key not in _thread_locks:
+            _thread_locks[key] = threading.Lock()
+        return _thread_locks[key]
+
+
+class FileLock:
+    """Exclusive lock held across threads and processes.
+
+    Threads in one process serialize on a shared ``threading.Lock``; processes
+    serialize on an ``flock`` of ``<path>.lock``. Not reentrant.
+    """
+
+    def __init__(self, path: str):
+        self.lock_path = f"{path}.lock"
+        self._thread_lock = _thread_lock(self.lock_path)
+        self._fd = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            try:
+                self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except OSError:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', **kwargs):
+    """Write to a temporary file next to path and move it into place on success.
+
+    Readers see either the old file or the complete new one, never a
+    partially written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file private to the owner; match a normal file
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,124 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, Optional
+
+
+def _day(value) -> Optional[str]:
+    """The YYYY-MM-DD part of a date or datetime string"""
+    if isinstance(value, str) and len(value) >= 10:
+        return value[:10]
+    return None
+
+
+def _ordinal(value) -> Optional[int]:
+    day = _day(value)
+    if day is None:
+        return None
+    try:
+        return date.fromisoformat(day).toordinal()
+    except ValueError:
+        return None
+
+
+class DateBuckets:
+    """Counts of items per calendar day with O(log n) range queries.
+
+    Days are stored by ordinal in a sparse Fenwick tree, so adding an item
+    and counting items before or between two days never scans the buckets.
+    """
+
+    SIZE = date.max.toordinal() + 1
+
+    def __init__(self):
+        self._counts: Dict[int, int] = {}
+        self._tree: Dict[int, int] = {}
+
+    def add(self, ordinal: int, delta: int = 1):
+        self._counts[ordinal] = self._counts.get(ordinal, 0) + delta
+        if not self._counts[ordinal]:
+            del self._counts[ordinal]
+        i = ordinal
+        while i < self.SIZE:
+            self._tree[i] = self._tree.get(i, 0) + delta
+            i += i & -i
+
+    def count_until(self, ordinal: int) -> int:
+        """Items on or before the given day"""
+        total = 0
+        i = min(ordinal, self.SIZE - 1)
+        while i > 0:
+            total += self._tree.get(i, 0)
+            i -= i & -i
+        return total
+
+    def count_before(self, ordinal: int) -> int:
+        return self.count_until(ordinal - 1)
+
+    def count_between(self, start: int, end: int) -> int:
+        """Items from start to end inclusive"""
+        return self.count_until(end) - self.count_until(start - 1)
+
+    def count_on(self, ordinal: int) -> int:
+        return self._counts.get(ordinal, 0)
+
+
+class DashboardMetrics:
+    """Dashboard counts kept up to date as tasks are added, replaced and removed.
+
+    Open tasks (anything not Completed) are bucketed by end date, so overdue
+    and due-today counts are range queries rather than a pass over every task.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Counter = Counter()
+        self.created_on: Counter = Counter()
+        self.completed_on: Counter = Counter()
+        self.open_due = DateBuckets()
+
+    def _apply(self, task: Dict, sign: int):
+        self.total += sign
+        status = task.get('status')
+        self.by_status[status] += sign
+        created = _day(task.get('created_date'))
+        if created:
+            self.created_on[created] += sign
+        if status == 'Completed':
+            updated = _day(task.get('updated_date'))
+            if updated:
+                self.completed_on[updated] += sign
+        else:
+            due = _ordinal(task.get('end_date'))
+            if due is not None:
+                self.open_due.add(due, sign)
+
+    def add(self, task: Dict):
+        self._apply(task, 1)
+
+    def remove(self, task: Dict):
+        self._apply(task, -1)
+
+    def replace(self, old: Dict, new: Dict):
+        self._apply(old, -1)
+        self._apply(new, 1)
+
+    def status_count(self, status: str) -> int:
+        return self.by_status[status]
+
+    def created_count(self, day: date) -> int:
+        return self.created_on[day.isoformat()]
+
+    def completed_count(self, day: date) -> int:
+        return self.completed_on[day.isoformat()]
+
+    def overdue_count(self, today: date) -> int:
+        """Open tasks whose end date is today or earlier
+
+        An end date means midnight at the start of that day, so a task due
+        today is already overdue, as the dashboard has always counted it.
+        """
+        return self.open_due.count_until(today.toordinal())
+
+    def due_count(self, day: date) -> int:
+        """Open tasks due on the given day"""
+        return self.open_due.count_on(day.toordinal())
@@ -0,0 +1,190 @@
+"""Background persistence worker.
+
+The Streamlit script only enqueues writes; a single worker thread writes them
+to the change log (or SQLite), so a form submit never waits on the disk.
+"""
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Maximum number of queued writes; enqueueing blocks when the worker falls this far behind
+QUEUE_SIZE = 10_000
+# Maximum number of change records coalesced into one log write
+BATCH_SIZE = 500
+# A failed write is retried after RETRY_DELAY, 2 * RETRY_DELAY, 4 * RETRY_DELAY, ... seconds
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30.0
+
+_STOP = object()
+
+
+class Ticket:
+    """Acknowledgement for one queued write.
+
+    ``wait`` returns True once the write is durable on disk. A change record
+    that fails to write is retried until it succeeds, so ``wait`` only raises
+    for a failed job, or for records the worker gave up on when it was closed.
+    """
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def _resolve(self, error: Optional[BaseException] = None):
+        self.error = error
+        self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if not self._done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+
+class PersistenceWorker:
+    """Writes task changes and snapshot jobs to storage on a background thread.
+
+    Stands in for the log given to TaskStore: ``append`` and ``checkpoint``
+    enqueue and return a Ticket immediately. The worker drains whatever has
+    queued up while it was busy and writes all consecutive change records with
+    one ``append_many`` call, so a burst of edits costs one write and one
+    fsync. Status transitions queued with ``append_history`` are coalesced
+    the same way and written right after those records. Writes happen
+    strictly in the order they were enqueued. A failed
+    write is kept and retried with backoff, holding up everything queued
+    after it; ``failing`` is its error until it gets through. Call ``close``
+    on shutdown to flush what is still queued.
+    """
+
+    def __init__(self, log, max_queue: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE):
+        self.log = log
+        self.batch_size = batch_size
+        self.last_error: Optional[BaseException] = None
+        # Error of the write being retried; None while writes succeed
+        self.failing: Optional[BaseException] = None
+        self.retries = 0
+        self.batches_written = 0
+        self.records_written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='task-persistence', daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> Ticket:
+        if self._closed:
+            raise RuntimeError("Persistence worker is closed")
+        ticket = Ticket()
+        self._queue.put((item, ticket))
+        return ticket
+
+    def append(self, op: str, task_id: int, data: Optional[Dict] = None) -> Ticket:
+        """Queue one change record"""
+        return self._put(('records', [(op, task_id, data)]))
+
+    def append_many(self, records: List[Tuple[str, int, Optional[Dict]]]) -> Ticket:
+        """Queue a batch of change records, written together"""
+        return self._put(('records', list(records)))
+
+    def append_history(self, history, transitions: List[Dict]) -> Ticket:
+        """Queue status transitions for a StatusHistory, written after the change records queued before them"""
+        return self._put(('history', (history, list(transitions))))
+
+    def submit(self, job: Callable[[], None]) -> Ticket:
+        """Queue a job to run on the worker after everything queued before it"""
+        return self._put(('job', job))
+
+    def checkpoint(self, tasks: List[Dict]) -> Ticket:
+        return self.submit(lambda: self.log.checkpoint(tasks))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is on disk; False on timeout"""
+        if self._closed:
+            return True
+        return self.submit(lambda: None).wait(timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush the queue and stop the worker thread"""
+        if self._closed:
+            return
+        self._queue.put((_STOP, None))
+        self._closed = True
+        # Cuts a retry wait short; a write still failing then is given up
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Coalesce everything that queued up while the last batch was written
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._process(batch):
+                return
+
+    def _process(self, batch) -> bool:
+        records, transitions, tickets = [], {}, []
+        for item, ticket in batch:
+            if item is _STOP:
+                self._write(records, transitions, tickets)
+                return False
+            kind, payload = item
+            if kind == 'records':
+                records.extend(payload)
+                tickets.append(ticket)
+                continue
+            if kind == 'history':
+                history, entries = payload
+                transitions.setdefault(history, []).extend(entries)
+                tickets.append(ticket)
+                continue
+            # A job runs after the records queued before it
+            self._write(records, transitions, tickets)
+            records, transitions, tickets = [], {}, []
+            try:
+                payload()
+                ticket._resolve()
+            except Exception as e:
+                self.last_error = e
+                ticket._resolve(e)
+        self._write(records, transitions, tickets)
+        return True
+
+    def _write(self, records, transitions, tickets):
+        """Write the coalesced change records, then the status transitions, each with one call"""
+        error = None
+        if records:
+            error = self._retry(lambda: self.log.append_many(records))
+            if error is None:
+                self.batches_written += 1
+                self.records_written += len(records)
+        for history, entries in transitions.items():
+            error = self._retry(lambda: history.append_many(entries)) or error
+        for ticket in tickets:
+            ticket._resolve(error)
+
+    def _retry(self, write: Callable[[], None]) -> Optional[BaseException]:
+        """Run write until it succeeds; its last error if the worker is closed first"""
+        delay = RETRY_DELAY
+        while True:
+            try:
+                write()
+                self.failing = None
+                return None
+            except Exception as e:
+                self.last_error = self.failing = e
+                if self._stopping.is_set():
+                    return e
+            self.retries += 1
+            self._stopping.wait(delay)
+            delay = min(MAX_RETRY_DELAY, delay * 2)
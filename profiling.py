@@ -0,0 +1,160 @@
+"""Opt-in timing and memory instrumentation for Streamlit reruns.
+
+Enable with ``TASKS_PROFILE=1``. Each script rerun becomes a trace of nested
+spans (page functions, chart builders, storage calls) with wall time and the
+change in traced Python memory. When profiling is off the decorators return
+the original functions, so instrumented code pays nothing.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+PROFILING_ENABLED = os.environ.get('TASKS_PROFILE', '') not in ('', '0')
+# Optional file that every finished rerun is appended to as one JSON line
+PROFILE_TRACE_FILE = os.environ.get('TASKS_PROFILE_TRACE')
+# Number of finished reruns kept in memory for the admin panel
+KEEP_RERUNS = 50
+
+
+class Profiler:
+    """Collects per-rerun span timings and memory deltas.
+
+    Spans are recorded against the rerun running on the current thread, which
+    is how Streamlit runs each session's script. Memory deltas come from
+    ``tracemalloc`` and so include allocations made by other threads during
+    the span; treat them as indicative under concurrent sessions.
+    """
+
+    def __init__(self, enabled: bool = PROFILING_ENABLED, keep: int = KEEP_RERUNS,
+                 trace_file: Optional[str] = PROFILE_TRACE_FILE):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self._runs = deque(maxlen=keep)
+        self._runs_lock = threading.Lock()
+        self._local = threading.local()
+        self._sequence = 0
+
+    def _current(self) -> Optional[Dict]:
+        return getattr(self._local, 'run', None)
+
+    @contextmanager
+    def rerun(self, label: str = 'rerun'):
+        """Record everything inside the block as one rerun trace"""
+        if not self.enabled or self._current() is not None:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        with self._runs_lock:
+            self._sequence += 1
+            sequence = self._sequence
+        run = {'rerun': sequence, 'label': label, 'thread': threading.get_ident(),
+               'started_at': time.time(), 'spans': []}
+        self._local.run = run
+        self._local.depth = 0
+        try:
+            with self.span(label):
+                yield
+        finally:
+            self._local.run = None
+            run['duration_ms'] = run['spans'][0]['duration_ms'] if run['spans'] else 0.0
+            with self._runs_lock:
+                self._runs.append(run)
+            if self.trace_file:
+                self._append_to_file(run)
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the block as a child of the innermost open span"""
+        run = self._current()
+        if run is None:
+            yield
+            return
+        span = {'name': name, 'depth': self._local.depth,
+                'offset_ms': (time.time() - run['started_at']) * 1000}
+        # Record in start order so the list reads as a call tree
+        run['spans'].append(span)
+        memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        self._local.depth += 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            span['duration_ms'] = (time.perf_counter() - start) * 1000
+            span['memory_delta_kb'] = (tracemalloc.get_traced_memory()[0] - memory_before) / 1024
+
+    def profile(self, name: Optional[str] = None):
+        """Decorator recording each call of the function as a span"""
+        def decorator(fn):
+            if not self.enabled:
+                return fn
+            span_name = name or fn.__name__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def runs(self) -> List[Dict]:
+        """Finished reruns, oldest first"""
+        with self._runs_lock:
+            return list(self._runs)
+
+    def summary(self) -> List[Dict]:
+        """Per-span call count and timing statistics over the kept reruns"""
+        durations: Dict[str, List[float]] = {}
+        memory: Dict[str, float] = {}
+        for run in self.runs():
+            for span in run['spans']:
+                durations.setdefault(span['name'], []).append(span['duration_ms'])
+                memory[span['name']] = memory.get(span['name'], 0.0) + span['memory_delta_kb']
+        rows = []
+        for name, values in durations.items():
+            values.sort()
+            rows.append({
+                'span': name,
+                'calls': len(values),
+                'mean_ms': sum(values) / len(values),
+                'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max_ms': values[-1],
+                'mean_memory_kb': memory[name] / len(values),
+            })
+        rows.sort(key=lambda row: row['mean_ms'], reverse=True)
+        return rows
+
+    def trace_events(self) -> Dict:
+        """Kept reruns in Chrome trace event format (chrome://tracing, Perfetto)"""
+        events = []
+        for run in self.runs():
+            start_us = run['started_at'] * 1_000_000
+            for span in run['spans']:
+                events.append({
+                    'name': span['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': run['thread'],
+                    'ts': start_us + span['offset_ms'] * 1000,
+                    'dur': span['duration_ms'] * 1000,
+                    'args': {'rerun': run['rerun'], 'memory_delta_kb': round(span['memory_delta_kb'], 1)},
+                })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_json(self) -> bytes:
+        return json.dumps(self.trace_events()).encode('utf-8')
+
+    def _append_to_file(self, run: Dict):
+        try:
+            with open(self.trace_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(run) + '\n')
+        except OSError:
+            # Profiling must never break the app
+            pass
+
+
+profiler = Profiler()
@@ -0,0 +1,446 @@
+"""Dependency-aware scheduling with the critical path method.
+
+A task may list the ids of the tasks it depends on in ``depends_on``; it can
+start once all of them are finished (finish-to-start). ``Schedule`` keeps the
+dependency graph in topological order and computes, per task, the earliest
+start and finish (forward pass), the latest start and finish that do not
+delay the task's project (backward pass) and the slack between them. Tasks
+without slack are on their project's critical path.
+
+Dates are day ordinals, finishes are exclusive (the day after end_date), and
+a task never starts before its own start_date. Tasks without valid dates are
+left out of the schedule.
+"""
+import heapq
+import json
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set
+
+# Rebuild the topological order once removed tasks make up this share of it
+ORDER_GARBAGE_FRACTION = 0.5
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a dependency would make a task (indirectly) depend on itself"""
+
+
+def decode_dependencies(value) -> List[int]:
+    """Task ids from a stored depends_on value (a list, a JSON array or nothing); junk is skipped"""
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = json.loads(text) if text.startswith('[') else text.split(',')
+        except ValueError:
+            return []
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    ids = []
+    for task_id in value:
+        try:
+            ids.append(int(task_id))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def decode_dependencies_column(values: Iterable) -> List[List[int]]:
+    """Decode a whole column of stored depends_on values, each distinct string once"""
+    decoded: Dict[object, List[int]] = {}
+    result = []
+    for value in values:
+        if not isinstance(value, str):
+            result.append(decode_dependencies(value))
+            continue
+        ids = decoded.get(value)
+        if ids is None:
+            ids = decoded[value] = decode_dependencies(value)
+        result.append(list(ids))
+    return result
+
+
+def encode_dependencies(value) -> str:
+    """Encode a dependency list as a JSON array"""
+    # Tasks without dependencies come through a DataFrame as NaN
+    return json.dumps(decode_dependencies(value))
+
+
+def parse_dependencies(text: str) -> List[int]:
+    """Task ids from user input such as "12, #15 18"; raises ValueError on anything else"""
+    ids = []
+    for part in text.replace(',', ' ').split():
+        part = part.lstrip('#')
+        if not part.isdigit():
+            raise ValueError(f"'{part}' is not a task id")
+        ids.append(int(part))
+    return list(dict.fromkeys(ids))
+
+
+_ordinals: Dict[str, Optional[int]] = {}
+
+
+def _ordinal(value) -> Optional[int]:
+    # Dates repeat a lot across tasks, so each distinct string is parsed once
+    if not isinstance(value, str):
+        return None
+    if value not in _ordinals:
+        try:
+            _ordinals[value] = date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            _ordinals[value] = None
+    return _ordinals[value]
+
+
+class Schedule:
+    """Critical path schedule kept up to date as tasks are added, replaced and removed.
+
+    Changes only mark tasks dirty; ``refresh`` (called by every query) then
+    re-runs the forward pass from the dirty tasks down through their
+    dependents in topological order, stopping wherever a finish does not
+    move, and the backward pass up through their dependencies. Moving one
+    task's dates therefore only touches its downstream (and upstream)
+    subgraph. The topological order is rebuilt only when a new dependency
+    points forward in it.
+
+    Dependencies on unknown tasks are ignored until that task exists. Tasks
+    in or behind a dependency cycle (only possible in data written outside
+    the app) are scheduled as if the edges closing the cycle were not there,
+    and listed in ``cyclic``.
+    """
+
+    def __init__(self, tasks: Iterable[Dict] = ()):
+        # Inputs
+        self._start: Dict[int, int] = {}
+        self._duration: Dict[int, int] = {}
+        self._project: Dict[int, object] = {}
+        self._preds: Dict[int, tuple] = {}
+        self._succs: Dict[int, Set[int]] = {}
+        self._members: Dict[object, Set[int]] = {}
+        # Topological order; may contain removed ids until the next rebuild
+        self._order: List[int] = []
+        self._rank: Dict[int, int] = {}
+        # Results
+        self.earliest_start: Dict[int, int] = {}
+        self.earliest_finish: Dict[int, int] = {}
+        self.latest_start: Dict[int, int] = {}
+        self.latest_finish: Dict[int, int] = {}
+        self.project_finish: Dict[object, int] = {}
+        self.cyclic: Set[int] = set()
+        # Pending work
+        self._rebuild = True
+        self._dirty_forward: Set[int] = set()
+        self._dirty_backward: Set[int] = set()
+        self._dirty_projects: Set = set()
+        for task in tasks:
+            self.add(task)
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._start
+
+    # Changes
+    def add(self, task: Dict):
+        task_id = task['id']
+        start, end = _ordinal(task.get('start_date')), _ordinal(task.get('end_date'))
+        if start is None or end is None:
+            return
+        depends_on = task.get('depends_on')
+        preds = ()
+        if depends_on:
+            if not isinstance(depends_on, list):
+                depends_on = decode_dependencies(depends_on)
+            preds = tuple(pred for pred in depends_on if pred != task_id)
+        self._start[task_id] = start
+        self._duration[task_id] = max(1, end - start + 1)
+        project = task.get('project') or ''
+        self._project[task_id] = project
+        self._members.setdefault(project, set()).add(task_id)
+        self._preds[task_id] = preds
+        for pred in preds:
+            self._succs.setdefault(pred, set()).add(task_id)
+        if self._rebuild:
+            return
+        rank = self._rank.get(task_id)
+        if rank is None:
+            # Appending keeps the order valid unless an existing task already depends on this one
+            if any(succ in self._start for succ in self._succs.get(task_id, ())):
+                self._rebuild = True
+                return
+            rank = self._rank[task_id] = len(self._order)
+            self._order.append(task_id)
+        if any(self._rank.get(pred, -1) > rank for pred in preds if pred in self._start):
+            self._rebuild = True
+            return
+        self._dirty_forward.add(task_id)
+        self._dirty_backward.add(task_id)
+        self._dirty_backward.update(pred for pred in preds if pred in self._start)
+
+    def remove(self, task: Dict):
+        task_id = task['id']
+        if task_id not in self._start:
+            return
+        if task_id in self.cyclic:
+            # Removing a task (or its edges) may break its cycle, turning the edges that were
+            # skipped into real dependencies; only a new topological order tells which
+            self._rebuild = True
+        for pred in self._preds.pop(task_id):
+            succs = self._succs.get(pred)
+            if succs is not None:
+                succs.discard(task_id)
+                if not succs:
+                    del self._succs[pred]
+                if pred in self._start:
+                    self._dirty_backward.add(pred)
+        project = self._project.pop(task_id)
+        self._members[project].discard(task_id)
+        if not self._members[project]:
+            del self._members[project]
+            self.project_finish.pop(project, None)
+        else:
+            # The project may finish earlier now
+            self._dirty_projects.add(project)
+        del self._start[task_id], self._duration[task_id]
+        for results in (self.earliest_start, self.earliest_finish, self.latest_start, self.latest_finish):
+            results.pop(task_id, None)
+        self._dirty_forward.update(succ for succ in self._succs.get(task_id, ()) if succ in self._start)
+        self._dirty_forward.discard(task_id)
+        self._dirty_backward.discard(task_id)
+        self.cyclic.discard(task_id)
+
+    def replace(self, old: Dict, new: Dict):
+        if (old.get('start_date') == new.get('start_date') and old.get('end_date') == new.get('end_date')
+                and old.get('project') == new.get('project')
+                and old.get('depends_on') == new.get('depends_on')):
+            return
+        # Keep the task's place in the order, so only a new forward edge forces a rebuild
+        rank = self._rank.get(old['id'])
+        self.remove(old)
+        if rank is not None:
+            self._rank[old['id']] = rank
+        self.add(new)
+
+    # Cycle checks
+    def cycle_path(self, task_id: int, depends_on: Iterable[int]) -> Optional[List[int]]:
+        """The dependency chain that task_id depending on depends_on would close, if any.
+
+        Returns [task_id, ..., task_id] following dependencies, or None.
+        """
+        targets = set(depends_on)
+        if task_id in targets:
+            return [task_id, task_id]
+        # Walk the dependents of task_id; reaching one of its new dependencies closes a cycle
+        parents = {task_id: None}
+        stack = [task_id]
+        while stack:
+            current = stack.pop()
+            for succ in self._succs.get(current, ()):
+                if succ in parents:
+                    continue
+                parents[succ] = current
+                if succ in targets:
+                    path = [succ]
+                    while path[-1] != task_id:
+                        path.append(parents[path[-1]])
+                    # path runs from the dependency back up to task_id; task_id depends on its start
+                    return [task_id] + path
+                stack.append(succ)
+        return None
+
+    # Passes
+    def refresh(self):
+        """Bring the results up to date with the changes made since the last call"""
+        if self._rebuild:
+            self._full()
+        elif self._dirty_forward or self._dirty_backward or self._dirty_projects:
+            self._incremental()
+
+    def _topological_order(self):
+        start, succs = self._start, self._succs
+        indegree = dict.fromkeys(start, 0)
+        for task_id in start:
+            for succ in succs.get(task_id, ()):
+                if succ in indegree:
+                    indegree[succ] += 1
+        # Kahn's algorithm; the loop also visits the tasks appended while it runs
+        order = [task_id for task_id, count in indegree.items() if not count]
+        for task_id in order:
+            for succ in succs.get(task_id, ()):
+                count = indegree.get(succ)
+                if count is not None:
+                    indegree[succ] = count - 1
+                    if count == 1:
+                        order.append(succ)
+        # Whatever is left sits on a cycle; place it in id order and skip the closing edges
+        self.cyclic = set(start) - set(order)
+        order.extend(sorted(self.cyclic))
+        self._order = order
+        self._rank = {task_id: rank for rank, task_id in enumerate(order)}
+
+    def _forward(self, task_id: int) -> bool:
+        """Recompute the earliest dates of one task; True if its finish moved"""
+        rank = self._rank[task_id]
+        earliest = self._start[task_id]
+        finishes = self.earliest_finish
+        for pred in self._preds[task_id]:
+            finish = finishes.get(pred)
+            if finish is not None and finish > earliest and self._rank[pred] < rank:
+                earliest = finish
+        finish = earliest + self._duration[task_id]
+        self.earliest_start[task_id] = earliest
+        if finishes.get(task_id) == finish:
+            return False
+        finishes[task_id] = finish
+        return True
+
+    def _backward(self, task_id: int) -> bool:
+        """Recompute the latest dates of one task; True if its latest start moved"""
+        rank = self._rank[task_id]
+        latest = self.project_finish[self._project[task_id]]
+        starts = self.latest_start
+        for succ in self._succs.get(task_id, ()):
+            start = starts.get(succ)
+            if start is not None and start < latest and self._rank[succ] > rank:
+                latest = start
+        start = latest - self._duration[task_id]
+        self.latest_finish[task_id] = latest
+        if starts.get(task_id) == start:
+            return False
+        starts[task_id] = start
+        return True
+
+    def _project_finishes(self, projects: Iterable) -> Set:
+        """Recompute the finish of the given projects; returns the ones that moved"""
+        moved = set()
+        finishes = self.earliest_finish
+        for project in projects:
+            members = self._members.get(project)
+            if not members:
+                continue
+            finish = max(finishes[task_id] for task_id in members)
+            if self.project_finish.get(project) != finish:
+                self.project_finish[project] = finish
+                moved.add(project)
+        return moved
+
+    def _full(self):
+        self._topological_order()
+        start, duration, project_of = self._start, self._duration, self._project
+        # Same passes as _forward and _backward, inlined for speed. A neighbour that comes
+        # later in the order (a cycle-closing edge) has no result yet, so no rank checks
+        earliest_start, earliest_finish = {}, {}
+        for task_id in self._order:
+            earliest = start[task_id]
+            for pred in self._preds[task_id]:
+                finish = earliest_finish.get(pred)
+                if finish is not None and finish > earliest:
+                    earliest = finish
+            earliest_start[task_id] = earliest
+            earliest_finish[task_id] = earliest + duration[task_id]
+        project_finish = {}
+        for task_id, finish in earliest_finish.items():
+            project = project_of[task_id]
+            if finish > project_finish.get(project, finish - 1):
+                project_finish[project] = finish
+        latest_start, latest_finish = {}, {}
+        for task_id in reversed(self._order):
+            latest = project_finish[project_of[task_id]]
+            for succ in self._succs.get(task_id, ()):
+                succ_start = latest_start.get(succ)
+                if succ_start is not None and succ_start < latest:
+                    latest = succ_start
+            latest_finish[task_id] = latest
+            latest_start[task_id] = latest - duration[task_id]
+        self.earliest_start, self.earliest_finish = earliest_start, earliest_finish
+        self.latest_start, self.latest_finish = latest_start, latest_finish
+        self.project_finish = project_finish
+        self._rebuild = False
+        self._clear_dirty()
+
+    def _clear_dirty(self):
+        self._dirty_forward.clear()
+        self._dirty_backward.clear()
+        self._dirty_projects.clear()
+
+    def _incremental(self):
+        if len(self._order) > len(self._start) / ORDER_GARBAGE_FRACTION:
+            self._full()
+            return
+        rank, start = self._rank, self._start
+        # Forward pass over the dirty tasks and whatever their moved finishes reach downstream
+        heap = [(rank[task_id], task_id) for task_id in self._dirty_forward]
+        heapq.heapify(heap)
+        done = set()
+        touched_projects = {self._project[task_id] for task_id in self._dirty_forward} | self._dirty_projects
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            if task_id in done:
+                continue
+            done.add(task_id)
+            if self._forward(task_id):
+                touched_projects.add(self._project[task_id])
+                for succ in self._succs.get(task_id, ()):
+                    if succ in start and succ not in done:
+                        heapq.heappush(heap, (rank[succ], succ))
+        dirty = set(self._dirty_backward)
+        for project in self._project_finishes(touched_projects | {self._project[task_id]
+                                                                   for task_id in dirty}):
+            # Every task of a project whose finish moved gets a new deadline
+            dirty.update(self._members[project])
+        # Backward pass over the dirty tasks and whatever their moved starts reach upstream
+        heap = [(-rank[task_id], task_id) for task_id in dirty]
+        heapq.heapify(heap)
+        done = set()
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            if task_id in done:
+                continue
+            done.add(task_id)
+            if self._backward(task_id):
+                for pred in self._preds[task_id]:
+                    if pred in start and pred not in done:
+                        heapq.heappush(heap, (-rank[pred], pred))
+        self._clear_dirty()
+
+    # Results
+    def slack(self, task_id: int) -> Optional[int]:
+        """Days task_id can slip without delaying its project"""
+        self.refresh()
+        if task_id not in self._start:
+            return None
+        return self.latest_start[task_id] - self.earliest_start[task_id]
+
+    def slacks(self) -> Dict[int, int]:
+        self.refresh()
+        latest = self.latest_start
+        return {task_id: latest[task_id] - earliest for task_id, earliest in self.earliest_start.items()}
+
+    def critical_tasks(self) -> Set[int]:
+        """Tasks without slack"""
+        return {task_id for task_id, slack in self.slacks().items() if slack <= 0}
+
+    def critical_path(self, project=None) -> List[int]:
+        """One chain of critical tasks ending at the finish of project (default: the latest finishing one)"""
+        self.refresh()
+        if not self.project_finish:
+            return []
+        if project is None:
+            project = max(self.project_finish, key=self.project_finish.get)
+        finish = self.project_finish.get(project)
+        if finish is None:
+            return []
+        critical = self.critical_tasks()
+        current = min((task_id for task_id in self._members[project]
+                       if task_id in critical and self.earliest_finish[task_id] == finish),
+                      key=self._rank.get, default=None)
+        path = []
+        while current is not None:
+            path.append(current)
+            earliest = self.earliest_start[current]
+            # Follow the critical dependency that finishes exactly when this task can start
+            current = next((pred for pred in self._preds[current]
+                            if pred in critical and pred not in self.cyclic
+                            and self.earliest_finish[pred] == earliest), None)
+        return path[::-1]
@@ -0,0 +1,119 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+# Task fields whose words are searchable
+SEARCH_FIELDS = ('title', 'project')
+
+_TOKEN_RE = re.compile(r'[0-9a-z]+')
+
+
+def tokenize(text) -> List[str]:
+    if not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _title_key(task: Dict) -> str:
+    return str(task.get('title') or '').strip().lower()
+
+
+def task_tokens(task: Dict) -> Set[str]:
+    tokens = set()
+    for field in SEARCH_FIELDS:
+        tokens.update(tokenize(task.get(field)))
+    for tag in task.get('tags') or ():
+        tokens.update(tokenize(tag))
+    return tokens
+
+
+class TaskSearchIndex:
+    """Prefix-searchable token index over task titles, projects and tags.
+
+    Tokens map to the ids of tasks containing them, and a sorted list of the
+    distinct tokens lets every token starting with a typed prefix be found
+    with two bisections. The index is updated incrementally as tasks change.
+    """
+
+    def __init__(self, tasks: Iterable[Dict] = ()):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._titles: Dict[str, Set[int]] = defaultdict(set)
+        self._ids: Set[int] = set()
+        # Bulk build: fill the postings first and sort the vocabulary once
+        for task in tasks:
+            self._ids.add(task['id'])
+            self._titles[_title_key(task)].add(task['id'])
+            for token in task_tokens(task):
+                self._postings[token].add(task['id'])
+        self._tokens: List[str] = sorted(self._postings)
+
+    def add(self, task: Dict):
+        task_id = task['id']
+        self._ids.add(task_id)
+        self._titles[_title_key(task)].add(task_id)
+        for token in task_tokens(task):
+            postings = self._postings[token]
+            if not postings:
+                insort(self._tokens, token)
+            postings.add(task_id)
+
+    def remove(self, task: Dict):
+        task_id = task['id']
+        self._ids.discard(task_id)
+        title_ids = self._titles.get(_title_key(task))
+        if title_ids is not None:
+            title_ids.discard(task_id)
+            if not title_ids:
+                del self._titles[_title_key(task)]
+        for token in task_tokens(task):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(task_id)
+            if not postings:
+                del self._postings[token]
+                index = bisect_left(self._tokens, token)
+                if index < len(self._tokens) and self._tokens[index] == token:
+                    del self._tokens[index]
+
+    def replace(self, old: Dict, new: Dict):
+        self.remove(old)
+        self.add(new)
+
+    def _prefix_ids(self, prefix: str) -> Set[int]:
+        start = bisect_left(self._tokens, prefix)
+        end = bisect_left(self._tokens, prefix + '\uffff')
+        ids = set()
+        for token in self._tokens[start:end]:
+            ids |= self._postings[token]
+        return ids
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Ids of up to limit tasks matching every word of query as a prefix.
+
+        A query like ``#12`` or ``12`` also matches task 12 by id. The id match
+        and exact title matches come first, then the newest matching tasks.
+        """
+        text = query.strip().lower()
+        words = tokenize(text)
+        if not words:
+            return []
+        candidates = None
+        for word in sorted(words, key=len, reverse=True):
+            ids = self._prefix_ids(word)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+        candidates = candidates or set()
+
+        best = []
+        id_text = text.lstrip('#')
+        if id_text.isdigit() and int(id_text) in self._ids:
+            best.append(int(id_text))
+        best.extend(sorted(self._titles.get(text, ()), reverse=True))
+        best = list(dict.fromkeys(best))[:limit]
+        # Plain integer comparison keeps the top-k selection in C
+        rest = heapq.nlargest(limit, candidates.difference(best))
+        return (best + rest)[:limit]
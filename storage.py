@@ -0,0 +1,517 @@
+"""Storage backends for the task list.
+
+The file backends persist and restore the full task list; individual edits go
+to the change log (see task_log.py) and are folded into the snapshot by
+compaction. The SQLite backend writes each edit to its row directly.
+
+Migrate an existing CSV snapshot to Parquet with:
+
+    python storage.py team_tasks.csv team_tasks.parquet
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from locking import FileLock, atomic_write
+from scheduling import decode_dependencies, decode_dependencies_column, encode_dependencies
+from tags import decode_tags_column, encode_tags_column
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+# Rows per chunk when streaming snapshots in or out
+CHUNK_SIZE = 10_000
+# Columns a CSV import must have; rows without a numeric id are dropped
+REQUIRED_COLUMNS = ('id', 'title')
+# Change records kept in the SQLite change feed for other processes to catch up from
+CHANGE_RETENTION = 10_000
+
+
+def _field_names(tasks: List[Dict]) -> List[str]:
+    """Union of the task keys, in first-seen order"""
+    return list(dict.fromkeys(key for task in tasks for key in task))
+
+
+class TaskStorage:
+    """Base class for snapshot backends"""
+
+    extension = ''
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if self.exists() else 0
+
+    def mtime(self) -> int:
+        """Modification time in nanoseconds, for cache keys"""
+        return os.stat(self.path).st_mtime_ns if self.exists() else 0
+
+    def version(self):
+        """Value that changes whenever the stored tasks do, for cache keys"""
+        return self.mtime()
+
+    def load(self, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Return the stored tasks, optionally only the given columns"""
+        raise NotImplementedError
+
+    def save(self, tasks: List[Dict]):
+        """Replace the stored snapshot with tasks"""
+        raise NotImplementedError
+
+    def backup(self, dest: str):
+        """Copy the snapshot file to dest without loading it"""
+        with FileLock(self.path), atomic_write(dest, 'wb') as target, open(self.path, 'rb') as source:
+            shutil.copyfileobj(source, target)
+
+    def iter_csv(self) -> Iterator[bytes]:
+        """The snapshot as CSV, one chunk of rows at a time"""
+        tasks = self.load()
+        fields = _field_names(tasks)
+        for start in range(0, len(tasks), CHUNK_SIZE):
+            chunk = CsvStorage.to_dataframe(tasks[start:start + CHUNK_SIZE], fields)
+            yield chunk.to_csv(index=False, header=start == 0).encode('utf-8')
+
+    def export_csv(self) -> bytes:
+        """The snapshot as CSV bytes for download"""
+        return b''.join(self.iter_csv())
+
+
+class CsvStorage(TaskStorage):
+    """CSV snapshot with tags and dependencies stored as JSON arrays"""
+
+    extension = '.csv'
+
+    @staticmethod
+    def _validate(chunk: pd.DataFrame, required: Sequence[str]) -> pd.DataFrame:
+        """Check one chunk of an import and drop rows without a usable id"""
+        missing = [column for column in required if column not in chunk.columns]
+        if missing:
+            raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+        ids = pd.to_numeric(chunk['id'], errors='coerce')
+        chunk = chunk[ids.notna()].copy()
+        chunk['id'] = ids[ids.notna()].astype('int64')
+        if 'progress' in chunk.columns:
+            chunk['progress'] = pd.to_numeric(chunk['progress'], errors='coerce').fillna(0).clip(0, 100).astype('int64')
+        return chunk
+
+    @staticmethod
+    def _records(chunk: pd.DataFrame) -> List[Dict]:
+        # Decode the list columns in bulk, then build the task dicts column-wise
+        names = list(chunk.columns)
+        values = [decode_tags_column(chunk[name]) if name == 'tags' else
+                  decode_dependencies_column(chunk[name]) if name == 'depends_on' else
+                  chunk[name].tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def load(self, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        if not self.exists():
+            return []
+        required = REQUIRED_COLUMNS
+        if columns is not None:
+            required = ('id',)
+            if 'id' not in columns:
+                columns = ['id'] + list(columns)
+        tasks = []
+        try:
+            # Read in chunks so only CHUNK_SIZE rows are ever held as a DataFrame
+            for chunk in pd.read_csv(self.path, usecols=columns, chunksize=CHUNK_SIZE):
+                tasks.extend(self._records(self._validate(chunk, required)))
+        except pd.errors.EmptyDataError:
+            return []
+        if columns is None and tasks and 'tags' not in tasks[0]:
+            for task in tasks:
+                task['tags'] = []
+        return tasks
+
+    @staticmethod
+    def to_dataframe(tasks: List[Dict], fields: Optional[List[str]] = None) -> pd.DataFrame:
+        df_tasks = pd.DataFrame(tasks, columns=fields)
+        if 'tags' in df_tasks.columns:
+            # Store tag lists as JSON arrays
+            df_tasks['tags'] = encode_tags_column(df_tasks['tags'])
+        if 'depends_on' in df_tasks.columns:
+            df_tasks['depends_on'] = df_tasks['depends_on'].map(encode_dependencies)
+        return df_tasks
+
+    @classmethod
+    def to_csv(cls, tasks: List[Dict]) -> str:
+        return cls.to_dataframe(tasks).to_csv(index=False)
+
+    def save(self, tasks: List[Dict]):
+        fields = _field_names(tasks)
+        with FileLock(self.path), atomic_write(self.path, 'w', newline='', encoding='utf-8') as f:
+            for start in range(0, len(tasks), CHUNK_SIZE):
+                chunk = self.to_dataframe(tasks[start:start + CHUNK_SIZE], fields)
+                chunk.to_csv(f, index=False, header=start == 0)
+
+    def iter_csv(self) -> Iterator[bytes]:
+        if not self.exists():
+            return
+        with open(self.path, 'rb') as f:
+            while True:
+                block = f.read(1024 * 1024)
+                if not block:
+                    break
+                yield block
+
+
+class ParquetStorage(TaskStorage):
+    """Parquet snapshot with typed columns.
+
+    Dates are stored as date32, created/updated times as timestamps, tags as
+    list<string>, dependencies as list<int64>, and low-cardinality fields as dictionary-encoded strings.
+    Loads can read just the columns a caller needs.
+    """
+
+    extension = '.parquet'
+
+    STRING_FIELDS = ('title', 'description')
+    CATEGORY_FIELDS = ('assigned_to', 'created_by', 'status', 'priority', 'project')
+    DATE_FIELDS = ('start_date', 'end_date')
+    DATETIME_FIELDS = ('created_date', 'updated_date')
+
+    @staticmethod
+    def _clean(values: List) -> List:
+        # Legacy CSV rows carry NaN for empty cells
+        return [None if isinstance(v, float) and v != v else v for v in values]
+
+    @classmethod
+    def to_table(cls, tasks: List[Dict]) -> pa.Table:
+        fields = list(dict.fromkeys(key for task in tasks for key in task))
+        columns = {}
+        for field in fields:
+            values = cls._clean([task.get(field) for task in tasks])
+            if field == 'id':
+                columns[field] = pa.array(values, type=pa.int64())
+            elif field == 'progress':
+                columns[field] = pa.array(values, type=pa.int16())
+            elif field == 'tags':
+                columns[field] = pa.array([list(v) if v else [] for v in values], type=pa.list_(pa.string()))
+            elif field == 'depends_on':
+                columns[field] = pa.array([decode_dependencies(v) for v in values], type=pa.list_(pa.int64()))
+            elif field in cls.DATE_FIELDS:
+                columns[field] = pa.array(values, type=pa.string()).cast(pa.date32())
+            elif field in cls.DATETIME_FIELDS:
+                columns[field] = pc.strptime(pa.array(values, type=pa.string()), format=DATETIME_FORMAT,
+                                             unit='s', error_is_null=True)
+            elif field in cls.CATEGORY_FIELDS:
+                columns[field] = pa.array(values, type=pa.string()).dictionary_encode()
+            elif field in cls.STRING_FIELDS:
+                columns[field] = pa.array(values, type=pa.string())
+            else:
+                columns[field] = pa.array(values)
+        return pa.table(columns)
+
+    @staticmethod
+    def _column_values(column: pa.ChunkedArray) -> List:
+        if pa.types.is_dictionary(column.type):
+            # Decode through the dictionary so equal values share one str object
+            values = []
+            for chunk in column.chunks:
+                dictionary = chunk.dictionary.to_pylist()
+                values.extend(None if i is None else dictionary[i] for i in chunk.indices.to_pylist())
+            return values
+        if pa.types.is_date(column.type):
+            column = column.cast(pa.string())
+        elif pa.types.is_timestamp(column.type):
+            column = pc.strftime(column, format=DATETIME_FORMAT)
+        return column.to_pylist()
+
+    @classmethod
+    def from_table(cls, table: pa.Table) -> List[Dict]:
+        names = table.column_names
+        columns = [cls._column_values(table.column(i)) for i in range(len(names))]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    def load(self, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        if not self.exists():
+            return []
+        return self.from_table(pq.read_table(self.path, columns=columns))
+
+    def save(self, tasks: List[Dict]):
+        table = self.to_table(tasks)
+        with FileLock(self.path), atomic_write(self.path, 'wb') as f:
+            pq.write_table(table, f, compression='zstd')
+
+    def iter_csv(self) -> Iterator[bytes]:
+        if not self.exists():
+            return
+        parquet_file = pq.ParquetFile(self.path)
+        fields = parquet_file.schema_arrow.names
+        for i, batch in enumerate(parquet_file.iter_batches(batch_size=CHUNK_SIZE)):
+            tasks = self.from_table(pa.Table.from_batches([batch]))
+            chunk = CsvStorage.to_dataframe(tasks, fields)
+            yield chunk.to_csv(index=False, header=i == 0).encode('utf-8')
+
+
+class SqliteStorage(TaskStorage):
+    """SQLite database with one row per task.
+
+    Unlike the file snapshots, writes are applied row by row, so SQLite is
+    also the change log: ``append`` updates a single row in O(log N) and
+    there is nothing to compact. The database runs in WAL mode with a busy
+    timeout, so several Streamlit worker processes can share one file.
+
+    Every write also adds its records to a ``changes`` table in the same
+    transaction, which other processes read with ``read_since`` to keep
+    their in-memory copy current without reloading the table.
+    """
+
+    extension = '.db'
+
+    COLUMNS = ('id', 'title', 'description', 'assigned_to', 'priority', 'status', 'start_date',
+               'end_date', 'progress', 'project', 'tags', 'created_by', 'created_date', 'updated_date')
+    INDEXED_COLUMNS = ('assigned_to', 'status', 'end_date', 'project')
+    GROUPABLE_COLUMNS = ('status', 'priority', 'assigned_to', 'created_by', 'project')
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._local = threading.local()
+        self._schema_ready = False
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection for the calling thread, created on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            if not self._schema_ready:
+                self._create_schema(conn)
+                self._schema_ready = True
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        columns = ', '.join(
+            'id INTEGER PRIMARY KEY' if column == 'id' else
+            'progress INTEGER' if column == 'progress' else f'{column} TEXT'
+            for column in self.COLUMNS
+        )
+        # Fields outside COLUMNS are kept as a JSON object in `extra`
+        conn.execute(f'CREATE TABLE IF NOT EXISTS tasks ({columns}, extra TEXT)')
+        for column in self.INDEXED_COLUMNS:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks ({column})')
+        # Write counter shared by every process, bumped in the same transaction as each write
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
+        conn.execute('CREATE TABLE IF NOT EXISTS changes '
+                     '(seq INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, task_id INTEGER, data TEXT)')
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+
+    def data_version(self) -> int:
+        """Counter that changes on every write from any process, for cache keys"""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return row[0] if row is not None else 0
+
+    def version(self):
+        # In WAL mode writes land in the -wal file and leave the database file's mtime alone;
+        # the mtime still tells a replaced (e.g. restored) database from the old one
+        return self.mtime(), self.data_version()
+
+    def size(self) -> int:
+        return sum(os.path.getsize(path) for path in (self.path, f'{self.path}-wal')
+                   if os.path.exists(path))
+
+    @staticmethod
+    def _value(value):
+        # Legacy CSV rows carry NaN for empty cells
+        return None if isinstance(value, float) and value != value else value
+
+    def _row(self, task: Dict) -> Tuple:
+        values = [self._value(task.get(column)) for column in self.COLUMNS]
+        values[self.COLUMNS.index('tags')] = json.dumps(list(task.get('tags') or []))
+        extra = {key: value for key, value in task.items() if key not in self.COLUMNS}
+        return tuple(values) + (json.dumps(extra, default=str) if extra else None,)
+
+    @staticmethod
+    def _task(row: sqlite3.Row) -> Dict:
+        task = dict(row)
+        if 'tags' in task:
+            task['tags'] = json.loads(task['tags']) if task['tags'] else []
+        extra = task.pop('extra', None)
+        if extra:
+            task.update(json.loads(extra))
+        return task
+
+    def load(self, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        if columns is None:
+            selected = '*'
+        else:
+            selected = ', '.join(column for column in columns if column in self.COLUMNS) or 'id'
+        rows = self.connection.execute(f'SELECT {selected} FROM tasks ORDER BY id').fetchall()
+        return [self._task(row) for row in rows]
+
+    def _insert_sql(self) -> str:
+        placeholders = ', '.join('?' * (len(self.COLUMNS) + 1))
+        return f"INSERT OR REPLACE INTO tasks ({', '.join(self.COLUMNS)}, extra) VALUES ({placeholders})"
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the database write lock; writes made inside join this transaction"""
+        conn = self.connection
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            yield
+
+    def _transaction(self):
+        return nullcontext() if self.connection.in_transaction else self.exclusive()
+
+    def save(self, tasks: List[Dict]):
+        conn = self.connection
+        with self._transaction():
+            conn.execute('DELETE FROM tasks')
+            conn.executemany(self._insert_sql(), [self._row(task) for task in tasks])
+            # Readers of the change feed have to reload everything
+            conn.execute("INSERT INTO changes (op) VALUES ('reset')")
+            self._bump_version(conn)
+
+    def append(self, op: str, task_id: int, data: Optional[Dict] = None):
+        """Apply a single create/update/delete to its row"""
+        self.append_many([(op, task_id, data)])
+
+    def append_many(self, records: List[Tuple[str, int, Optional[Dict]]]):
+        """Apply several (op, id, data) changes in one transaction"""
+        conn = self.connection
+        with self._transaction():
+            for op, task_id, data in records:
+                if op == 'create':
+                    conn.execute(self._insert_sql(), self._row(data))
+                elif op == 'update':
+                    row = conn.execute('SELECT * FROM tasks WHERE id = ?', (task_id,)).fetchone()
+                    if row is not None:
+                        conn.execute(self._insert_sql(), self._row({**self._task(row), **data}))
+                elif op == 'delete':
+                    conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+            conn.executemany('INSERT INTO changes (op, task_id, data) VALUES (?, ?, ?)',
+                             [(op, task_id, json.dumps(data, default=str)) for op, task_id, data in records])
+            conn.execute('DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?', (CHANGE_RETENTION,))
+            self._bump_version(conn)
+
+    def position(self) -> int:
+        """Sequence number of the newest change record"""
+        return self.connection.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+
+    def read_since(self, position: int):
+        """(records, new position) for the changes after position, or None if a reload is needed"""
+        rows = self.connection.execute(
+            'SELECT seq, op, task_id, data FROM changes WHERE seq > ? ORDER BY seq', (position,)
+        ).fetchall()
+        if not rows:
+            return [], position
+        if rows[0]['seq'] != position + 1 or any(row['op'] == 'reset' for row in rows):
+            # Trimmed past our position, or the whole table was replaced
+            return None
+        records = [{'op': row['op'], 'id': row['task_id'], 'data': json.loads(row['data'])} for row in rows]
+        return records, rows[-1]['seq']
+
+    def replay(self, tasks: List[Dict]) -> List[Dict]:
+        # Every write is already in the table
+        return tasks
+
+    def compact(self):
+        pass
+
+    def checkpoint(self, tasks: List[Dict], since: Optional[int] = None):
+        # A reader of the change feed (since given) knows every write is already in the table
+        if since is None:
+            self.save(tasks)
+
+    def iter_csv(self) -> Iterator[bytes]:
+        cursor = self.connection.execute('SELECT * FROM tasks ORDER BY id')
+        fields = None
+        while True:
+            rows = cursor.fetchmany(CHUNK_SIZE)
+            if not rows:
+                break
+            tasks = [self._task(row) for row in rows]
+            header = fields is None
+            if header:
+                fields = _field_names(tasks)
+            yield CsvStorage.to_dataframe(tasks, fields).to_csv(index=False, header=header).encode('utf-8')
+
+    def backup(self, dest: str):
+        target = sqlite3.connect(dest)
+        try:
+            self.connection.backup(target)
+        finally:
+            target.close()
+
+    def count_by(self, column: str) -> List[Tuple[str, int]]:
+        """(value, count) pairs for column, most frequent first"""
+        if column not in self.GROUPABLE_COLUMNS:
+            raise ValueError(f"Cannot group tasks by '{column}'")
+        rows = self.connection.execute(
+            f'SELECT {column}, COUNT(*) AS n FROM tasks WHERE {column} IS NOT NULL '
+            f'GROUP BY {column} ORDER BY n DESC'
+        ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def dashboard_metrics(self, today: date) -> Dict[str, int]:
+        """The dashboard counts computed in a single aggregate query"""
+        day = today.isoformat()
+        row = self.connection.execute("""
+            SELECT COUNT(*) AS total,
+                   SUM(status = 'Completed') AS completed,
+                   SUM(status = 'In Progress') AS in_progress,
+                   SUM(status != 'Completed' AND end_date <= :day) AS overdue,
+                   SUM(status != 'Completed' AND end_date = :day) AS due_today,
+                   SUM(substr(created_date, 1, 10) = :day) AS created_today,
+                   SUM(status = 'Completed' AND substr(updated_date, 1, 10) = :day) AS completed_today
+            FROM tasks
+        """, {'day': day}).fetchone()
+        return {key: row[key] or 0 for key in row.keys()}
+
+
+STORAGE_BACKENDS = {
+    'csv': CsvStorage,
+    'parquet': ParquetStorage,
+    'sqlite': SqliteStorage,
+}
+
+
+def migrate(source: TaskStorage, dest: TaskStorage) -> int:
+    """Copy every task from source to dest and return how many were copied"""
+    tasks = source.load()
+    dest.save(tasks)
+    return len(tasks)
+
+
+def storage_for_path(path: str) -> TaskStorage:
+    extension = os.path.splitext(path)[1].lower()
+    for backend in STORAGE_BACKENDS.values():
+        if backend.extension == extension:
+            return backend(path)
+    raise ValueError(f"No storage backend for '{path}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate a task snapshot between storage backends")
+    parser.add_argument('source', help="existing snapshot, e.g. team_tasks.csv")
+    parser.add_argument('dest', help="new snapshot, e.g. team_tasks.parquet")
+    args = parser.parse_args()
+    source, dest = storage_for_path(args.source), storage_for_path(args.dest)
+    count = migrate(source, dest)
+    print(f"Migrated {count} tasks: {source.size()} bytes -> {dest.size()} bytes")
+
+
+if __name__ == '__main__':
+    main()
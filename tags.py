@@ -0,0 +1,66 @@
+"""Tag list encoding for the CSV snapshot.
+
+Tags are written as JSON arrays (``["backend", "ops"]``). Older files stored
+``str(list)`` reprs (``['backend', 'ops']``) or a bare tag; both still decode.
+Nothing is ever passed to ``eval``.
+"""
+import ast
+import json
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+
+def encode_tags(tags) -> str:
+    """Encode a tag list as a JSON array"""
+    # Tasks without tags come through a DataFrame as NaN
+    return json.dumps(decode_tags(tags), ensure_ascii=False)
+
+
+def decode_tags(value) -> List[str]:
+    """Decode one stored tag value in the JSON, legacy repr or bare-tag format"""
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(tag) for tag in value]
+    text = str(value).strip()
+    if not text:
+        return []
+    if not text.startswith('['):
+        return [text]
+    try:
+        tags = json.loads(text)
+    except ValueError:
+        try:
+            # Legacy str(list) format; literal_eval only accepts literals
+            tags = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return [text]
+    if not isinstance(tags, (list, tuple)):
+        return [str(tags)]
+    return [str(tag) for tag in tags]
+
+
+def encode_tags_column(column: pd.Series) -> pd.Series:
+    """Encode a column of tag lists"""
+    return column.map(encode_tags)
+
+
+def decode_tags_column(values: Iterable) -> List[List[str]]:
+    """Decode a whole column of stored tag values.
+
+    Each distinct stored string is decoded once; rows get their own copy of
+    the list so callers can safely modify it.
+    """
+    decoded: Dict[object, List[str]] = {}
+    result = []
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            result.append([str(tag) for tag in value])
+            continue
+        key = None if isinstance(value, float) and value != value else value
+        tags = decoded.get(key)
+        if tags is None:
+            tags = decoded[key] = decode_tags(key)
+        result.append(list(tags))
+    return result
@@ -0,0 +1,105 @@
+"""Validation of task files imported in bulk.
+
+``prepare_import`` checks and normalises every row of an uploaded file with
+column-wise pandas operations instead of one task at a time, and returns
+the rows ready for ``TaskStore.bulk_add`` along with the rejected ones.
+"""
+from datetime import date
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from scheduling import decode_dependencies_column
+from tags import decode_tags_column
+from task_model import PRIORITIES, STATUSES
+
+# Columns read from an import; anything else in the file is ignored
+IMPORT_COLUMNS = ('title', 'description', 'assigned_to', 'priority', 'status', 'start_date',
+                  'end_date', 'progress', 'project', 'tags', 'depends_on')
+DEFAULT_PRIORITY = 'Medium'
+DEFAULT_STATUS = 'Not Started'
+# End date of rows without one, counted from their start date
+DEFAULT_DURATION_DAYS = 7
+
+
+def _text(df: pd.DataFrame, column: str, default: str = '') -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype='object')
+    values = df[column].astype('string').str.strip()
+    return values.mask(values.isna() | (values == ''), default).astype('object')
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values.where(values != ''), errors='coerce', format='mixed').dt.normalize()
+
+
+def prepare_import(df: pd.DataFrame, users: Iterable[str], default_assignee: str,
+                   today: date, known_ids: Optional[Container[int]] = None) -> Tuple[List[Dict], pd.DataFrame]:
+    """Validate imported rows.
+
+    Returns the valid rows as task dicts without ids, and a DataFrame with
+    the file row number and the reasons of every rejected row. With
+    known_ids (the ids of the existing tasks), a row depending on any other
+    id is rejected, rather than failing the whole import when it is saved.
+    """
+    if 'title' not in df.columns:
+        raise ValueError("The file needs a 'title' column")
+    df = df.reset_index(drop=True)
+    title = _text(df, 'title')
+    assigned_to = _text(df, 'assigned_to', default_assignee)
+    priority = _text(df, 'priority', DEFAULT_PRIORITY).str.title()
+    status = _text(df, 'status', DEFAULT_STATUS)
+    # Match statuses case-insensitively ("in progress" -> "In Progress")
+    status = status.str.lower().map({value.lower(): value for value in STATUSES}).fillna(status)
+    start_text, end_text = _text(df, 'start_date'), _text(df, 'end_date')
+    start = _dates(start_text).fillna(pd.Timestamp(today))
+    end = _dates(end_text).fillna(start + pd.Timedelta(days=DEFAULT_DURATION_DAYS))
+    progress = pd.to_numeric(df['progress'], errors='coerce') if 'progress' in df.columns else pd.Series(0, index=df.index)
+
+    checks = [
+        (title == '', "missing title"),
+        (~assigned_to.isin(list(users)), "unknown assignee"),
+        (~priority.isin(PRIORITIES), "unknown priority"),
+        (~status.isin(STATUSES), "unknown status"),
+        ((start_text != '') & _dates(start_text).isna(), "invalid start date"),
+        ((end_text != '') & _dates(end_text).isna(), "invalid end date"),
+        (end < start, "end date before start date"),
+        (progress.notna() & ~progress.between(0, 100), "progress outside 0-100"),
+    ]
+    reasons = pd.Series('', index=df.index, dtype='object')
+    for failed, reason in checks:
+        reasons[failed] = reasons[failed] + reason + '; '
+    dependencies = decode_dependencies_column(df['depends_on']) if 'depends_on' in df.columns else None
+    if dependencies is not None and known_ids is not None:
+        unknown = pd.Series([', '.join(f'#{dep}' for dep in ids if dep not in known_ids) for ids in dependencies],
+                            index=df.index, dtype='object')
+        failed = unknown != ''
+        reasons[failed] = reasons[failed] + "unknown dependencies " + unknown[failed] + '; '
+    valid = reasons == ''
+
+    tasks = pd.DataFrame({
+        'title': title,
+        'description': _text(df, 'description'),
+        'assigned_to': assigned_to,
+        'priority': priority,
+        'status': status,
+        'start_date': start.dt.strftime('%Y-%m-%d'),
+        'end_date': end.dt.strftime('%Y-%m-%d'),
+        'progress': progress.fillna(0).clip(0, 100).astype('int64'),
+        'project': _text(df, 'project'),
+    })[valid]
+    records = tasks.to_dict('records')
+    if 'tags' in df.columns:
+        for task, tags in zip(records, decode_tags_column(df.loc[valid, 'tags'])):
+            task['tags'] = tags
+    else:
+        for task in records:
+            task['tags'] = []
+    if dependencies is not None:
+        for task, ids in zip(records, (ids for ids, ok in zip(dependencies, valid) if ok)):
+            task['depends_on'] = ids
+
+    # Row numbers as a spreadsheet shows them, below the header row
+    rejected = pd.DataFrame({'row': df.index[~valid] + 2, 'title': title[~valid],
+                             'errors': reasons[~valid].str.rstrip('; ')})
+    return records, rejected.reset_index(drop=True)
@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+from locking import FileLock
+
+# Number of appended records after which the log is folded into the snapshot
+COMPACT_EVERY = 500
+
+
+class TaskLog:
+    """Append-only change log of task create/update/delete records.
+
+    Each edit is a single JSON line appended to the log, so its cost does not
+    depend on how many tasks exist. The log is periodically compacted into the
+    snapshot file by a background thread: the active log is rotated to a
+    pending file, replayed over the previous snapshot and written out, so new
+    edits keep going to a fresh log while compaction runs. Appends and
+    compaction take file locks, so several threads or processes can share
+    one log.
+
+    The log doubles as a change feed between processes. Each log file starts
+    with a ``begin`` record naming its generation, and a reader's position is
+    a (generation, byte offset) pair; ``read_since`` returns the records
+    appended after a position, following the log into the pending file when
+    it was rotated, or None once those records have been compacted away.
+    """
+
+    def __init__(self, path: str,
+                 load_snapshot: Callable[[], List[Dict]],
+                 save_snapshot: Callable[[List[Dict]], None],
+                 compact_every: int = COMPACT_EVERY):
+        self.path = path
+        self.pending_path = f"{path}.compacting"
+        self.load_snapshot = load_snapshot
+        self.save_snapshot = save_snapshot
+        self.compact_every = compact_every
+        self._lock = FileLock(path)
+        self._compact_lock = FileLock(self.pending_path)
+        self._compactor: Optional[threading.Thread] = None
+        self._records = self._count_records(self.path)
+        self._local = threading.local()
+
+    @staticmethod
+    def _count_records(path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    @staticmethod
+    def _has_records(path: str) -> bool:
+        """Whether the log holds anything besides its generation record"""
+        try:
+            with open(path, 'rb') as f:
+                first = f.readline()
+                if not first.startswith(b'{"op": "begin"'):
+                    return bool(first.strip())
+                return bool(f.read(1))
+        except OSError:
+            return False
+
+    @staticmethod
+    def _read_records(path: str) -> List[Dict]:
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted write is skipped
+                    continue
+        return records
+
+    @staticmethod
+    def apply(tasks_by_id: Dict[int, Dict], record: Dict):
+        """Apply one log record to a mapping of task id to task"""
+        op = record['op']
+        task_id = record['id']
+        if op == 'create':
+            tasks_by_id[task_id] = dict(record['data'])
+        elif op == 'update':
+            if task_id in tasks_by_id:
+                tasks_by_id[task_id].update(record['data'])
+        elif op == 'delete':
+            tasks_by_id.pop(task_id, None)
+
+    def append(self, op: str, task_id: int, data: Optional[Dict] = None):
+        """Append one change record and schedule compaction when the log is long"""
+        self._write([{'op': op, 'id': task_id, 'data': data}], sync=False)
+
+    def append_many(self, records: List[Tuple[str, int, Optional[Dict]]]):
+        """Append several (op, id, data) records with a single write and fsync"""
+        self._write([{'op': op, 'id': task_id, 'data': data} for op, task_id, data in records], sync=True)
+
+    def _locked(self):
+        # Inside exclusive() this thread already holds the (non-reentrant) lock
+        return nullcontext() if getattr(self._local, 'exclusive', False) else self._lock
+
+    def _write(self, records: List[Dict], sync: bool):
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        with self._locked():
+            if not os.path.exists(self.path):
+                self._start_log()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                if sync:
+                    os.fsync(f.fileno())
+            self._records += len(records)
+            should_compact = self._records >= self.compact_every
+        if should_compact:
+            self.compact_in_background()
+
+    def replay(self, tasks: List[Dict]) -> List[Dict]:
+        """Return the snapshot tasks with the pending and active log tails applied
+
+        tasks must not have been read while a compaction was replacing the
+        snapshot; ``load`` takes care of that.
+        """
+        tasks_by_id = {task['id']: task for task in tasks}
+        with self._locked():
+            records = self._read_records(self.pending_path) + self._read_records(self.path)
+        for record in records:
+            self.apply(tasks_by_id, record)
+        return list(tasks_by_id.values())
+
+    def compact_in_background(self):
+        """Start a compaction thread unless one is already running"""
+        with self._locked():
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name='task-log-compactor', daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """Fold the current log into the snapshot"""
+        with self._compact_lock:
+            with self._lock:
+                if self._has_records(self.path):
+                    if os.path.exists(self.pending_path):
+                        # A previous compaction was interrupted; keep its records first
+                        with open(self.path, 'r', encoding='utf-8') as src, \
+                                open(self.pending_path, 'a', encoding='utf-8') as dst:
+                            dst.write(src.read())
+                        os.remove(self.path)
+                    else:
+                        os.replace(self.path, self.pending_path)
+                    self._start_log()
+                self._records = 0
+            if not os.path.exists(self.pending_path):
+                return
+            tasks_by_id = {task['id']: task for task in self.load_snapshot()}
+            for record in self._read_records(self.pending_path):
+                self.apply(tasks_by_id, record)
+            self.save_snapshot(list(tasks_by_id.values()))
+            os.remove(self.pending_path)
+
+    def checkpoint(self, tasks: List[Dict], since: Optional[Tuple[Optional[str], int]] = None):
+        """Write a full snapshot of tasks and discard the log it supersedes
+
+        If tasks were read at log position since, records appended after it
+        by other processes are applied first rather than discarded.
+        """
+        with self._compact_lock, self._lock:
+            if since is not None:
+                result = self.read_since(since)
+                if result is None:
+                    # A compaction already folded everything into the snapshot
+                    return
+                tasks_by_id = {task['id']: task for task in tasks}
+                for record in result[0]:
+                    self.apply(tasks_by_id, record)
+                tasks = list(tasks_by_id.values())
+            self.save_snapshot(tasks)
+            for path in (self.path, self.pending_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._start_log()
+            self._records = 0
+
+    # Change feed
+    def _generations(self) -> Tuple[Optional[str], Optional[str]]:
+        return self._generation(self.pending_path), self._generation(self.path)
+
+    def load(self) -> List[Dict]:
+        """The snapshot with the log applied, for a reader starting from scratch
+
+        A compaction in another thread or process may replace the snapshot and
+        remove the pending log between the two reads, which would lose the
+        records it folded in. Either file changing generation gives that away,
+        and the load starts over.
+        """
+        while True:
+            before = self._generations()
+            tasks = self.load_snapshot()
+            tasks_by_id = {task['id']: task for task in tasks}
+            with self._locked():
+                records = self._read_records(self.pending_path) + self._read_records(self.path)
+                after = self._generations()
+            if after == before:
+                break
+        for record in records:
+            self.apply(tasks_by_id, record)
+        return list(tasks_by_id.values())
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the log lock so a reader can catch up and append without racing other writers"""
+        with self._lock:
+            self._local.exclusive = True
+            try:
+                yield
+            finally:
+                self._local.exclusive = False
+
+    @staticmethod
+    def _generation(path: str) -> Optional[str]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                first = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        return first['id'] if first.get('op') == 'begin' else None
+
+    def _start_log(self):
+        """Create an empty log file holding just its generation record"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'begin', 'id': uuid.uuid4().hex, 'data': None}) + '\n')
+
+    def position(self) -> Tuple[Optional[str], int]:
+        """Position at the current end of the log"""
+        with self._locked():
+            if not os.path.exists(self.path):
+                self._start_log()
+            return self._generation(self.path), os.path.getsize(self.path)
+
+    @staticmethod
+    def _read_from(path: str, offset: int) -> Tuple[List[Dict], int]:
+        # Only whole lines: a writer may be in the middle of appending the last one
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return [record for record in records if record['op'] != 'begin'], offset + end
+
+    def read_since(self, position: Tuple[Optional[str], int]):
+        """(records, new position) for the records appended after position, or None if they are gone"""
+        generation, offset = position
+        records = []
+        active = self._generation(self.path)
+        if generation is not None and generation != active:
+            # Our log was rotated; the rest of it is in the pending file until compaction finishes
+            if self._generation(self.pending_path) != generation:
+                return None
+            try:
+                records, _ = self._read_from(self.pending_path, offset)
+            except OSError:
+                return None
+            generation, offset = active, 0
+        if active is None:
+            return None
+        try:
+            new_records, offset = self._read_from(self.path, offset)
+        except OSError:
+            return None
+        if self._generation(self.path) != active:
+            # Rotated while we were reading; start over next time
+            return None
+        return records + new_records, (active, offset)
@@ -0,0 +1,100 @@
+"""Compact in-memory representation of tasks.
+
+Task dicts loaded from storage carry a separate copy of every repeated string
+(status, priority, usernames, projects, dates). ``ValueInterner`` makes equal
+values share one object. ``TaskFrame`` keeps a columnar copy of the tasks
+with categorical columns and parsed dates, which the views read instead of
+building a DataFrame from the dicts on every rerun.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+STATUSES = ['Not Started', 'In Progress', 'On Hold', 'Completed']
+PRIORITIES = ['Low', 'Medium', 'High', 'Critical']
+
+# Fields with few distinct values, shared between tasks by ValueInterner
+INTERNED_FIELDS = ('assigned_to', 'created_by', 'status', 'priority', 'project',
+                   'start_date', 'end_date', 'created_date', 'updated_date')
+
+# Columns of the task frame, indexed by task id
+FRAME_COLUMNS = ['title', 'assigned_to', 'created_by', 'status', 'priority', 'project',
+                 'start_date', 'end_date', 'progress', 'created_date', 'updated_date']
+CATEGORICAL_COLUMNS = ('assigned_to', 'created_by', 'project')
+# Above this share of changed rows the frame is rebuilt instead of patched
+REBUILD_FRACTION = 0.1
+
+
+class ValueInterner:
+    """Replaces repeated field values with one shared object per distinct value"""
+
+    def __init__(self, fields: Iterable[str] = INTERNED_FIELDS):
+        self.fields = tuple(fields)
+        self._values: Dict = {}
+        self._tags: Dict = {}
+
+    def intern(self, task: Dict) -> Dict:
+        """Intern the values of task in place and return it"""
+        values = self._values
+        for field in self.fields:
+            value = task.get(field)
+            if isinstance(value, str):
+                task[field] = values.setdefault(value, value)
+        tags = task.get('tags')
+        if tags:
+            task['tags'] = [self._tags.setdefault(tag, tag) for tag in tags]
+        return task
+
+
+def _frame_from_tasks(tasks: List[Dict]) -> pd.DataFrame:
+    ids = [task['id'] for task in tasks]
+    df = pd.DataFrame({column: [task.get(column) for task in tasks] for column in FRAME_COLUMNS},
+                      index=pd.Index(ids, name='id', dtype='int64'))
+    df['status'] = pd.Categorical(df['status'], categories=STATUSES)
+    df['priority'] = pd.Categorical(df['priority'], categories=PRIORITIES, ordered=True)
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].astype('category')
+    df['progress'] = pd.to_numeric(df['progress'], errors='coerce').fillna(0).astype('int16')
+    # Parse the date columns once per build rather than per view
+    df['start'] = pd.to_datetime(df['start_date'], format='%Y-%m-%d', errors='coerce')
+    df['finish'] = pd.to_datetime(df['end_date'], format='%Y-%m-%d', errors='coerce')
+    return df
+
+
+class TaskFrame:
+    """Columnar, read-only view of the tasks, indexed by task id.
+
+    Status and priority use fixed categories, and users and projects are
+    categoricals, so each row stores small integer codes instead of strings.
+    ``patched`` returns a new frame with a few changed tasks swapped in,
+    leaving this one untouched for sessions still rendering it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Dict]) -> 'TaskFrame':
+        return cls(_frame_from_tasks(tasks))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def patched(self, changed: Dict[int, Optional[Dict]]) -> 'TaskFrame':
+        """Frame with the given tasks replaced, added, or (when None) removed"""
+        df = self.df.drop(index=[task_id for task_id in changed if task_id in self.df.index])
+        tasks = [task for task in changed.values() if task is not None]
+        if tasks:
+            rows = _frame_from_tasks(tasks)
+            for column in CATEGORICAL_COLUMNS:
+                # Give both sides the same categories so concat keeps them categorical
+                categories = df[column].cat.categories.union(rows[column].cat.categories)
+                df[column] = df[column].cat.set_categories(categories)
+                rows[column] = rows[column].cat.set_categories(categories)
+            df = pd.concat([df, rows])
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index()
+        return TaskFrame(df)
+
+    def should_rebuild(self, changes: int) -> bool:
+        return changes > max(1, len(self.df)) * REBUILD_FRACTION
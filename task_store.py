@@ -0,0 +1,653 @@
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import islice
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from facets import FacetIndex
+from events import task_event
+from history import Rollups, transition
+from metrics import DashboardMetrics
+from persistence import PersistenceWorker
+from scheduling import DependencyCycleError, Schedule, decode_dependencies
+from search import TaskSearchIndex
+from task_log import TaskLog
+from task_model import TaskFrame, ValueInterner
+
+# How many recent changes the store remembers for incremental session refresh
+CHANGE_FEED_SIZE = 1000
+
+# Task fields that get a hash index in TaskRepository
+INDEXED_FIELDS = ('assigned_to', 'created_by', 'status', 'project')
+# List-valued fields indexed by each of their elements (an inverted index)
+MULTI_VALUED_FIELDS = ('tags', 'depends_on')
+
+
+class StaleTaskError(Exception):
+    """Raised when a task was changed by someone else since the caller read it"""
+
+
+def task_version(task: Dict) -> int:
+    """Optimistic-concurrency version of a task; tasks saved before versioning count as 0"""
+    version = task.get('version')
+    if version is None or (isinstance(version, float) and version != version):
+        return 0
+    return int(version)
+
+
+def _index_key(value):
+    # Empty CSV cells come back as NaN, which never compares equal to itself
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _index_keys(field: str, task: Dict) -> Iterable:
+    if field == 'depends_on':
+        return set(decode_dependencies(task.get(field)))
+    if field in MULTI_VALUED_FIELDS:
+        return set(task.get(field) or ())
+    return (_index_key(task.get(field)),)
+
+
+class TaskRepository:
+    """Tasks keyed by id with hash indexes on the commonly filtered fields.
+
+    Each index maps a field value to an insertion-ordered set (a dict with
+    ``None`` values) of task ids, and is updated incrementally on every add,
+    replace and remove, so lookups cost O(1) and filters O(k) in the number
+    of matching tasks.
+    """
+
+    def __init__(self, tasks: Iterable[Dict] = ()):
+        self._by_id: Dict[int, Dict] = {}
+        self._indexes: Dict[str, Dict] = {field: defaultdict(dict)
+                                          for field in INDEXED_FIELDS + MULTI_VALUED_FIELDS}
+        for task in tasks:
+            self.add(task)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._by_id
+
+    def __iter__(self):
+        return iter(self._by_id)
+
+    def __reversed__(self):
+        return reversed(self._by_id)
+
+    def values(self):
+        return self._by_id.values()
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        return self._by_id.get(task_id)
+
+    def _index(self, task: Dict):
+        for field, index in self._indexes.items():
+            for key in _index_keys(field, task):
+                index[key][task['id']] = None
+
+    def _unindex(self, task: Dict):
+        for field, index in self._indexes.items():
+            for key in _index_keys(field, task):
+                bucket = index.get(key)
+                if bucket is not None:
+                    bucket.pop(task['id'], None)
+                    if not bucket:
+                        del index[key]
+
+    def add(self, task: Dict):
+        """Insert task, replacing any task with the same id"""
+        old = self._by_id.get(task['id'])
+        if old is not None:
+            self._unindex(old)
+        self._by_id[task['id']] = task
+        self._index(task)
+
+    def remove(self, task_id: int) -> Optional[Dict]:
+        task = self._by_id.pop(task_id, None)
+        if task is not None:
+            self._unindex(task)
+        return task
+
+    def ids(self, field: str, value) -> Iterable[int]:
+        """Ids of tasks whose field equals (or, for a list-valued field, contains) value, in insertion order"""
+        return self._indexes[field].get(_index_key(value), {}).keys()
+
+    def count(self, field: str, value) -> int:
+        return len(self._indexes[field].get(_index_key(value), ()))
+
+    def find(self, field: str, value) -> List[Dict]:
+        return [self._by_id[task_id] for task_id in self.ids(field, value)]
+
+    def values_of(self, field: str) -> List:
+        """Distinct indexed values of field"""
+        return list(self._indexes[field])
+
+
+class TaskStore:
+    """Process-wide task collection shared by every Streamlit session.
+
+    All writes go through the store, which appends them to the change log and
+    bumps ``version``. The log can be any object with the same ``append`` and
+    ``checkpoint`` methods, such as the SQLite backend or a PersistenceWorker
+    that writes in the background. Tasks are replaced
+    rather than mutated on update, so a list handed out by ``all()`` is an
+    immutable snapshot that sessions can keep rendering from while other
+    sessions write.
+
+    With a shared ``feed`` (a TaskLog or SqliteStorage used by several
+    processes), ``sync`` applies the records other processes wrote since the
+    last call. Each write holds the feed's cross-process lock, catches up
+    first and only then checks versions and assigns ids, so replicas neither
+    lose updates nor hand out the same id twice.
+    """
+
+    def __init__(self, tasks: List[Dict], log: Optional[TaskLog] = None,
+                 change_feed_size: int = CHANGE_FEED_SIZE, feed=None, position=None, ids=None,
+                 history=None, events=None):
+        self.log = log
+        self.feed = feed
+        # Optional IdAllocator; without one, ids continue from the highest id seen
+        self.ids = ids
+        # Optional StatusHistory the status transitions are appended to
+        self.history = history
+        # Transitions of the current write, appended to the history when it ends
+        self._transitions: List[Dict] = []
+        # Optional EventBus the changes are published to
+        self.events = events
+        # Events of the current write, published when it ends
+        self._events: List[Dict] = []
+        self.version = 0
+        self._position = position
+        self._lock = threading.RLock()
+        # Ticket of each thread's last write when the log is a PersistenceWorker
+        self._local = threading.local()
+        # Share repeated values between tasks instead of keeping a copy per task
+        self._interner = ValueInterner()
+        self._load(tasks)
+        self._changes: deque = deque(maxlen=change_feed_size)
+        self._snapshot: List[Dict] = list(self._tasks.values())
+        self._snapshot_version = 0
+        self._frame: Optional[TaskFrame] = None
+        self._frame_version = -1
+
+    @classmethod
+    def from_feed(cls, feed, **kwargs) -> 'TaskStore':
+        """Store loaded from a shared feed, which is also its log"""
+        # Take the position first: records landing during the load are applied again, harmlessly
+        position = feed.position()
+        return cls(feed.load(), log=feed, feed=feed, position=position, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._tasks
+
+    def _load(self, tasks: Iterable[Dict]):
+        self._tasks = TaskRepository(self._interner.intern(task) for task in tasks)
+        self.metrics = DashboardMetrics()
+        self.search_index = TaskSearchIndex(self._tasks.values())
+        self.facets = FacetIndex(self._tasks.values())
+        if self.history is not None:
+            self.rollups = Rollups.from_history(self.history.load(self._tasks.values()))
+        else:
+            self.rollups = Rollups()
+        # Built on first use, then kept up to date
+        self._schedule: Optional[Schedule] = None
+        for task in self._tasks.values():
+            self.metrics.add(task)
+        self._next_id = max(self._tasks, default=0) + 1
+
+    @property
+    def schedule(self) -> Schedule:
+        """Dependency schedule of the tasks; use it with the store lock held"""
+        if self._schedule is None:
+            self._schedule = Schedule(self._tasks.values())
+        return self._schedule
+
+    def _track(self, old: Optional[Dict], new: Optional[Dict]):
+        """Roll up a status change; the time is the task's updated_date, or now for a deletion"""
+        if old is not None and new is not None and old.get('status') == new.get('status'):
+            return
+        at = new.get('updated_date') if new is not None else None
+        if not isinstance(at, str):
+            at = datetime.now().strftime('%Y-%m-%d %H:%M')
+        record = transition(old, new, at)
+        self.rollups.add(record)
+        self._transitions.append(record)
+
+    def _notify(self, old: Optional[Dict], new: Optional[Dict]):
+        if self.events is None:
+            return
+        event = task_event(old, new)
+        if event is not None:
+            self._events.append(event)
+
+    def _put(self, task: Dict):
+        old = self._tasks.get(task['id'])
+        self._track(old, task)
+        self._notify(old, task)
+        self._tasks.add(task)
+        if old is None:
+            self.metrics.add(task)
+            self.search_index.add(task)
+            self.facets.add(task)
+            if self._schedule is not None:
+                self._schedule.add(task)
+        else:
+            self.metrics.replace(old, task)
+            self.search_index.replace(old, task)
+            self.facets.replace(old, task)
+            if self._schedule is not None:
+                self._schedule.replace(old, task)
+
+    def _drop(self, task_id: int):
+        task = self._tasks.remove(task_id)
+        if task is not None:
+            self._track(task, None)
+            self._notify(task, None)
+            self.metrics.remove(task)
+            self.search_index.remove(task)
+            self.facets.remove(task)
+            if self._schedule is not None:
+                self._schedule.remove(task)
+
+    def _apply(self, record: Dict):
+        """Apply a change record written by another process"""
+        op, task_id, data = record['op'], record['id'], record['data']
+        if op == 'create':
+            self._put(self._interner.intern(dict(data)))
+            self._next_id = max(self._next_id, task_id + 1)
+        elif op == 'update':
+            old = self._tasks.get(task_id)
+            if old is None:
+                return
+            self._put(self._interner.intern({**old, **data}))
+        elif op == 'delete':
+            self._drop(task_id)
+        else:
+            return
+        self.version += 1
+        self._changes.append((self.version, op, task_id))
+
+    def _catch_up(self) -> int:
+        result = self.feed.read_since(self._position)
+        if result is None:
+            # The records are gone (compacted or replaced); reload everything
+            self._position = self.feed.position()
+            self._load(self.feed.load())
+            self.version += 1
+            self._changes.clear()
+            return -1
+        records, self._position = result
+        for record in records:
+            self._apply(record)
+        # The writing process already appended these transitions to the history and published the events
+        self._transitions.clear()
+        self._events.clear()
+        return len(records)
+
+    def sync(self) -> int:
+        """Apply changes other processes wrote to the shared feed; -1 means a full reload"""
+        if self.feed is None:
+            return 0
+        with self._lock:
+            return self._catch_up()
+
+    @contextmanager
+    def _writing(self):
+        with self._lock:
+            if self.feed is None:
+                yield
+            else:
+                with self.feed.exclusive():
+                    # See every other process's writes before checking versions or assigning ids
+                    self._catch_up()
+                    yield
+                    self._position = self.feed.position()
+            self._save_history()
+            self._publish()
+
+    def _save_history(self):
+        if self.history is not None and self._transitions:
+            if isinstance(self.log, PersistenceWorker):
+                # Written by the worker along with the change records, off the calling thread
+                self.log.append_history(self.history, self._transitions)
+            else:
+                self.history.append_many(self._transitions)
+        self._transitions = []
+
+    def _publish(self):
+        # Only enqueues; the bus delivers on its own threads
+        if self.events is not None:
+            self.events.publish_many(self._events)
+        self._events = []
+
+    def _record(self, op: str, task_id: int, data: Optional[Dict]):
+        # Log first so a failed write leaves memory untouched
+        if self.log is not None:
+            self._local.ticket = self.log.append(op, task_id, data)
+        self.version += 1
+        self._changes.append((self.version, op, task_id))
+
+    def _record_many(self, records: List[Tuple[str, int, Optional[Dict]]]):
+        """Log a batch of changes with one write (one transaction in SQLite)"""
+        if not records:
+            return
+        if self.log is not None:
+            self._local.ticket = self.log.append_many(records)
+        for op, task_id, _ in records:
+            self.version += 1
+            self._changes.append((self.version, op, task_id))
+
+    def saved(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the calling thread's last write is on disk; False on timeout"""
+        ticket = getattr(self._local, 'ticket', None)
+        return ticket is None or ticket.wait(timeout)
+
+    def _allocate(self, count: int) -> int:
+        """First of count fresh consecutive ids"""
+        first = self._next_id if self.ids is None else self.ids.allocate(count, floor=self._next_id)
+        self._next_id = first + count
+        return first
+
+    def all(self) -> List[Dict]:
+        """Return the current task list; the same list object is shared until the next write"""
+        with self._lock:
+            if self._snapshot_version != self.version:
+                self._snapshot = list(self._tasks.values())
+                self._snapshot_version = self.version
+            return self._snapshot
+
+    def frame(self) -> pd.DataFrame:
+        """Columnar copy of the tasks for the views, indexed by id.
+
+        Built once and then patched with the tasks changed since, so it is
+        shared by every session until the next write. Treat it as read-only.
+        """
+        with self._lock:
+            if self._frame_version != self.version:
+                changes = self.changes_since(self._frame_version) if self._frame is not None else None
+                if changes is None or self._frame.should_rebuild(len(changes)):
+                    self._frame = TaskFrame.from_tasks(list(self._tasks.values()))
+                else:
+                    self._frame = self._frame.patched({task_id: self._tasks.get(task_id)
+                                                       for _, task_id in changes})
+                self._frame_version = self.version
+            return self._frame.df
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        return self._tasks.get(task_id)
+
+    def find(self, field: str, value) -> List[Dict]:
+        """Tasks whose indexed field equals value"""
+        with self._lock:
+            return self._tasks.find(field, value)
+
+    def count(self, field: str, value) -> int:
+        return self._tasks.count(field, value)
+
+    def projects(self) -> List[str]:
+        """Sorted names of the projects that currently have tasks"""
+        with self._lock:
+            return sorted(project for project in self._tasks.values_of('project') if project)
+
+    def tags(self) -> List[str]:
+        """Sorted tags that are currently in use"""
+        with self._lock:
+            return sorted(self._tasks.values_of('tags'))
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """Up to limit tasks matching query by word prefix, best matches first"""
+        with self._lock:
+            return [self._tasks.get(task_id) for task_id in self.search_index.search(query, limit)]
+
+    def recent(self, limit: int) -> List[Dict]:
+        """The limit most recently created tasks, newest first"""
+        with self._lock:
+            return [self._tasks.get(task_id) for task_id in islice(reversed(self._tasks), limit)]
+
+    def user_tasks(self, username: str) -> List[Dict]:
+        """Tasks assigned to or created by username, in id order"""
+        with self._lock:
+            ids = set(self._tasks.ids('assigned_to', username)) | set(self._tasks.ids('created_by', username))
+            return [self._tasks.get(task_id) for task_id in sorted(ids)]
+
+    def _mask(self, filters: Dict, username: Optional[str]) -> int:
+        within = self.facets.user_mask(username) if username is not None else None
+        return self.facets.mask(filters, within)
+
+    def query(self, filters: Dict, username: Optional[str] = None) -> List[Dict]:
+        """Tasks matching filters (see FacetIndex.mask), in id order.
+
+        With username, only tasks assigned to or created by that user.
+        """
+        with self._lock:
+            return [self._tasks.get(task_id) for task_id in sorted(self.facets.ids(self._mask(filters, username)))]
+
+    def query_recent(self, filters: Dict, limit: int,
+                     username: Optional[str] = None) -> Tuple[int, List[Dict]]:
+        """Number of tasks matching filters, and the limit most recently updated of them"""
+        with self._lock:
+            mask = self._mask(filters, username)
+            return mask.bit_count(), [self._tasks.get(task_id) for task_id in self.facets.recent(mask, limit)]
+
+    def daily_trends(self) -> pd.DataFrame:
+        """Tasks created, completed and open per day (see Rollups.daily_frame)"""
+        with self._lock:
+            return self.rollups.daily_frame()
+
+    def weekly_trends(self) -> pd.DataFrame:
+        """Completions and mean cycle time per week and assignee (see Rollups.weekly_frame)"""
+        with self._lock:
+            return self.rollups.weekly_frame()
+
+    def facet_counts(self, filters: Dict, username: Optional[str] = None) -> Dict[str, Dict]:
+        """Per facet field, the number of matching tasks for each value under the other filters"""
+        with self._lock:
+            within = self.facets.user_mask(username) if username is not None else None
+            return self.facets.facet_counts(filters, within)
+
+    def dashboard_metrics(self, today: date) -> Dict[str, int]:
+        """Consistent snapshot of the dashboard counts for the given day"""
+        with self._lock:
+            metrics = self.metrics
+            return {
+                'total': metrics.total,
+                'completed': metrics.status_count('Completed'),
+                'in_progress': metrics.status_count('In Progress'),
+                'overdue': metrics.overdue_count(today),
+                'due_today': metrics.due_count(today),
+                'created_today': metrics.created_count(today),
+                'completed_today': metrics.completed_count(today),
+            }
+
+    def _check_dependencies(self, task_id: Optional[int], depends_on: Iterable[int]):
+        # Only newly added ids have to exist, so a task left pointing at a deleted one can still be saved
+        current = self._tasks.get(task_id) if task_id is not None else None
+        kept = set(decode_dependencies(current.get('depends_on'))) if current is not None else set()
+        missing = [dep for dep in depends_on if dep not in self._tasks and dep not in kept]
+        if missing:
+            raise ValueError(f"Unknown task(s): {', '.join(f'#{dep}' for dep in missing)}")
+        cycle = self.schedule.cycle_path(task_id, depends_on) if task_id is not None else None
+        if cycle:
+            raise DependencyCycleError("Circular dependency: " + " depends on ".join(f"#{dep}" for dep in cycle))
+
+    def dependency_error(self, task_id: Optional[int], depends_on: Iterable[int]) -> Optional[str]:
+        """Why task_id (None for a new task) cannot depend on depends_on, or None if it can"""
+        with self._lock:
+            try:
+                self._check_dependencies(task_id, list(depends_on))
+            except ValueError as e:
+                return str(e)
+            return None
+
+    def critical_tasks(self) -> Set[int]:
+        """Ids of the tasks with no slack in the dependency schedule"""
+        with self._lock:
+            return self.schedule.critical_tasks()
+
+    def slack(self, task_id: int) -> Optional[int]:
+        """Days task_id can slip without delaying its project; None if it has no valid dates"""
+        with self._lock:
+            return self.schedule.slack(task_id)
+
+    def slacks(self) -> Dict[int, int]:
+        """Scheduling slack in days per task id"""
+        with self._lock:
+            return self.schedule.slacks()
+
+    def critical_path(self, project=None) -> List[Dict]:
+        """The chain of critical tasks that ends at the finish of project (default: the latest one)"""
+        with self._lock:
+            return [self._tasks.get(task_id) for task_id in self.schedule.critical_path(project)]
+
+    def add(self, task_data: Dict) -> Dict:
+        """Assign the next free id to task_data and store it"""
+        with self._writing():
+            if 'depends_on' in task_data:
+                self._check_dependencies(None, decode_dependencies(task_data['depends_on']))
+            task = self._interner.intern(dict(task_data))
+            task['id'] = self._allocate(1)
+            task['version'] = 1
+            self._record('create', task['id'], task)
+            self._put(task)
+            return task
+
+    def update(self, task_id: int, updated_data: Dict,
+               expected_version: Optional[int] = None) -> Optional[Dict]:
+        """Apply updated_data to a task.
+
+        If expected_version is given and the task's version has moved on since
+        the caller read it, nothing is written and StaleTaskError is raised.
+        """
+        with self._writing():
+            old = self._tasks.get(task_id)
+            if old is None:
+                return None
+            version = task_version(old)
+            if expected_version is not None and expected_version != version:
+                raise StaleTaskError(f"Task #{task_id} was changed by someone else")
+            if 'depends_on' in updated_data:
+                self._check_dependencies(task_id, decode_dependencies(updated_data['depends_on']))
+            updated_data = {**updated_data, 'version': version + 1}
+            self._record('update', task_id, updated_data)
+            task = self._interner.intern({**old, **updated_data})
+            self._put(task)
+            return task
+
+    def _unlink(self, task_ids: Set[int]) -> List[Dict]:
+        """Tasks that depended on task_ids, with those ids taken out of their dependencies"""
+        dependents = dict.fromkeys(dependent for task_id in task_ids
+                                   for dependent in self._tasks.ids('depends_on', task_id))
+        tasks = []
+        for dependent in dependents:
+            if dependent in task_ids:
+                continue
+            task = self._tasks.get(dependent)
+            kept = [dep for dep in decode_dependencies(task['depends_on']) if dep not in task_ids]
+            tasks.append(self._interner.intern({**task, 'depends_on': kept, 'version': task_version(task) + 1}))
+        return tasks
+
+    def _delete(self, task_ids: List[int]):
+        # Dependents are updated through the log as well, so other processes and a restart agree
+        dependents = self._unlink(set(task_ids))
+        records = [('delete', task_id, None) for task_id in task_ids] + \
+                  [('update', task['id'], {'depends_on': task['depends_on'], 'version': task['version']})
+                   for task in dependents]
+        if len(records) == 1:
+            self._record(*records[0])
+        else:
+            self._record_many(records)
+        for task_id in task_ids:
+            self._drop(task_id)
+        for task in dependents:
+            self._put(task)
+
+    def delete(self, task_id: int) -> bool:
+        with self._writing():
+            if task_id not in self._tasks:
+                return False
+            self._delete([task_id])
+            return True
+
+    # Batch operations: one id allocation and one log write per call
+    def bulk_add(self, tasks_data: List[Dict]) -> List[Dict]:
+        """Store several new tasks, assigning them consecutive ids"""
+        with self._writing():
+            tasks = [self._interner.intern(dict(task_data)) for task_data in tasks_data]
+            dependencies = {dep for task in tasks for dep in decode_dependencies(task.get('depends_on'))}
+            # New tasks have no dependents yet, so only unknown ids can be wrong
+            self._check_dependencies(None, sorted(dependencies))
+            if not tasks:
+                return []
+            first = self._allocate(len(tasks))
+            for offset, task in enumerate(tasks):
+                task['id'] = first + offset
+                task['version'] = 1
+            self._record_many([('create', task['id'], task) for task in tasks])
+            for task in tasks:
+                self._put(task)
+            return tasks
+
+    def bulk_update(self, updates: Dict[int, Dict]) -> List[Dict]:
+        """Apply updated_data per task id; unknown ids are skipped"""
+        if any('depends_on' in data for data in updates.values()):
+            # A cycle could span several updates of the batch; change those one at a time
+            raise ValueError("Dependencies cannot be changed in a batch update")
+        with self._writing():
+            records, tasks = [], []
+            for task_id, updated_data in updates.items():
+                old = self._tasks.get(task_id)
+                if old is None:
+                    continue
+                updated_data = {**updated_data, 'version': task_version(old) + 1}
+                records.append(('update', task_id, updated_data))
+                tasks.append(self._interner.intern({**old, **updated_data}))
+            self._record_many(records)
+            for task in tasks:
+                self._put(task)
+            return tasks
+
+    def bulk_reassign(self, task_ids: Iterable[int], assignee: str,
+                      updated_data: Optional[Dict] = None) -> List[Dict]:
+        """Assign every task in task_ids to assignee, plus any other updated_data"""
+        updated_data = {**(updated_data or {}), 'assigned_to': assignee}
+        return self.bulk_update({task_id: updated_data for task_id in task_ids})
+
+    def bulk_delete(self, task_ids: Iterable[int]) -> int:
+        """Delete the given tasks; returns how many existed"""
+        with self._writing():
+            task_ids = [task_id for task_id in dict.fromkeys(task_ids) if task_id in self._tasks]
+            self._delete(task_ids)
+            return len(task_ids)
+
+    def changes_since(self, version: int) -> Optional[List[Tuple[str, int]]]:
+        """Return (op, task_id) pairs written after version, or None if they are no longer known"""
+        with self._lock:
+            if version == self.version:
+                return []
+            if version > self.version or not self._changes or self._changes[0][0] > version + 1:
+                return None
+            return [(op, task_id) for change_version, op, task_id in self._changes
+                    if change_version > version]
+
+    def checkpoint(self):
+        """Write a full snapshot of the store and clear the change log"""
+        if self.log is None:
+            return
+        with self._lock:
+            if self.feed is None:
+                self.log.checkpoint(list(self._tasks.values()))
+                return
+            self._catch_up()
+            tasks, position = list(self._tasks.values()), self._position
+        # The feed takes its own locks and folds in what other processes appended meanwhile
+        self.feed.checkpoint(tasks, since=position)